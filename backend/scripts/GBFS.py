@@ -1,135 +1,52 @@
-import math
 import time
 from typing import List, Dict, Any
 
-# Hàm tính khoảng cách giữa hai thành phố ( Haversine )
-def haversine_distance(lat1, lon1, lat2, lon2):
-    R = 6371  # km
-    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = math.sin(dlat/2)**2 + math.cos(lat1)*math.cos(lat2)*math.sin(dlon/2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    return R * c
+import numpy as np
 
-# --------------------------
-# HÀM TÍNH OPTIMAL DISTANCE - BỔ SUNG MỚI
-# --------------------------
-def calculate_optimal_distance(city_data):
-    """
-    Tính khoảng cách tối ưu sử dụng Nearest Neighbor heuristic
-    """
-    if len(city_data) < 2:
-        return 0
-    
-    cities = [c["name"] for c in city_data]
-    num_cities = len(cities)
-    name_to_idx = {c["name"]: i for i, c in enumerate(city_data)}
-    
-    # Tạo ma trận khoảng cách
-    distance_matrix = [[0]*num_cities for _ in range(num_cities)]
-    for i in range(num_cities):
-        for j in range(num_cities):
-            if i != j:
-                distance_matrix[i][j] = haversine_distance(
-                    city_data[i]["lat"], city_data[i]["lng"],
-                    city_data[j]["lat"], city_data[j]["lng"]
-                )
-    
-    def tour_distance(path):
-        """Tính tổng khoảng cách của tour"""
-        dist = 0
-        for i in range(len(path)-1):
-            dist += distance_matrix[name_to_idx[path[i]]][name_to_idx[path[i+1]]]
-        # Quay lại điểm xuất phát
-        dist += distance_matrix[name_to_idx[path[-1]]][name_to_idx[path[0]]]
-        return dist
-    
-    # Sử dụng Nearest Neighbor algorithm để tìm tour gần tối ưu
-    start_city = cities[0]
-    unvisited = set(cities[1:])  # Bỏ qua thành phố đầu
-    current_city = start_city
-    tour = [current_city]
-    
-    while unvisited:
-        # Tìm thành phố gần nhất
-        nearest_city = min(unvisited, 
-                          key=lambda city: distance_matrix[name_to_idx[current_city]][name_to_idx[city]])
-        tour.append(nearest_city)
-        unvisited.remove(nearest_city)
-        current_city = nearest_city
-    
-    # Quay lại điểm xuất phát
-    tour.append(start_city)
-    
-    # Tính khoảng cách tour
-    nn_distance = tour_distance(tour)
-    
-    # Có thể thử thêm 2-opt local search để cải thiện
-    improved_distance = two_opt_improvement(tour, distance_matrix, name_to_idx)
-    
-    return round(min(nn_distance, improved_distance), 2)
+from distance import haversine_distance, build_distance_matrix
+from optimal import optimal_baseline, calculate_solution_quality, calculate_gap_bound
+from nearest_neighbor import nearest_neighbor_steps
+from step_trace import validate_trace, nearest_candidates
+from edges import build_edges, build_spatial_edges
+from spatial import SphereGrid, unit_sphere_coords, distance_row_km
+from timing import PhaseTimer
 
-def two_opt_improvement(tour, distance_matrix, name_to_idx):
-    """
-    Cải thiện tour bằng 2-opt local search
-    """
-    best_tour = tour[:-1]  # Bỏ điểm cuối (trùng với điểm đầu)
-    best_distance = tour_distance(best_tour + [best_tour[0]], distance_matrix, name_to_idx)
-    improved = True
-    
-    while improved:
-        improved = False
-        for i in range(1, len(best_tour)-2):
-            for j in range(i+1, len(best_tour)):
-                if j - i == 1:
-                    continue  # Bỏ qua cạnh liền kề
-                
-                # Tạo tour mới bằng cách đảo ngược đoạn i-j
-                new_tour = best_tour[:i] + best_tour[i:j+1][::-1] + best_tour[j+1:]
-                new_distance = tour_distance(new_tour + [new_tour[0]], distance_matrix, name_to_idx)
-                
-                if new_distance < best_distance:
-                    best_tour = new_tour
-                    best_distance = new_distance
-                    improved = True
-                    break
-            if improved:
-                break
-    
-    return best_distance
+# Cách tìm thành phố chưa thăm gần nhất:
+# "matrix":  argmin trên hàng của ma trận khoảng cách n×n (mặc định, như cũ)
+# "spatial": lưới không gian trên tọa độ 3-D của mặt cầu đơn vị, không tạo ma trận (bộ nhớ O(n))
+GBFS_INDEXES = ("matrix", "spatial")
 
-def tour_distance(path, distance_matrix, name_to_idx):
-    """Tính khoảng cách tour với ma trận khoảng cách cho trước"""
-    dist = 0
-    for i in range(len(path)-1):
-        dist += distance_matrix[name_to_idx[path[i]]][name_to_idx[path[i+1]]]
-    return dist
-
-# --------------------------
-# HÀM TÍNH SOLUTION QUALITY - BỔ SUNG MỚI
-# --------------------------
-def calculate_solution_quality(best_distance, optimal_distance):
-    """
-    Tính chất lượng nghiệm (0-100%)
-    """
-    if best_distance <= 0 or optimal_distance <= 0:
-        return 0.0
-    
-    quality = (optimal_distance / best_distance) * 100
-    
-    # Giới hạn tối đa 100%
-    return min(round(quality, 1), 100.0)
+def validate_gbfs_index(index):
+    if index not in GBFS_INDEXES:
+        raise ValueError(f"Invalid GBFS index: {index}")
 
 # --------------------------
 # HÀM GBFS CHÍNH - GIỮ NGUYÊN CẤU TRÚC CŨ + BỔ SUNG TÍNH NĂNG MỚI
 # --------------------------
-def gbfs_tsp(city_data: List[Dict]) -> Dict[str, Any]:
+def gbfs_tsp(city_data: List[Dict], distance_matrix=None, cancel_event=None,
+             trace="full", trace_top_k=None, edges=None, edge_mode="all", edge_k=5,
+             index="matrix", baseline=True, deadline=None) -> Dict[str, Any]:
     """
     GBFS TSP: luôn chọn thành phố tiếp theo dựa trên heuristic distance đến goal
     Trả về format có steps + cities + edges để frontend animation
+    distance_matrix: ma trận NumPy tính sẵn bởi build_distance_matrix hoặc backend của distance_store
+                     (nếu None sẽ tự tạo)
+    cancel_event: threading.Event; khi được set thì ném SolveCancelled ở bước kế tiếp
+    deadline: mốc time.monotonic(); quá hạn trong lúc tìm tour thì ném DeadlineExceeded
+    trace: "full" | "summary" | "none" - mức chi tiết của steps
+    trace_top_k: chỉ giữ k hàng xóm gần nhất trong mỗi step (None = tất cả ở "full", không có ở "summary")
+    edges: danh sách cạnh đã tạo sẵn cho cả request (None = tự tạo theo edge_mode/edge_k)
+    index: "matrix" | "spatial" - với "spatial" distance_matrix bị bỏ qua, edge_mode chỉ nhận
+           "knn"/"none" (cạnh kNN tìm trên lưới) và không có baseline: optimal_distance là None
+           (tour GBFS từ thành phố 0 chính là tour Nearest Neighbor, so với chính nó không có ý nghĩa)
+    baseline: False = bỏ qua optimal_distance (các trường chất lượng nghiệm là None)
     """
     start_time = time.time()
+    timer = PhaseTimer()
+    validate_trace(trace)
+    validate_gbfs_index(index)
+    if index == "spatial" and edges is None and edge_mode == "all":
+        raise ValueError("edge_mode 'all' requires the full distance matrix; use 'knn' or 'none'")
     
     # Kiểm tra dữ liệu đầu vào, nếu không có dữ liệu hoặc dưới 2 thành phố thì trả về kết quả trống
     if not city_data or len(city_data) < 2:
@@ -143,100 +60,117 @@ def gbfs_tsp(city_data: List[Dict]) -> Dict[str, Any]:
             "starting_point": "",
             "algorithm": "GBFS",
             "optimal_distance": 0,        # BỔ SUNG MỚI
-            "solution_quality": 0         # BỔ SUNG MỚI
+            "solution_quality": 0,        # BỔ SUNG MỚI
+            "optimal_exact": True,
+            "optimal_kind": "exact",
+            "gap_bound_pct": 0
         }
     
-    # Chuẩn bị danh sách tên thành phố (tạo map để truy cập nhanh ma trận khoảng cách)
+    # Chuẩn bị danh sách tên thành phố (thuật toán làm việc trên chỉ số, tên chỉ dùng khi tạo response)
     cities = [c["name"] for c in city_data]
     num_cities = len(cities)
     
-    name_to_idx = {c["name"]: i for i, c in enumerate(city_data)}
-    
-    # Ma trận khoảng cách (sử dụng haversine_distance để tính toán khoảng cách giữa mọi thành phố)
-    distance_matrix = [[0]*num_cities for _ in range(num_cities)]
-    for i in range(num_cities):
-        for j in range(num_cities):
-            if i != j:
-                distance_matrix[i][j] = haversine_distance(
-                    city_data[i]["lat"], city_data[i]["lng"],
-                    city_data[j]["lat"], city_data[j]["lng"]
-                )
+    # Ma trận khoảng cách (dùng chung ma trận đã tính nếu server truyền vào)
+    # hoặc lưới không gian cho chế độ "spatial"
+    if index == "spatial":
+        distance_matrix = None
+        coords = unit_sphere_coords(city_data)
+        grid = SphereGrid(coords)
+        timer.lap("spatial_index")
+    elif distance_matrix is None:
+        distance_matrix = build_distance_matrix(city_data)
+        timer.lap("distance_matrix")
+    else:
+        timer.lap("setup")
     
-    # GBFS khởi tạo thuật toán
-    unvisited = set(cities) #chứa các thành phố chưa thăm
-    start_city = cities[0] #bắt đầu từ thành phố đầu tiên
-    current_city = start_city #thành phố hiện tại
-    path = [current_city] #lưu hành trình đường đi
-    unvisited.remove(current_city) #đánh dấu thành phố hiện tại đã thăm
+    # GBFS khởi tạo thuật toán: bắt đầu từ thành phố đầu tiên
+    start_city = cities[0]
+    path_idx = [0] #lưu hành trình đường đi (chỉ số)
+    total_distance = 0.0
     
     steps = []
-    step_num = 1
     
     #Vòng lặp chính
-    while unvisited:
-        # Tạo danh sách neighbors, tính heuristic h(n) cho tất cả hàng xóm
-        # Với GBFS, heuristic = khoảng cách nhỏ nhất đến thành phố mục tiêu (ở đây mục tiêu = gần nhất tiếp theo).
-        neighbors = []
-        for city in unvisited:
-            distance = distance_matrix[name_to_idx[current_city]][name_to_idx[city]]
-            neighbors.append({
-                "name": city, 
-                "h": round(distance, 2)  # Làm tròn để hiển thị đẹp
-            })
+    # Heuristic h(n) của GBFS = khoảng cách từ thành phố hiện tại (mục tiêu = gần nhất tiếp theo)
+    moves = nearest_neighbor_steps(
+        num_cities, distance_matrix, grid=grid if index == "spatial" else None,
+        cancel_event=cancel_event, deadline=deadline
+    )
+    for step_num, (current, next_idx, next_h, current_row, visited) in enumerate(moves, start=1):
+        total_distance += next_h
+        # Lưới không gian không có ma trận: hàng khoảng cách chỉ được tính khi trace cần danh sách ứng viên
+        if current_row is None and (trace == "full" or (trace == "summary" and trace_top_k)):
+            current_row = distance_row_km(coords, current, np.nonzero(~visited)[0])
         
-        # Chọn thành phố tiếp theo có heuristic nhỏ nhất
-        next_city = min(neighbors, key=lambda x: x["h"])["name"]
-        
-        # Tạo step với đầy đủ thông tin gửi cho frontend
-        step_info = {
-            "step": step_num,
-            "currentCity": current_city,
-            "neighbors": neighbors,  # Đảm bảo là array of objects
-            "chosenCity": next_city,
-            "consideredEdge": {"from": current_city, "to": next_city},
-            "chosenEdge": {"from": current_city, "to": next_city},
-            "partialPath": path.copy()
-        }
-        
-        steps.append(step_info)
+        # Tạo step gửi cho frontend theo mức trace yêu cầu
+        trace_start = time.perf_counter()
+        if trace == "full":
+            unvisited = np.nonzero(~visited)[0]
+            neighbors = [
+                {"name": cities[j], "h": h}  # Làm tròn để hiển thị đẹp
+                for j, h in nearest_candidates(current_row, unvisited, trace_top_k)
+            ]
+            current_city, next_city = cities[current], cities[next_idx]
+            steps.append({
+                "step": step_num,
+                "currentCity": current_city,
+                "neighbors": neighbors,  # Đảm bảo là array of objects
+                "chosenCity": next_city,
+                "consideredEdge": {"from": current_city, "to": next_city},
+                "chosenEdge": {"from": current_city, "to": next_city},
+                "partialPath": [cities[j] for j in path_idx]
+            })
+        elif trace == "summary":
+            # Delta: chỉ số thành phố được chọn (+ top-k ứng viên nếu yêu cầu)
+            step_info = {"step": step_num, "chosen": next_idx, "h": round(next_h, 2)}
+            if trace_top_k:
+                step_info["candidates"] = nearest_candidates(current_row, np.nonzero(~visited)[0], trace_top_k)
+            steps.append(step_info)
+        timer.charge("trace", time.perf_counter() - trace_start)
         
-        # Di chuyển đến thành phố tiếp theo (cập nhật vị trí mới, thêm vào hành trình (path), loại bỏ khỏi danh sách chưa thăm(unvisited))
-        current_city = next_city
-        path.append(current_city)
-        unvisited.remove(current_city)
-        step_num += 1
+        # Di chuyển đến thành phố tiếp theo (thêm vào hành trình; generator đánh dấu đã thăm)
+        path_idx.append(next_idx)
     
     # Trở về start (thành phố đầu) để khép vòng, hoàn thành chu trình TSP
-    final_step = {
-        "step": step_num,
-        "currentCity": current_city,
-        "neighbors": [],  # Không có neighbors khi trở về start
-        "chosenCity": start_city,
-        "consideredEdge": {"from": current_city, "to": start_city},
-        "chosenEdge": {"from": current_city, "to": start_city},
-        "partialPath": path.copy() + [start_city]
-    }
-    steps.append(final_step) #thêm 1 step để fe vẽ điểm quay lại vị trí đầu
-    path.append(start_city)
+    current = path_idx[-1]
+    if trace == "full":
+        current_city = cities[current]
+        steps.append({
+            "step": num_cities,
+            "currentCity": current_city,
+            "neighbors": [],  # Không có neighbors khi trở về start
+            "chosenCity": start_city,
+            "consideredEdge": {"from": current_city, "to": start_city},
+            "chosenEdge": {"from": current_city, "to": start_city},
+            "partialPath": [cities[j] for j in path_idx] + [start_city]
+        }) #thêm 1 step để fe vẽ điểm quay lại vị trí đầu
+    if index == "spatial":
+        return_h = float(distance_row_km(coords, current, [0])[0])
+    else:
+        return_h = float(distance_matrix[current, 0])
+    if trace == "summary":
+        steps.append({"step": num_cities, "chosen": 0, "h": round(return_h, 2)})
+    path_idx.append(0)
+    path = [cities[j] for j in path_idx]
+    timer.lap("search")
     
     # Tính tổng khoảng cách giữa các thành phố liên tiếp trong hành trình = chiều dài đường đi
-    total_distance = 0
-    for i in range(len(path)-1):
-        total_distance += distance_matrix[name_to_idx[path[i]]][name_to_idx[path[i+1]]]
+    total_distance += return_h
     
     # Tạo edges (2 chiều cho trực quan, làm tròn distance)
-    edges = []
-    for i in range(num_cities):
-        for j in range(i+1, num_cities):
-            edges.append({
-                "from": cities[i],
-                "to": cities[j],
-                "distance": round(distance_matrix[i][j], 2)
-            })
+    if edges is None:
+        if index == "spatial":
+            edges = build_spatial_edges(city_data, edge_mode, edge_k, coords=coords)
+        else:
+            edges = build_edges(city_data, distance_matrix, edge_mode, edge_k)
+    timer.lap("edges")
     
     # BỔ SUNG TÍNH NĂNG MỚI TỪ SERVER
-    optimal_distance = calculate_optimal_distance(city_data)
+    optimal_distance, optimal_kind = None, None
+    if baseline and index != "spatial":
+        optimal_distance, optimal_kind = optimal_baseline(city_data, distance_matrix)
     solution_quality = calculate_solution_quality(total_distance, optimal_distance)
+    timer.lap("optimal_distance")
     
     return {
         "best_solution": path,
@@ -248,7 +182,11 @@ def gbfs_tsp(city_data: List[Dict]) -> Dict[str, Any]:
         "starting_point": start_city,
         "algorithm": "GBFS",
         "optimal_distance": optimal_distance,        # BỔ SUNG MỚI
-        "solution_quality": solution_quality         # BỔ SUNG MỚI
+        "solution_quality": solution_quality,        # BỔ SUNG MỚI
+        "optimal_exact": optimal_kind == "exact",    # True nếu optimal_distance là tối ưu thật (Held-Karp)
+        "optimal_kind": optimal_kind,                # "exact" | "lower_bound" | "heuristic"
+        "gap_bound_pct": calculate_gap_bound(total_distance, optimal_distance, optimal_kind),
+        "timings": timer.as_dict()
     }
     
 # --------------------------
@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+from concurrent.futures import as_completed
+
+import numpy as np
+
+from distance import build_distance_matrix
+from distance_store import choose_backend
+from road_distance import road_matrix_for
+from solvers import solvers_need_distances
+from progress import format_sse
+
+# Ma trận chung cho cả lô chỉ được tạo khi hợp các tập thành phố không quá số này
+# (và vẫn trong giới hạn ma trận đầy đủ của choose_backend): 2000 thành phố ~ 32 MB float64
+BATCH_UNION_LIMIT = int(os.environ.get('BATCH_UNION_LIMIT', 2000))
+
+# --------------------------
+# MA TRẬN CON DÙNG CHUNG CHO CÁC BÀI TOÁN TRONG MỘT LÔ
+# --------------------------
+def city_key(city):
+    return (str(city["name"]), float(city["lat"]), float(city["lng"]))
+
+class UnionMatrix:
+    """
+    Ma trận Haversine của hợp các tập thành phố trong một lô, được tạo một lần bởi worker đầu tiên cần;
+    mọi worker khác cần khoảng cách bị chặn trên khóa cho đến khi ma trận tạo xong.
+    Không đi qua distance_cache: ma trận hợp chỉ dùng cho lô này,
+    đưa vào LRU dùng chung sẽ đẩy ra các ma trận của request thật.
+    """
+
+    def __init__(self, cities):
+        self.cities = cities
+        self._matrix = None
+        self._lock = threading.Lock()
+
+    def submatrix(self, indices):
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = build_distance_matrix(self.cities)
+        return self._matrix[np.ix_(indices, indices)]
+
+def batch_union(problem_cities, union_limit=BATCH_UNION_LIMIT):
+    """
+    Các thành phố trùng nhau giữa các bài toán chỉ được tính một lần: ma trận của hợp các tập thành phố
+    được cắt thành ma trận con theo chỉ số của từng bài toán.
+    Trả về (UnionMatrix, chỉ số của từng bài toán trong hợp), hoặc (None, None) khi mỗi bài toán nên
+    lấy khoảng cách riêng qua get_distances: không có thành phố trùng, hợp lớn hơn union_limit
+    hoặc quá giới hạn ma trận đầy đủ (choose_backend khác "dense"), hoặc có bài toán được ma trận đường bộ
+    phủ hết (để nguồn khoảng cách giống như khi giải đơn lẻ).
+    Chỉ duyệt danh sách thành phố, không tính khoảng cách nào.
+    """
+    if any(road_matrix_for(cities) is not None for cities in problem_cities):
+        return None, None
+
+    union_index = {}
+    union_cities = []
+    problem_indices = []
+    for cities in problem_cities:
+        indices = []
+        for city in cities:
+            key = city_key(city)
+            if key not in union_index:
+                union_index[key] = len(union_cities)
+                union_cities.append(city)
+            indices.append(union_index[key])
+        problem_indices.append(np.asarray(indices, dtype=np.intp))
+
+    total = sum(len(cities) for cities in problem_cities)
+    if len(union_cities) > union_limit or len(union_cities) == total:
+        return None, None
+    if choose_backend(len(union_cities)) != "dense":
+        return None, None
+    return UnionMatrix(union_cities), problem_indices
+
+def solve_problem(options, solve, union=None, indices=None):
+    """
+    Giải một bài toán của lô trên worker. Ma trận con được cắt ngay trong worker (chỉ khi có thuật toán cần);
+    không có ma trận chung thì solve tự lấy khoảng cách (hoặc không cần, ví dụ GBFS "spatial")
+    """
+    distance_matrix = None
+    if union is not None and solvers_need_distances(options["algorithms"], options):
+        distance_matrix = union.submatrix(indices)
+    return solve(options, distance_matrix=distance_matrix)
+
+# --------------------------
+# GIẢI NHIỀU BÀI TOÁN TRÊN WORKER POOL, TRẢ KẾT QUẢ THEO THỨ TỰ HOÀN THÀNH
+# --------------------------
+def solve_batch(problems, solve, pool):
+    """
+    Generator kết quả của cả lô theo thứ tự hoàn thành.
+    problems: danh sách options đã kiểm tra (parse_route_request), có thể kèm "id" của client
+    solve: hàm solve(options, distance_matrix=...) trả về kết quả của một bài toán
+           (distance_matrix None = tự lấy khoảng cách)
+    Mọi bài toán được gửi vào pool ngay và ma trận chung được tạo trong worker, không phải trước khi gửi.
+    Khi có ma trận chung, mọi worker cần khoảng cách chờ worker đầu tiên tạo xong nó;
+    chỉ các bài toán không cần khoảng cách (ví dụ GBFS "spatial") chạy ngay.
+    Mỗi phần tử sinh ra là {"index", "id", "result"} hoặc {"index", "id", "error"}.
+    """
+    union, problem_indices = batch_union([options["cities"] for options in problems])
+    futures = {
+        pool.submit(
+            solve_problem, options, solve, union, problem_indices[index] if union is not None else None
+        ): index
+        for index, options in enumerate(problems)
+    }
+    for future in as_completed(futures):
+        index = futures[future]
+        item = {"index": index, "id": problems[index].get("id")}
+        try:
+            item["result"] = future.result()
+        except Exception as e:
+            item["error"] = str(e)
+        yield item
+
+def batch_events(problems, solve, pool):
+    """Chuỗi sự kiện SSE của lô: "result" cho từng bài toán khi xong, "done" ở cuối"""
+    start_time = time.time()
+    failed = 0
+    for item in solve_batch(problems, solve, pool):
+        failed += "error" in item
+        yield format_sse("result", item)
+    yield format_sse("done", {
+        "problems": len(problems),
+        "failed": failed,
+        "execution_time": round(time.time() - start_time, 4),
+    })
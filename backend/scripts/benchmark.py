@@ -0,0 +1,257 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from GBFS import gbfs_tsp
+from wco import wco_tsp
+from distance import build_distance_matrix
+from optimal import optimal_baseline, heuristic_optimal_distance
+from construction import cheapest_insertion_tour, farthest_insertion_tour, double_tree_tour
+from local_search import tour_length
+from provinces import VIETNAM_PROVINCES
+import held_karp
+import lower_bound
+
+# Hộp bao lãnh thổ Việt Nam (cùng VIETNAM_BOUNDS của frontend)
+VIETNAM_BOUNDS = {"south": 8.38, "north": 23.392, "west": 102.144, "east": 114.333}
+# Trên ngưỡng này không chạy các thuật toán cần ma trận n×n (GBFS dùng index="spatial")
+DEFAULT_MATRIX_LIMIT = 5000
+# "optimal": baseline của optimal_distance (Held-Karp hoặc cận dưới 1-tree, cận trên là tour Nearest Neighbor)
+# "nn2opt":  tour Nearest Neighbor + 2-opt (tour tham chiếu, baseline "heuristic" cũ)
+# Hai mục này chỉ đo phần tính baseline trên ma trận có sẵn (server dùng lại ma trận của thuật toán)
+# còn lại:   các heuristic xây dựng tour trong construction.py
+CONSTRUCTIONS = {
+    "cheapest_insertion": cheapest_insertion_tour,
+    "farthest_insertion": farthest_insertion_tour,
+    "double_tree": double_tree_tour,
+}
+ALGORITHMS = ("gbfs", "wco", "optimal", "nn2opt") + tuple(CONSTRUCTIONS)
+
+# --------------------------
+# BỘ DỮ LIỆU CỐ ĐỊNH (SEED CỐ ĐỊNH)
+# --------------------------
+def uniform_instance(n, seed):
+    """n điểm phân bố đều trong hộp bao Việt Nam"""
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(VIETNAM_BOUNDS["south"], VIETNAM_BOUNDS["north"], n)
+    lng = rng.uniform(VIETNAM_BOUNDS["west"], VIETNAM_BOUNDS["east"], n)
+    return [{"name": f"P{i}", "lat": float(a), "lng": float(b)} for i, (a, b) in enumerate(zip(lat, lng))]
+
+def clustered_instance(n, seed, num_clusters=10, spread_deg=0.3):
+    """n điểm quanh num_clusters tâm cụm chọn ngẫu nhiên trong các tỉnh (mô phỏng điểm giao hàng đô thị)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.choice(len(VIETNAM_PROVINCES), size=num_clusters, replace=False)
+    labels = rng.integers(0, num_clusters, n)
+    lat = np.array([VIETNAM_PROVINCES[c]["lat"] for c in centers])[labels] + rng.normal(0, spread_deg, n)
+    lng = np.array([VIETNAM_PROVINCES[c]["lng"] for c in centers])[labels] + rng.normal(0, spread_deg, n)
+    return [{"name": f"C{i}", "lat": float(a), "lng": float(b)} for i, (a, b) in enumerate(zip(lat, lng))]
+
+INSTANCES = {
+    "vietnam_63": lambda: [dict(p) for p in VIETNAM_PROVINCES],
+    "uniform_100": lambda: uniform_instance(100, seed=100),
+    "uniform_1k": lambda: uniform_instance(1000, seed=1000),
+    "uniform_10k": lambda: uniform_instance(10000, seed=10000),
+    "clustered_1k": lambda: clustered_instance(1000, seed=1001),
+    "clustered_10k": lambda: clustered_instance(10000, seed=10001),
+}
+
+# --------------------------
+# ĐO MỘT LẦN CHẠY
+# --------------------------
+def clear_caches():
+    """Xóa các cache kết quả theo tập thành phố để mỗi lần đo đều tính lại từ đầu"""
+    held_karp.clear_cache()
+    lower_bound.clear_cache()
+
+def measure(func, repeat=3):
+    """
+    Chạy func(), trả về (kết quả, thời gian giây, peak bộ nhớ byte theo tracemalloc).
+    Thời gian là min của repeat lần chạy không bật tracemalloc (tracemalloc làm chậm cấp phát);
+    peak bộ nhớ đo trong một lần chạy riêng. func phải tất định (seed trước mỗi lần gọi).
+    """
+    # Các thuật toán in tiến trình ra stdout; bỏ qua để không ảnh hưởng thời gian đo
+    with contextlib.redirect_stdout(io.StringIO()):
+        elapsed = float("inf")
+        for _ in range(max(1, repeat)):
+            clear_caches()
+            start = time.perf_counter()
+            result = func()
+            elapsed = min(elapsed, time.perf_counter() - start)
+
+        clear_caches()
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return result, elapsed, peak
+
+def run_algorithm(algorithm, cities, seed, matrix_limit, repeat=3):
+    """
+    Chạy một thuật toán trên một instance (không tạo trace/edges để chỉ đo phần giải).
+    Thời gian và bộ nhớ đã gồm việc tạo ma trận khoảng cách, trừ "optimal" và "nn2opt".
+    Trả về (tour_length, time_s, peak_bytes, ghi chú) hoặc None nếu bỏ qua.
+    """
+    large = len(cities) > matrix_limit
+    if algorithm == "gbfs":
+        index = "spatial" if large else "matrix"
+        result, elapsed, peak = measure(
+            lambda: gbfs_tsp(cities, trace="none", edge_mode="none", index=index), repeat
+        )
+        return result["best_distance"], elapsed, peak, {"index": index}
+    if large:
+        return None
+    if algorithm == "wco":
+        result, elapsed, peak = measure(
+            lambda: wco_tsp(cities, trace="none", edge_mode="none", seed=seed, verbose=False), repeat
+        )
+        return result["best_distance"], elapsed, peak, {"iterations": result["iterations"]}
+    if algorithm == "optimal":
+        matrix = build_distance_matrix(cities)
+        (value, kind), elapsed, peak = measure(lambda: optimal_baseline(cities, matrix), repeat)
+        return value, elapsed, peak, {"kind": kind}
+    if algorithm == "nn2opt":
+        matrix = build_distance_matrix(cities)
+        value, elapsed, peak = measure(lambda: heuristic_optimal_distance(matrix), repeat)
+        return value, elapsed, peak, {}
+    if algorithm in CONSTRUCTIONS:
+        def solve():
+            matrix = build_distance_matrix(cities)
+            return tour_length(CONSTRUCTIONS[algorithm](matrix), matrix)
+        value, elapsed, peak = measure(solve, repeat)
+        return value, elapsed, peak, {}
+    raise ValueError(f"Unknown algorithm: {algorithm}")
+
+def run_benchmark(instance_names, algorithms, seed=0, matrix_limit=DEFAULT_MATRIX_LIMIT,
+                  best_known=None, repeat=3, log=print):
+    """
+    Chạy các thuật toán trên các instance; trả về dict kết quả có thể ghi ra JSON.
+    best_known: {instance: độ dài tour tốt nhất đã biết}; gap tính so với min(best_known, kết quả lần chạy này).
+    Cận dưới ("kind": "lower_bound") không phải là tour: không tính vào best_known,
+    các tour được ghi thêm gap_bound_pct so với cận dưới.
+    """
+    best_known = dict(best_known or {})
+    results = {}
+    for name in instance_names:
+        cities = INSTANCES[name]()
+        runs = {}
+        for algorithm in algorithms:
+            measured = run_algorithm(algorithm, cities, seed, matrix_limit, repeat)
+            if measured is None:
+                runs[algorithm] = {"skipped": f"more than {matrix_limit} cities"}
+                log(f"{name:<14} {algorithm:<18} skipped")
+                continue
+            length, elapsed, peak, extra = measured
+            runs[algorithm] = {
+                "tour_length": round(float(length), 2),
+                "time_s": round(elapsed, 4),
+                "peak_memory_bytes": int(peak),
+                **extra,
+            }
+            log(f"{name:<14} {algorithm:<18} {length:>14.2f} km {elapsed:>9.3f} s {peak / 2**20:>9.1f} MiB")
+
+        tours = [r for r in runs.values() if "tour_length" in r and r.get("kind") != "lower_bound"]
+        lower_bound = max(
+            (r["tour_length"] for r in runs.values() if r.get("kind") == "lower_bound"), default=None
+        )
+        lengths = [r["tour_length"] for r in tours]
+        if name in best_known:
+            lengths.append(best_known[name])
+        best = min(lengths) if lengths else None
+        for r in tours:
+            if best:
+                r["gap_pct"] = round((r["tour_length"] / best - 1) * 100, 2)
+            if lower_bound:
+                r["gap_bound_pct"] = round((r["tour_length"] / lower_bound - 1) * 100, 2)
+        results[name] = {
+            "num_cities": len(cities), "best_known": best, "lower_bound": lower_bound, "algorithms": runs,
+        }
+
+    return {
+        "meta": {
+            "seed": seed,
+            "matrix_limit": matrix_limit,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+        },
+        "instances": results,
+    }
+
+# --------------------------
+# SO SÁNH VỚI KẾT QUẢ CŨ (PHÁT HIỆN HỒI QUY)
+# --------------------------
+def compare_results(old, new, time_tolerance=0.2, length_tolerance=0.001, min_time_delta=0.05):
+    """
+    Danh sách hồi quy của new so với old: thời gian/bộ nhớ tăng quá time_tolerance
+    hoặc độ dài tour tăng quá length_tolerance (tỉ lệ).
+    Thời gian tăng dưới min_time_delta giây được coi là nhiễu đo.
+    """
+    regressions = []
+    for name, instance in new["instances"].items():
+        old_runs = old.get("instances", {}).get(name, {}).get("algorithms", {})
+        for algorithm, run in instance["algorithms"].items():
+            before = old_runs.get(algorithm)
+            if not before or "tour_length" not in before or "tour_length" not in run:
+                continue
+            checks = (
+                ("tour_length", length_tolerance),
+                ("time_s", time_tolerance),
+                ("peak_memory_bytes", time_tolerance),
+            )
+            for metric, tolerance in checks:
+                if metric == "time_s" and run[metric] - before[metric] < min_time_delta:
+                    continue
+                if run[metric] > before[metric] * (1 + tolerance):
+                    regressions.append({
+                        "instance": name, "algorithm": algorithm, "metric": metric,
+                        "old": before[metric], "new": run[metric],
+                    })
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark GBFS, WCO và optimal-distance baseline")
+    parser.add_argument("--instances", nargs="+", choices=list(INSTANCES), default=list(INSTANCES))
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, default=list(ALGORITHMS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--matrix-limit", type=int, default=DEFAULT_MATRIX_LIMIT)
+    parser.add_argument("--repeat", type=int, default=3, help="số lần chạy để lấy thời gian nhỏ nhất")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="file kết quả cũ để so sánh (thoát với mã 1 nếu có hồi quy)")
+    args = parser.parse_args(argv)
+
+    old = None
+    best_known = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+        best_known = {
+            name: instance["best_known"]
+            for name, instance in old.get("instances", {}).items() if instance.get("best_known")
+        }
+
+    results = run_benchmark(args.instances, args.algorithms, seed=args.seed,
+                            matrix_limit=args.matrix_limit, best_known=best_known, repeat=args.repeat)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True, ensure_ascii=False)
+        f.write("\n")
+    print(f"Results written to {args.output}")
+
+    if old is not None:
+        regressions = compare_results(old, results)
+        for r in regressions:
+            print(f"REGRESSION {r['instance']} {r['algorithm']} {r['metric']}: {r['old']} -> {r['new']}")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
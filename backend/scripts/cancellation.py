@@ -0,0 +1,35 @@
+import threading
+import time
+
+# --------------------------
+# HỦY GIẢI BÀI TOÁN THEO KIỂU HỢP TÁC (COOPERATIVE CANCELLATION)
+# --------------------------
+class SolveCancelled(Exception):
+    """Bài toán bị hủy trong lúc đang giải"""
+
+class DeadlineExceeded(SolveCancelled):
+    """Thuật toán dừng vì hết deadline mà chưa có kết quả dùng được (ví dụ tour GBFS chưa hoàn thành)"""
+
+class SolverCancelEvent(threading.Event):
+    """
+    Event hủy riêng của một thuật toán trong request: được coi là đã set khi chính nó được set
+    (server thôi chờ thuật toán vì quá deadline) hoặc khi event của cả request (parent) được set.
+    Chỉ is_set() xét parent; check_cancelled chỉ dùng is_set().
+    """
+
+    def __init__(self, parent=None):
+        super().__init__()
+        self.parent = parent
+
+    def is_set(self):
+        return super().is_set() or (self.parent is not None and self.parent.is_set())
+
+def check_cancelled(cancel_event):
+    """Ném SolveCancelled nếu cancel_event (threading.Event) đã được set"""
+    if cancel_event is not None and cancel_event.is_set():
+        raise SolveCancelled()
+
+def check_deadline(deadline):
+    """Ném DeadlineExceeded nếu đã qua deadline (mốc time.monotonic(); None = không giới hạn)"""
+    if deadline is not None and time.monotonic() >= deadline:
+        raise DeadlineExceeded()
@@ -0,0 +1,157 @@
+import numpy as np
+
+from cancellation import check_cancelled
+from distance_store import as_distances
+
+# --------------------------
+# HEURISTIC XÂY DỰNG TOUR NHANH (ĐẦU VÀO: MA TRẬN KHOẢNG CÁCH ĐỐI XỨNG HOẶC BACKEND CỦA distance_store)
+# --------------------------
+# Tour được lưu dạng mảng successor: succ[a] = thành phố đi ngay sau a.
+# Mọi hàm trả về tour dạng danh sách chỉ số bắt đầu tại 0, không lặp lại điểm đầu.
+# cancel_event: threading.Event; khi được set thì ném SolveCancelled ở bước kế tiếp.
+
+def _succ_to_tour(succ):
+    tour = [0]
+    current = int(succ[0])
+    while current != 0:
+        tour.append(current)
+        current = int(succ[current])
+    return tour
+
+def cheapest_insertion_tour(distance_matrix, cancel_event=None):
+    """
+    Cheapest insertion: mỗi bước chèn thành phố có chi phí chèn nhỏ nhất vào vị trí tốt nhất của nó.
+    best_cost[c] được cập nhật tăng dần theo 2 cạnh mới của mỗi lần chèn. Khi cạnh tốt nhất của c bị tách,
+    best_cost[c] vẫn là cận dưới của chi phí thật nên c chỉ bị đánh dấu "stale" và được tính lại trên cả tour
+    khi nó được chọn (lazy evaluation). O(n^2) thông thường.
+    Mỗi bước chỉ đọc vài hàng khoảng cách; độ dài cạnh của tour được lưu trong edge_len[a] = d(a, succ[a]).
+    """
+    dist = as_distances(distance_matrix)
+    n = len(dist)
+    if n < 3:
+        return list(range(n))
+
+    succ = np.zeros(n, dtype=np.intp)
+    in_tour = np.zeros(n, dtype=bool)
+    in_tour[0] = True
+    edge_len = np.zeros(n)
+    # Tour ban đầu chỉ có thành phố 0 (cạnh 0 -> 0)
+    row = dist[0]
+    best_cost = row + row
+    best_from = np.zeros(n, dtype=np.intp)
+    stale = np.zeros(n, dtype=bool)
+    best_cost[0] = np.inf
+
+    for _ in range(n - 1):
+        check_cancelled(cancel_event)
+        k = int(np.argmin(best_cost))
+        while stale[k]:
+            # Tính lại chi phí thật của k trên mọi cạnh của tour
+            a = np.nonzero(in_tour)[0]
+            row_k = dist[k]
+            costs = row_k[a] + row_k[succ[a]] - edge_len[a]
+            best = int(np.argmin(costs))
+            best_cost[k], best_from[k], stale[k] = costs[best], a[best], False
+            k = int(np.argmin(best_cost))
+
+        a = int(best_from[k])
+        b = int(succ[a])
+        row_k = dist[k]
+        succ[a], succ[k] = k, b
+        edge_len[a], edge_len[k] = row_k[a], row_k[b]
+        in_tour[k] = True
+        best_cost[k] = np.inf
+
+        remaining = np.nonzero(~in_tour)[0]
+        if not len(remaining):
+            break
+        # Cạnh (a, b) đã bị tách: chi phí đã lưu của các thành phố chọn vị trí đó trở thành cận dưới
+        stale[remaining[best_from[remaining] == a]] = True
+        # Hai cạnh mới (a, k) và (k, b); rẻ hơn cận dưới thì chắc chắn là vị trí tốt nhất
+        near_k = row_k[remaining]
+        for u, near_u in ((a, dist[a][remaining]), (k, dist[b][remaining])):
+            cost = near_u + near_k - edge_len[u]
+            mask = cost < best_cost[remaining]
+            better = remaining[mask]
+            best_cost[better] = cost[mask]
+            best_from[better] = u
+            stale[better] = False
+    return _succ_to_tour(succ)
+
+def farthest_insertion_tour(distance_matrix, cancel_event=None):
+    """
+    Farthest insertion: mỗi bước chọn thành phố xa tour nhất (max của khoảng cách nhỏ nhất tới tour)
+    và chèn vào vị trí rẻ nhất. O(n^2).
+    """
+    dist = as_distances(distance_matrix)
+    n = len(dist)
+    if n < 3:
+        return list(range(n))
+
+    succ = np.zeros(n, dtype=np.intp)
+    in_tour = np.zeros(n, dtype=bool)
+    in_tour[0] = True
+    edge_len = np.zeros(n)  # edge_len[a] = d(a, succ[a])
+    tour_nodes = np.zeros(n, dtype=np.intp)  # tour_nodes[:size] = các thành phố đã có trong tour
+    size = 1
+    min_dist = dist[0].copy()
+    min_dist[0] = -np.inf
+
+    for _ in range(n - 1):
+        check_cancelled(cancel_event)
+        k = int(np.argmax(min_dist))
+        a = tour_nodes[:size]
+        row_k = dist[k]
+        cost = row_k[a] + row_k[succ[a]] - edge_len[a]
+        best_a = int(a[np.argmin(cost)])
+        b = int(succ[best_a])
+        succ[k], succ[best_a] = b, k
+        edge_len[best_a], edge_len[k] = row_k[best_a], row_k[b]
+        in_tour[k] = True
+        tour_nodes[size] = k
+        size += 1
+        np.minimum(min_dist, row_k, out=min_dist)
+        min_dist[in_tour] = -np.inf
+    return _succ_to_tour(succ)
+
+def minimum_spanning_tree(distance_matrix, cancel_event=None):
+    """Cây khung nhỏ nhất (Prim, O(n^2) bằng NumPy). Trả về parent[i] (parent[0] = -1)."""
+    dist = as_distances(distance_matrix)
+    n = len(dist)
+    parent = np.zeros(n, dtype=np.intp)
+    parent[0] = -1
+    in_tree = np.zeros(n, dtype=bool)
+    in_tree[0] = True
+    key = dist[0].copy()
+    key[0] = np.inf
+    for _ in range(n - 1):
+        check_cancelled(cancel_event)
+        u = int(np.argmin(key))
+        in_tree[u] = True
+        key[u] = np.inf
+        row = np.where(in_tree, np.inf, dist[u])
+        np.putmask(parent, row < key, u)
+        np.minimum(key, row, out=key)
+    return parent
+
+def double_tree_tour(distance_matrix, cancel_event=None):
+    """
+    Double tree: duyệt cây khung nhỏ nhất theo thứ tự trước (DFS từ 0), bỏ qua đỉnh đã thăm.
+    Với khoảng cách thỏa bất đẳng thức tam giác, tour dài không quá 2 lần tối ưu. O(n^2).
+    """
+    n = len(distance_matrix)
+    if n < 3:
+        return list(range(n))
+
+    parent = minimum_spanning_tree(distance_matrix, cancel_event)
+    children = [[] for _ in range(n)]
+    for child in range(1, n):
+        children[parent[child]].append(child)
+
+    tour = []
+    stack = [0]
+    while stack:
+        node = stack.pop()
+        tour.append(node)
+        stack.extend(reversed(children[node]))
+    return tour
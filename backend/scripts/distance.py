@@ -0,0 +1,155 @@
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371  # km
+
+# Hàm tính khoảng cách giữa hai thành phố ( Haversine )
+def haversine_distance(lat1, lon1, lat2, lon2):
+    """Calculate Haversine distance between two points in km"""
+    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = math.sin(dlat/2)**2 + math.cos(lat1)*math.cos(lat2)*math.sin(dlon/2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+    return EARTH_RADIUS_KM * c
+
+# --------------------------
+# MA TRẬN KHOẢNG CÁCH DÙNG CHUNG (NumPy)
+# --------------------------
+def build_distance_matrix(city_data):
+    """
+    Tạo ma trận khoảng cách n×n (km) bằng NumPy broadcasting.
+    Cùng công thức với haversine_distance nên kết quả khớp với bản tính từng cặp.
+    """
+    lat = np.radians(np.array([c["lat"] for c in city_data], dtype=np.float64))
+    lng = np.radians(np.array([c["lng"] for c in city_data], dtype=np.float64))
+
+    dlat = lat[None, :] - lat[:, None]
+    dlng = lng[None, :] - lng[:, None]
+    a = np.sin(dlat/2)**2 + np.cos(lat)[:, None]*np.cos(lat)[None, :]*np.sin(dlng/2)**2
+    # Chặn sai số làm tròn để sqrt(1-a) không âm
+    np.clip(a, 0.0, 1.0, out=a)
+    distance_matrix = EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
+    np.fill_diagonal(distance_matrix, 0.0)
+    return distance_matrix
+
+def haversine_row(lat, lng, lats, lngs):
+    """
+    Khoảng cách (km) từ một điểm đến từng điểm trong lats/lngs (tất cả tính bằng radian), O(n).
+    Cùng công thức với build_distance_matrix nên khớp với một hàng của ma trận.
+    """
+    a = np.sin((lats - lat)/2)**2 + np.cos(lat)*np.cos(lats)*np.sin((lngs - lng)/2)**2
+    np.clip(a, 0.0, 1.0, out=a)
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
+
+# --------------------------
+# CACHE MA TRẬN KHOẢNG CÁCH GIỮA CÁC REQUEST
+# --------------------------
+def canonical_city_order(city_data):
+    """
+    Sắp xếp các thành phố theo (name, lat, lng) để tập thành phố giống nhau
+    luôn cho cùng một thứ tự, bất kể thứ tự trong request.
+    Trả về (key, order) với order[k] = chỉ số trong city_data của thành phố thứ k sau khi sắp xếp.
+    """
+    records = [(str(c["name"]), float(c["lat"]), float(c["lng"])) for c in city_data]
+    order = sorted(range(len(records)), key=lambda i: records[i])
+    digest = hashlib.sha1(repr([records[i] for i in order]).encode("utf-8")).hexdigest()
+    return digest, order
+
+def distance_cache_key(city_data, distance_matrix):
+    """
+    Khóa cache cho kết quả tính trên khoảng cách của một tập thành phố (Held-Karp, cận dưới).
+    Gồm hash của tập thành phố và dấu vân tay O(n) của chính các khoảng cách
+    (cạnh order[k] -> order[k+1] và order[k] -> order[2k+1] theo thứ tự chuẩn), để cùng tập thành phố
+    với nguồn khoảng cách khác (đường bộ / Haversine) không dùng nhầm kết quả của nhau.
+    distance_matrix: ma trận hoặc backend của distance_store, cùng thứ tự với city_data.
+    Trả về (key, order) như canonical_city_order.
+    """
+    digest, order = canonical_city_order(city_data)
+    if not hasattr(distance_matrix, "shape"):
+        distance_matrix = np.asarray(distance_matrix, dtype=np.float64)
+    idx = np.asarray(order, dtype=np.intp)
+    k = np.arange(len(idx))
+    rows = np.concatenate((idx, idx))
+    cols = np.concatenate((idx[(k + 1) % len(idx)], idx[(2 * k + 1) % len(idx)]))
+    values = np.asarray(distance_matrix[rows, cols], dtype=np.float64)
+    return f"{digest}:{hashlib.sha1(values.tobytes()).hexdigest()}", order
+
+class DistanceMatrixCache:
+    """
+    LRU cache các ma trận khoảng cách, giới hạn theo tổng số byte.
+    Ma trận được lưu theo thứ tự chuẩn; request có thứ tự khác được phục vụ bằng cách hoán vị chỉ số.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, city_data):
+        """Trả về ma trận khoảng cách theo đúng thứ tự của city_data"""
+        key, order = canonical_city_order(city_data)
+
+        with self._lock:
+            canonical_matrix = self._entries.get(key)
+            if canonical_matrix is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if canonical_matrix is None:
+            canonical_matrix = build_distance_matrix([city_data[i] for i in order])
+            self._store(key, canonical_matrix)
+
+        # rank[i] = vị trí của city_data[i] trong thứ tự chuẩn
+        rank = np.empty(len(order), dtype=np.intp)
+        rank[order] = np.arange(len(order))
+        return canonical_matrix[np.ix_(rank, rank)]
+
+    def _store(self, key, matrix):
+        size = matrix.nbytes
+        if size > self.max_bytes:
+            return  # quá lớn, không cache
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = matrix
+            self.current_bytes += size
+            # Loại bỏ các ma trận ít dùng nhất cho đến khi đủ bộ nhớ
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+# Cache dùng chung trong toàn bộ process
+distance_cache = DistanceMatrixCache()
+
+def get_distance_matrix(city_data):
+    """Lấy ma trận khoảng cách qua cache dùng chung của process"""
+    return distance_cache.get(city_data)
@@ -0,0 +1,170 @@
+import os
+
+import numpy as np
+
+from distance import EARTH_RADIUS_KM, get_distance_matrix
+from road_distance import road_matrix_for
+
+# Cách lưu khoảng cách (ngoài ra "road": ma trận đường bộ tính sẵn của road_distance khi phủ hết các thành phố):
+# "dense":     ma trận n×n float64 qua cache dùng chung (như cũ, nhanh nhất)
+# "condensed": tam giác trên dạng phẳng float32, n(n-1)/2 phần tử (~1/4 bộ nhớ của dense)
+# "ondemand":  không lưu khoảng cách, tính Haversine khi cần từ các mảng radian/cos đã tính sẵn (O(n) bộ nhớ)
+DISTANCE_BACKENDS = ("dense", "condensed", "ondemand")
+# Ngưỡng bộ nhớ: dense khi n×n float64 không quá DENSE_MAX_BYTES (mặc định bằng dung lượng cache ma trận),
+# condensed khi tam giác trên float32 không quá MEMORY_CAP_BYTES, ngược lại ondemand
+DENSE_MAX_BYTES = int(os.environ.get('DISTANCE_DENSE_MAX_BYTES', 256 * 1024 * 1024))
+MEMORY_CAP_BYTES = int(os.environ.get('DISTANCE_MEMORY_CAP', 1024 * 1024 * 1024))
+
+def validate_distance_backend(backend):
+    if backend not in DISTANCE_BACKENDS:
+        raise ValueError(f"Invalid distance backend: {backend}")
+
+def choose_backend(num_cities, dense_max_bytes=None, memory_cap=None):
+    """Cách lưu khoảng cách cho num_cities thành phố (DISTANCE_BACKEND=... để ép một cách cố định)"""
+    forced = os.environ.get('DISTANCE_BACKEND', 'auto')
+    if forced != 'auto':
+        validate_distance_backend(forced)
+        return forced
+    dense_max_bytes = DENSE_MAX_BYTES if dense_max_bytes is None else dense_max_bytes
+    memory_cap = MEMORY_CAP_BYTES if memory_cap is None else memory_cap
+    if num_cities * num_cities * 8 <= dense_max_bytes:
+        return "dense"
+    if num_cities * (num_cities - 1) // 2 * 4 <= memory_cap:
+        return "condensed"
+    return "ondemand"
+
+# --------------------------
+# GIAO DIỆN CHUNG: TRUY CẬP NHƯ MA TRẬN NumPy
+# --------------------------
+class RowDistances:
+    """
+    Khoảng cách đối xứng không lưu dạng ma trận n×n, truy cập bằng cú pháp của ma trận NumPy
+    để các thuật toán dùng chung một cách viết:
+    d[i] (một hàng), d[i, j], d[rows, cols] (gather từng phần tử, broadcast như NumPy),
+    d[i, a:b] / d[:, j] (lát cắt của một hàng/cột).
+    Lớp con cài đặt row(i) và pairs(rows, cols). np.asarray(d) tạo ma trận đầy đủ (tốn O(n^2) bộ nhớ).
+    """
+
+    def __init__(self, num_cities):
+        self.n = num_cities
+        self.shape = (num_cities, num_cities)
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            return self.row(int(key))
+        rows, cols = key
+        if isinstance(rows, slice):
+            return self.row(int(cols))[rows]  # đối xứng: cột j = hàng j
+        if isinstance(cols, slice):
+            return self.row(int(rows))[cols]
+        rows, cols = np.broadcast_arrays(np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp))
+        values = self.pairs(rows.ravel(), cols.ravel()).reshape(rows.shape)
+        return float(values) if values.ndim == 0 else values
+
+    def __array__(self, dtype=None, copy=None):
+        dense = np.stack([self.row(i) for i in range(self.n)]) if self.n else np.zeros((0, 0))
+        return dense if dtype is None else dense.astype(dtype, copy=False)
+
+def haversine_pairs(lat1, lng1, cos1, lat2, lng2, cos2):
+    """Haversine (km) từng cặp điểm, cos của vĩ độ đã tính sẵn (cùng công thức với build_distance_matrix)"""
+    a = np.sin((lat2 - lat1)/2)**2 + cos1*cos2*np.sin((lng2 - lng1)/2)**2
+    np.clip(a, 0.0, 1.0, out=a)
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
+
+class OnDemandDistances(RowDistances):
+    """Tính Haversine khi cần từ lat/lng radian và cos(lat) đã tính sẵn: O(n) bộ nhớ, O(n) mỗi hàng"""
+
+    def __init__(self, city_data):
+        super().__init__(len(city_data))
+        self.lat = np.radians(np.array([c["lat"] for c in city_data], dtype=np.float64))
+        self.lng = np.radians(np.array([c["lng"] for c in city_data], dtype=np.float64))
+        self.cos_lat = np.cos(self.lat)
+        self.nbytes = self.lat.nbytes * 3
+
+    def row(self, i):
+        return haversine_pairs(self.lat[i], self.lng[i], self.cos_lat[i], self.lat, self.lng, self.cos_lat)
+
+    def pairs(self, rows, cols):
+        return haversine_pairs(
+            self.lat[rows], self.lng[rows], self.cos_lat[rows], self.lat[cols], self.lng[cols], self.cos_lat[cols]
+        )
+
+class CondensedDistances(RowDistances):
+    """
+    Tam giác trên (i < j) của ma trận khoảng cách dạng mảng phẳng float32, theo thứ tự hàng.
+    Cặp (i, j), i < j, nằm ở vị trí offsets[i] + (j - i - 1); đường chéo luôn là 0.
+    Sai số float32 cỡ 1e-4 km ở khoảng cách vài nghìn km.
+    """
+
+    def __init__(self, city_data):
+        n = len(city_data)
+        super().__init__(n)
+        source = OnDemandDistances(city_data)
+        sizes = np.arange(n - 1, -1, -1)  # số phần tử của hàng i
+        self.offsets = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.intp)
+        self.data = np.empty(n * (n - 1) // 2, dtype=np.float32)
+        lat, lng, cos_lat = source.lat, source.lng, source.cos_lat
+        for i in range(n - 1):
+            self.data[self.offsets[i]:self.offsets[i] + n - i - 1] = haversine_pairs(
+                lat[i], lng[i], cos_lat[i], lat[i + 1:], lng[i + 1:], cos_lat[i + 1:]
+            )
+        # Phần j < i của hàng i nằm ở column_base[j] + i (cột i của tam giác trên)
+        self.column_base = self.offsets - np.arange(n) - 1
+        self.nbytes = self.data.nbytes + self.offsets.nbytes + self.column_base.nbytes
+
+    def row(self, i):
+        out = np.empty(self.n, dtype=np.float64)
+        out[:i] = self.data[self.column_base[:i] + i]
+        out[i] = 0.0
+        out[i + 1:] = self.data[self.offsets[i]:self.offsets[i] + self.n - i - 1]
+        return out
+
+    def pairs(self, rows, cols):
+        lo = np.minimum(rows, cols)
+        hi = np.maximum(rows, cols)
+        same = lo == hi
+        index = self.offsets[lo] + (hi - lo - 1)
+        index[same] = 0  # đường chéo: chỉ số bất kỳ hợp lệ, giá trị được đặt lại bằng 0
+        values = self.data[index].astype(np.float64)
+        values[same] = 0.0
+        return values
+
+def as_distances(distance_matrix):
+    """Ma trận float64 cho dữ liệu dạng mảng/list, giữ nguyên các backend RowDistances"""
+    if isinstance(distance_matrix, RowDistances):
+        return distance_matrix
+    return np.asarray(distance_matrix, dtype=np.float64)
+
+# --------------------------
+# ĐIỂM TRUY CẬP DUY NHẤT CHO CÁC THUẬT TOÁN
+# --------------------------
+def resolve_backend(city_data):
+    """Nguồn/cách lưu khoảng cách get_distances sẽ dùng: "road" nếu ma trận đường bộ phủ hết, ngược lại choose_backend"""
+    if road_matrix_for(city_data) is not None:
+        return "road"
+    return choose_backend(len(city_data))
+
+def distance_source(city_data):
+    """Giá trị "distance_source" của response: "road" | "haversine" (road_distance.DISTANCE_SOURCES)"""
+    return "road" if resolve_backend(city_data) == "road" else "haversine"
+
+def get_distances(city_data, backend=None):
+    """
+    Khoảng cách giữa các thành phố theo đúng thứ tự của city_data.
+    Mọi thành phố có trong ma trận đường bộ tính sẵn (ROAD_DISTANCE_MATRIX) thì dùng ma trận đó (dense).
+    backend: một trong DISTANCE_BACKENDS cho khoảng cách Haversine; None = chọn theo số thành phố.
+    "dense" đi qua cache ma trận dùng chung; các backend gọn được tạo cho từng request.
+    """
+    road = road_matrix_for(city_data)
+    if road is not None:
+        return road.submatrix(city_data)
+    backend = choose_backend(len(city_data)) if backend is None else backend
+    validate_distance_backend(backend)
+    if backend == "dense":
+        return get_distance_matrix(city_data)
+    if backend == "condensed":
+        return CondensedDistances(city_data)
+    return OnDemandDistances(city_data)
@@ -0,0 +1,91 @@
+import numpy as np
+
+from local_search import nearest_neighbor_lists
+from distance_store import RowDistances
+from spatial import SphereGrid, unit_sphere_coords
+
+# --------------------------
+# DANH SÁCH CẠNH GỬI CHO FRONTEND
+# --------------------------
+# "all":  mọi cặp i<j (như cũ, n(n-1)/2 cạnh)
+# "knn":  chỉ k cạnh gần nhất của mỗi thành phố (frontend chỉ vẽ các cạnh gần)
+# "none": không gửi cạnh
+EDGE_MODES = ("all", "knn", "none")
+
+def validate_edge_mode(mode):
+    if mode not in EDGE_MODES:
+        raise ValueError(f"Invalid edge mode: {mode}")
+
+def _edge_dicts(cities, distance_matrix, rows, cols):
+    distances = np.round(distance_matrix[rows, cols], 2).tolist()
+    return [
+        {"from": cities[i], "to": cities[j], "distance": d}
+        for i, j, d in zip(rows.tolist(), cols.tolist(), distances)
+    ]
+
+def knn_edge_pairs(distance_matrix, k=5):
+    """Các cặp (i, j), i<j, nằm trong k láng giềng gần nhất của i hoặc của j"""
+    n = len(distance_matrix)
+    neighbors = nearest_neighbor_lists(distance_matrix, k)
+    rows = np.repeat(np.arange(n), neighbors.shape[1])
+    cols = neighbors.ravel()
+    pairs = np.unique(np.stack([np.minimum(rows, cols), np.maximum(rows, cols)], axis=1), axis=0)
+    return pairs[:, 0], pairs[:, 1]
+
+def build_edges(city_data, distance_matrix, mode="all", k=5):
+    """Tạo danh sách cạnh (làm tròn distance) theo mode"""
+    validate_edge_mode(mode)
+    cities = [c["name"] for c in city_data]
+    if mode == "none" or len(cities) < 2:
+        return []
+    if mode == "knn":
+        rows, cols = knn_edge_pairs(distance_matrix, k)
+    elif isinstance(distance_matrix, RowDistances):
+        raise ValueError("edge_mode 'all' requires the full distance matrix; use 'knn' or 'none'")
+    else:
+        rows, cols = np.triu_indices(len(cities), k=1)
+    return _edge_dicts(cities, distance_matrix, rows, cols)
+
+def edge_page(city_data, distance_matrix, offset=0, limit=1000):
+    """
+    Một trang của danh sách mọi cặp i<j (theo thứ tự hàng), không tạo toàn bộ danh sách.
+    Trả về (edges, total).
+    """
+    cities = [c["name"] for c in city_data]
+    n = len(cities)
+    total = n * (n - 1) // 2
+    offset = max(0, int(offset))
+    end = min(total, offset + max(0, int(limit)))
+    if offset >= end:
+        return [], total
+
+    # row_starts[i] = vị trí của cạnh (i, i+1) trong danh sách phẳng
+    row_sizes = np.arange(n - 1, 0, -1)
+    row_starts = np.concatenate(([0], np.cumsum(row_sizes)[:-1]))
+    flat = np.arange(offset, end)
+    rows = np.searchsorted(row_starts, flat, side="right") - 1
+    cols = flat - row_starts[rows] + rows + 1
+    return _edge_dicts(cities, distance_matrix, rows, cols), total
+
+def build_spatial_edges(city_data, mode="knn", k=5, coords=None):
+    """
+    Tạo danh sách cạnh mà không cần ma trận khoảng cách (dùng SphereGrid).
+    Chỉ hỗ trợ "knn" và "none"; "all" cần n(n-1)/2 cạnh nên phải dùng build_edges.
+    """
+    validate_edge_mode(mode)
+    if mode == "all":
+        raise ValueError("edge_mode 'all' requires the full distance matrix; use 'knn' or 'none'")
+    cities = [c["name"] for c in city_data]
+    if mode == "none" or len(cities) < 2:
+        return []
+    if coords is None:
+        coords = unit_sphere_coords(city_data)
+    grid = SphereGrid(coords)
+    pairs = {}
+    for i in range(len(cities)):
+        for j, d in grid.nearest_k(i, k):
+            pairs[(min(i, j), max(i, j))] = d
+    return [
+        {"from": cities[i], "to": cities[j], "distance": round(pairs[(i, j)], 2)}
+        for i, j in sorted(pairs)
+    ]
@@ -0,0 +1,103 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from distance import distance_cache_key
+
+# Giới hạn số thành phố cho lời giải chính xác: bảng DP có 2^(n-1) × (n-1) ô
+# (n = 18: ~18 MB float64, dưới 1 giây)
+HELD_KARP_MAX_CITIES = 18
+
+# --------------------------
+# HELD-KARP: QUY HOẠCH ĐỘNG TRÊN BITMASK, VECTOR HÓA THEO TẬP CON
+# --------------------------
+def held_karp(distance_matrix):
+    """
+    Tour tối ưu chính xác bắt đầu tại thành phố 0.
+    dp[mask, j] = độ dài ngắn nhất đi từ 0 qua đúng các thành phố trong mask (bit j ứng với thành phố j+1)
+    và kết thúc tại j+1. Mỗi lớp tập con cùng số phần tử được tính bằng một phép min của NumPy cho mỗi j.
+    Trả về (độ dài, tour dạng mảng chỉ số không lặp lại điểm đầu).
+    """
+    dist = np.asarray(distance_matrix, dtype=np.float64)
+    n = len(dist)
+    if n < 2:
+        return 0.0, list(range(n))
+    if n == 2:
+        return float(dist[0, 1] + dist[1, 0]), [0, 1]
+
+    m = n - 1
+    inner = dist[1:, 1:]
+    num_masks = 1 << m
+    dp = np.full((num_masks, m), np.inf)
+    parent = np.full((num_masks, m), -1, dtype=np.int8)
+    singles = 1 << np.arange(m)
+    dp[singles, np.arange(m)] = dist[0, 1:]
+
+    masks = np.arange(num_masks)
+    popcount = np.zeros(num_masks, dtype=np.int8)
+    for j in range(m):
+        popcount += ((masks >> j) & 1).astype(np.int8)
+
+    for size in range(2, m + 1):
+        layer = masks[popcount == size]
+        for j in range(m):
+            with_j = layer[(layer >> j) & 1 == 1]
+            # Đến j+1 từ i+1, với i thuộc mask \ {j} (các ô i ngoài mask đã là inf)
+            costs = dp[with_j ^ (1 << j)] + inner[:, j]
+            best = np.argmin(costs, axis=1)
+            dp[with_j, j] = costs[np.arange(len(with_j)), best]
+            parent[with_j, j] = best
+
+    full = num_masks - 1
+    closing = dp[full] + dist[1:, 0]
+    last = int(np.argmin(closing))
+    length = float(closing[last])
+
+    # Truy vết tour từ thành phố cuối về đầu
+    tour = []
+    mask = full
+    while last >= 0:
+        tour.append(last + 1)
+        previous = int(parent[mask, last])
+        mask ^= 1 << last
+        last = previous
+    tour.append(0)
+    tour.reverse()
+    return length, tour
+
+# --------------------------
+# CACHE KẾT QUẢ THEO TẬP THÀNH PHỐ VÀ KHOẢNG CÁCH
+# --------------------------
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+CACHE_SIZE = 256
+
+def exact_tour(city_data, distance_matrix):
+    """
+    Held-Karp có nhớ kết quả theo tập thành phố và khoảng cách (distance_cache_key).
+    distance_matrix phải cùng thứ tự với city_data.
+    Trả về (độ dài, tour theo chỉ số của city_data bắt đầu tại 0).
+    """
+    key, order = distance_cache_key(city_data, distance_matrix)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+
+    if cached is None:
+        order_idx = np.asarray(order, dtype=np.intp)
+        cached = held_karp(np.asarray(distance_matrix)[np.ix_(order_idx, order_idx)])
+        with _cache_lock:
+            _cache[key] = cached
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+
+    length, canonical_tour = cached
+    tour = [order[i] for i in canonical_tour]
+    start = tour.index(0)
+    return length, tour[start:] + tour[:start]
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,135 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from cancellation import SolveCancelled
+
+# --------------------------
+# HỆ THỐNG JOB GIẢI BÀI TOÁN BẤT ĐỒNG BỘ
+# --------------------------
+class QueueFullError(Exception):
+    """Hàng đợi job đã đầy (server trả về HTTP 429)"""
+
+class Job:
+    """Một lần giải bài toán chạy nền"""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = "queued"  # queued | running | succeeded | failed | cancelled
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self.future = None
+
+    def to_dict(self, include_result=True):
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.error is not None:
+            data["error"] = self.error
+        if include_result and self.result is not None:
+            data["result"] = self.result
+        return data
+
+class JobManager:
+    """
+    Chạy các job trên worker pool giới hạn.
+    Tối đa max_workers job chạy cùng lúc và max_queue job chờ; vượt quá thì submit ném QueueFullError.
+    Job đã kết thúc được giữ lại result_ttl giây để client lấy kết quả.
+    """
+
+    def __init__(self, max_workers=4, max_queue=16, result_ttl=600):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="solve-job")
+        self._jobs = {}
+        self._active = 0  # số job đang chờ hoặc đang chạy
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Đưa fn(*args, cancel_event=..., **kwargs) vào hàng đợi, trả về Job.
+        fn cần kiểm tra cancel_event định kỳ (ném SolveCancelled khi bị hủy).
+        """
+        job = Job()
+        with self._lock:
+            self._prune_locked()
+            if self._active >= self.max_workers + self.max_queue:
+                raise QueueFullError("Job queue is full")
+            self._active += 1
+            self._jobs[job.id] = job
+        job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        try:
+            with self._lock:
+                if job.cancel_event.is_set():
+                    return
+                job.status = "running"
+                job.started_at = time.time()
+            result = fn(*args, cancel_event=job.cancel_event, **kwargs)
+            self._finish(job, "succeeded", result=result)
+        except SolveCancelled:
+            self._finish(job, "cancelled")
+        except Exception as e:
+            self._finish(job, "failed", error=str(e))
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _finish(self, job, status, result=None, error=None):
+        with self._lock:
+            if job.status == "cancelled":
+                return
+            job.status = status
+            job.result = result
+            job.error = error
+            job.finished_at = time.time()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Yêu cầu hủy job; trả về Job (hoặc None nếu không tồn tại)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status in ("queued", "running"):
+                job.cancel_event.set()
+                job.status = "cancelled"
+                job.finished_at = time.time()
+            return job
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {
+                "active": self._active,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "jobs": counts,
+            }
+
+    def _prune_locked(self):
+        """Xóa các job đã kết thúc quá result_ttl giây"""
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self.result_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
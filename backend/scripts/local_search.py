@@ -0,0 +1,363 @@
+import time
+from collections import deque
+
+import numpy as np
+
+from distance_store import RowDistances
+
+# Ngưỡng để bỏ qua các cải thiện do sai số làm tròn số thực
+EPSILON = 1e-9
+
+# --------------------------
+# CÁC HÀM TIỆN ÍCH CHO TOUR DẠNG MẢNG CHỈ SỐ
+# --------------------------
+def tour_length(tour, distance_matrix):
+    """Tổng độ dài chu trình (tour là mảng chỉ số, không lặp lại điểm đầu ở cuối)"""
+    tour = np.asarray(tour, dtype=np.intp)
+    return float(np.sum(distance_matrix[tour, np.roll(tour, -1)]))
+
+def nearest_neighbor_lists(distance_matrix, k=10):
+    """
+    Danh sách k láng giềng gần nhất của mỗi thành phố, sắp xếp tăng dần theo khoảng cách.
+    Trả về mảng (n, k) các chỉ số.
+    Với backend không phải ma trận (distance_store) danh sách được tạo từng hàng, bộ nhớ O(n·k).
+    """
+    n = len(distance_matrix)
+    k = max(0, min(k, n - 1))
+    if k == 0:
+        return np.empty((n, 0), dtype=np.intp)
+    if isinstance(distance_matrix, RowDistances):
+        return np.array([row_neighbors(distance_matrix, i, k) for i in range(n)], dtype=np.intp)
+
+    masked = np.array(distance_matrix, dtype=np.float64, copy=True)
+    np.fill_diagonal(masked, np.inf)  # không chọn chính nó
+    candidates = np.argpartition(masked, k - 1, axis=1)[:, :k]
+    candidate_dist = np.take_along_axis(masked, candidates, axis=1)
+    order = np.argsort(candidate_dist, axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1)
+
+def rotate_to_start(tour, start):
+    """Xoay chu trình để bắt đầu tại thành phố start"""
+    tour = list(tour)
+    i = tour.index(start)
+    return tour[i:] + tour[:i]
+
+# --------------------------
+# 2-OPT: DELTA O(1) + NEIGHBOR LISTS + DON'T-LOOK BITS
+# --------------------------
+def two_opt(tour, distance_matrix, neighbors=None, k=10, deadline=None):
+    """
+    Cải thiện tour bằng 2-opt trên mảng chỉ số.
+    - Mỗi nước đi được đánh giá O(1) từ 4 cạnh bị ảnh hưởng
+    - Chỉ xét ứng viên trong k láng giềng gần nhất
+    - Don't-look bits: chỉ xét lại các thành phố có cạnh vừa thay đổi
+    deadline: mốc time.perf_counter() để dừng sớm (None = chạy đến khi hội tụ)
+    Trả về (tour mới bắt đầu tại cùng thành phố, độ dài tour).
+    """
+    tour = [int(c) for c in tour]
+    n = len(tour)
+    if n < 4:
+        return tour, tour_length(tour, distance_matrix)
+
+    if neighbors is None:
+        neighbors = nearest_neighbor_lists(distance_matrix, k)
+    neigh = neighbors.tolist() if isinstance(neighbors, np.ndarray) else neighbors
+    # list lồng nhau truy cập từng phần tử nhanh hơn ndarray trong vòng lặp Python
+    dist = distance_matrix.tolist() if isinstance(distance_matrix, np.ndarray) else distance_matrix
+
+    start = tour[0]
+    pos = [0] * n
+    for i, city in enumerate(tour):
+        pos[city] = i
+
+    def reverse(i, j):
+        """Đảo đoạn vòng từ vị trí i đến j (đi theo chiều thuận); đảo phần bù nếu ngắn hơn"""
+        length = (j - i) % n + 1
+        if length * 2 > n:
+            i, j = (j + 1) % n, (i - 1) % n
+            length = n - length
+        for _ in range(length // 2):
+            ci, cj = tour[i], tour[j]
+            tour[i], tour[j] = cj, ci
+            pos[cj], pos[ci] = i, j
+            i = (i + 1) % n
+            j = (j - 1) % n
+
+    queue = deque(tour)
+    in_queue = [True] * n  # don't-look bit = not in_queue
+
+    def wake(*cities):
+        for city in cities:
+            if not in_queue[city]:
+                in_queue[city] = True
+                queue.append(city)
+
+    while queue:
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        a = queue.popleft()
+        in_queue[a] = False
+        row_a = dist[a]
+
+        for forward in (True, False):
+            i = pos[a]
+            b = tour[(i + 1) % n] if forward else tour[i - 1]
+            d_ab = row_a[b]
+            moved = False
+
+            for c in neigh[a]:
+                d_ac = row_a[c]
+                if d_ac >= d_ab:
+                    break  # láng giềng đã sắp xếp, không còn ứng viên có lợi
+                if forward:
+                    d = tour[(pos[c] + 1) % n]
+                else:
+                    d = tour[pos[c] - 1]
+                if c == b or d == a:
+                    continue
+
+                delta = d_ac + dist[b][d] - d_ab - dist[c][d]
+                if delta < -EPSILON:
+                    if forward:
+                        reverse(pos[b], pos[c])  # (a,b),(c,d) -> (a,c),(b,d)
+                    else:
+                        reverse(pos[a], pos[d])  # (b,a),(d,c) -> (a,c),(b,d)
+                    wake(a, b, c, d)
+                    moved = True
+                    break
+            if moved:
+                break
+
+    tour = rotate_to_start(tour, start)
+    return tour, tour_length(tour, distance_matrix)
+
+# --------------------------
+# 2-OPT CỤC BỘ: SỬA TOUR QUANH VÀI THÀNH PHỐ VỪA THAY ĐỔI
+# --------------------------
+def row_neighbors(distance_matrix, city, k=10):
+    """k láng giềng gần nhất của một thành phố từ hàng ma trận của nó, O(n)"""
+    row = distance_matrix[city]
+    k = min(k, len(row) - 1)
+    if k <= 0:
+        return []
+    candidates = np.argpartition(row, k)[:k + 1]
+    candidates = candidates[candidates != city][:k]
+    return candidates[np.argsort(row[candidates], kind="stable")].tolist()
+
+def local_two_opt(tour, distance_matrix, cities, k=10, max_moves=None):
+    """
+    2-opt như two_opt nhưng hàng đợi ban đầu chỉ gồm cities (ví dụ các thành phố vừa chèn
+    hoặc vừa được nối lại) và láng giềng gần nhất được tính theo từng hàng khi thành phố được xét,
+    nên không cần neighbor lists hay bản sao list của cả ma trận: mỗi nước đi tốn O(n).
+    max_moves: số nước đi tối đa (None = n)
+    Trả về (tour mới bắt đầu tại cùng thành phố, độ dài tour).
+    """
+    tour = [int(c) for c in tour]
+    n = len(tour)
+    if n < 4:
+        return tour, tour_length(tour, distance_matrix)
+    max_moves = n if max_moves is None else max_moves
+
+    dist = distance_matrix
+    start = tour[0]
+    pos = [0] * n
+    for i, city in enumerate(tour):
+        pos[city] = i
+    neigh = {}
+
+    def reverse(i, j):
+        length = (j - i) % n + 1
+        if length * 2 > n:
+            i, j = (j + 1) % n, (i - 1) % n
+            length = n - length
+        for _ in range(length // 2):
+            ci, cj = tour[i], tour[j]
+            tour[i], tour[j] = cj, ci
+            pos[cj], pos[ci] = i, j
+            i = (i + 1) % n
+            j = (j - 1) % n
+
+    queue = deque(dict.fromkeys(int(c) for c in cities))
+    in_queue = [False] * n
+    for city in queue:
+        in_queue[city] = True
+
+    def wake(*woken):
+        for city in woken:
+            if not in_queue[city]:
+                in_queue[city] = True
+                queue.append(city)
+
+    moves = 0
+    while queue and moves < max_moves:
+        a = queue.popleft()
+        in_queue[a] = False
+        if a not in neigh:
+            neigh[a] = row_neighbors(dist, a, k)
+        row_a = dist[a]
+
+        for forward in (True, False):
+            i = pos[a]
+            b = tour[(i + 1) % n] if forward else tour[i - 1]
+            d_ab = row_a[b]
+            moved = False
+
+            for c in neigh[a]:
+                d_ac = row_a[c]
+                if d_ac >= d_ab:
+                    break
+                d = tour[(pos[c] + 1) % n] if forward else tour[pos[c] - 1]
+                if c == b or d == a:
+                    continue
+
+                delta = d_ac + dist[b, d] - d_ab - dist[c, d]
+                if delta < -EPSILON:
+                    if forward:
+                        reverse(pos[b], pos[c])
+                    else:
+                        reverse(pos[a], pos[d])
+                    wake(a, b, c, d)
+                    moved = True
+                    moves += 1
+                    break
+            if moved:
+                break
+
+    tour = rotate_to_start(tour, start)
+    return tour, tour_length(tour, distance_matrix)
+
+# --------------------------
+# OR-OPT: DI CHUYỂN ĐOẠN 1..3 THÀNH PHỐ (CÓ THỂ ĐẢO CHIỀU - BIẾN THỂ 3-OPT)
+# --------------------------
+def or_opt(tour, distance_matrix, neighbors=None, k=10, max_segment=3, deadline=None):
+    """
+    Cải thiện tour bằng Or-opt: cắt một đoạn liên tiếp dài 1..max_segment
+    và chèn vào giữa hai thành phố kề nhau khác, giữ nguyên hoặc đảo chiều đoạn.
+    Delta mỗi nước đi tính O(1) từ các cạnh bị thay đổi; chỉ xét vị trí chèn
+    cạnh k láng giềng gần nhất của hai đầu đoạn.
+    Trả về (tour mới bắt đầu tại cùng thành phố, độ dài tour).
+    """
+    tour = [int(c) for c in tour]
+    n = len(tour)
+    if n < 5:
+        return tour, tour_length(tour, distance_matrix)
+
+    if neighbors is None:
+        neighbors = nearest_neighbor_lists(distance_matrix, k)
+    neigh = neighbors.tolist() if isinstance(neighbors, np.ndarray) else neighbors
+    dist = distance_matrix.tolist() if isinstance(distance_matrix, np.ndarray) else distance_matrix
+    max_segment = max(1, min(max_segment, n - 3))
+
+    start = tour[0]
+    pos = [0] * n
+    for i, city in enumerate(tour):
+        pos[city] = i
+
+    queue = deque(tour)
+    in_queue = [True] * n
+
+    def wake(*cities):
+        for city in cities:
+            if not in_queue[city]:
+                in_queue[city] = True
+                queue.append(city)
+
+    def best_move(s1):
+        """Tìm nước đi cải thiện đầu tiên cho các đoạn bắt đầu tại s1"""
+        i = pos[s1]
+        p = tour[i - 1]
+        for length in range(1, max_segment + 1):
+            segment_pos = [(i + t) % n for t in range(length)]
+            segment = [tour[q] for q in segment_pos]
+            s_last = segment[-1]
+            nx = tour[(i + length) % n]
+            if nx == p:
+                break
+            removal_gain = dist[p][s1] + dist[s_last][nx] - dist[p][nx]
+            if removal_gain <= EPSILON:
+                continue
+            in_segment = set(segment)
+
+            for end in (s1, s_last):
+                for x in neigh[end]:
+                    if x in in_segment:
+                        continue
+                    # Hai khe chèn quanh x: (pred(x), x) và (x, succ(x))
+                    for c, d in ((tour[pos[x] - 1], x), (x, tour[(pos[x] + 1) % n])):
+                        if c in in_segment or d in in_segment:
+                            continue
+                        d_cd = dist[c][d]
+                        forward_cost = dist[c][s1] + dist[s_last][d] - d_cd
+                        reverse_cost = dist[c][s_last] + dist[s1][d] - d_cd
+                        if forward_cost <= reverse_cost:
+                            delta, reverse = forward_cost - removal_gain, False
+                        else:
+                            delta, reverse = reverse_cost - removal_gain, True
+                        if delta < -EPSILON:
+                            return segment, p, nx, c, d, reverse
+        return None
+
+    while queue:
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        s1 = queue.popleft()
+        in_queue[s1] = False
+
+        move = best_move(s1)
+        if move is None:
+            continue
+
+        segment, p, nx, c, d, reverse = move
+        in_segment = set(segment)
+        rest = [city for city in tour if city not in in_segment]
+        insert_at = rest.index(c) + 1
+        tour = rest[:insert_at] + (segment[::-1] if reverse else segment) + rest[insert_at:]
+        for i, city in enumerate(tour):
+            pos[city] = i
+        wake(p, nx, c, d, *segment)
+
+    tour = rotate_to_start(tour, start)
+    return tour, tour_length(tour, distance_matrix)
+
+# --------------------------
+# PIPELINE CẢI THIỆN TOUR
+# --------------------------
+IMPROVEMENT_MODES = {
+    "none": (),
+    "2opt": (two_opt,),
+    "oropt": (or_opt,),
+    "full": (two_opt, or_opt),
+}
+
+def improve_tour(tour, distance_matrix, mode="full", time_budget_ms=None, k=10):
+    """
+    Áp dụng lần lượt các bước local search theo mode, lặp lại cho đến khi
+    không còn cải thiện hoặc hết thời gian time_budget_ms.
+    Trả về (tour, độ dài tour).
+    """
+    if mode not in IMPROVEMENT_MODES:
+        raise ValueError(f"Unknown improvement mode: {mode}")
+
+    tour = [int(c) for c in tour]
+    best_length = tour_length(tour, distance_matrix)
+    stages = IMPROVEMENT_MODES[mode]
+    if not stages or len(tour) < 4:
+        return tour, best_length
+
+    deadline = None
+    if time_budget_ms is not None:
+        deadline = time.perf_counter() + time_budget_ms / 1000.0
+    neighbors = nearest_neighbor_lists(distance_matrix, k)
+
+    improved = True
+    while improved:
+        improved = False
+        for stage in stages:
+            tour, length = stage(tour, distance_matrix, neighbors=neighbors, deadline=deadline)
+            if length < best_length - EPSILON:
+                best_length = length
+                improved = len(stages) > 1  # một bước duy nhất đã tự hội tụ
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+
+    return tour, best_length
@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from distance import distance_cache_key
+from distance_store import as_distances
+from nearest_neighbor import nearest_neighbor_steps
+
+# --------------------------
+# CẬN DƯỚI HELD-KARP: 1-TREE NHỎ NHẤT + TỐI ƯU SUBGRADIENT
+# --------------------------
+def minimum_one_tree(distance_matrix, penalties, root=0):
+    """
+    1-tree nhỏ nhất với trọng số d(i, j) + pi[i] + pi[j]:
+    cây khung nhỏ nhất (Prim, O(n^2) bằng NumPy) trên các thành phố khác root
+    cộng hai cạnh rẻ nhất nối thành phố root.
+    Trả về (tổng trọng số đã trừ 2·sum(pi), bậc của từng thành phố).
+    Vòng Prim là phần tốn thời gian (n bước Python) nên mỗi bước chỉ dùng vài phép NumPy trên bộ đệm có sẵn.
+    """
+    n = len(distance_matrix)
+    penalties = np.asarray(penalties, dtype=np.float64)
+
+    # Prim bắt đầu từ thành phố first != root. key[v] = min trên các u đã vào cây của d(u, v) + pi[u];
+    # pi[v] được cộng khi chọn, qua open_penalties (= inf với thành phố đã vào cây và thành phố root)
+    first = 1 if root == 0 else 0
+    open_penalties = penalties.copy()
+    open_penalties[root] = open_penalties[first] = np.inf
+    key = distance_matrix[first] + penalties[first]
+    parent = np.full(n, first, dtype=np.intp)
+    chosen = np.empty(n, dtype=np.float64)
+    row = np.empty(n, dtype=np.float64)
+    better = np.empty(n, dtype=bool)
+    # Hai đầu của mọi cạnh trong cây, bậc được đếm một lần ở cuối
+    ends = np.empty(2 * (n - 2), dtype=np.intp)
+    total = 0.0
+    for step in range(n - 2):
+        np.add(key, open_penalties, out=chosen)
+        u = int(chosen.argmin())
+        total += chosen[u]
+        ends[2 * step] = u
+        ends[2 * step + 1] = parent[u]
+        open_penalties[u] = np.inf
+        np.add(distance_matrix[u], penalties[u], out=row)
+        np.less(row, key, out=better)
+        parent[better] = u
+        np.minimum(key, row, out=key)
+
+    # Hai cạnh rẻ nhất từ thành phố root
+    row = distance_matrix[root] + penalties[root] + penalties
+    row[root] = np.inf
+    two = np.argpartition(row, 1)[:2]
+    total += float(row[two].sum())
+    degree = np.bincount(ends, minlength=n)
+    degree[two] += 1
+    return total - 2 * float(penalties.sum()), degree
+
+def one_tree_lower_bound(distance_matrix, upper_bound, max_iter=100, time_budget_ms=None, step=0.25, root=0):
+    """
+    Cận dưới Held-Karp của độ dài tour tối ưu (luôn <= tối ưu).
+    Tối ưu subgradient trên penalty của từng thành phố: pi += t·(bậc - 2),
+    bước Polyak t = step·(upper_bound - L) / ||bậc - 2||^2, step giảm một nửa sau 2 vòng không cải thiện.
+    step ban đầu nhỏ (0.25 thay vì 2 như sách) vì upper_bound là tour heuristic còn xa tối ưu:
+    bước lớn vượt quá điểm tốt và các vòng đầu không cải thiện gì, trong khi chỉ có vài vòng.
+    Mỗi vòng đều cho một cận hợp lệ nên có thể dừng bất cứ lúc nào.
+    Dừng sau max_iter vòng, khi hết time_budget_ms hoặc khi 1-tree là một tour (cận = tối ưu).
+    root: thành phố có hai cạnh riêng trong 1-tree (cận hợp lệ với mọi root, giá trị có thể khác nhau).
+    Trả về (cận dưới, exact) với exact=True nếu 1-tree tìm được là tour tối ưu.
+    """
+    dist = as_distances(distance_matrix)
+    n = len(dist)
+    if n < 3:
+        return float(np.asarray(dist).sum()), True
+
+    deadline = None
+    if time_budget_ms is not None:
+        deadline = time.perf_counter() + float(time_budget_ms) / 1000.0
+
+    penalties = np.zeros(n)
+    best = -np.inf
+    stall = 0
+    for _ in range(max_iter):
+        bound, degree = minimum_one_tree(dist, penalties, root)
+        if bound > best + 1e-9:
+            best = bound
+            stall = 0
+        else:
+            stall += 1
+            if stall >= 2:
+                step /= 2
+                stall = 0
+        subgradient = degree - 2
+        norm = float(np.dot(subgradient, subgradient))
+        if norm == 0:
+            return float(bound), True  # mọi thành phố bậc 2: 1-tree là tour tối ưu
+        if step < 1e-4 or (deadline is not None and time.perf_counter() >= deadline):
+            break
+        penalties += step * max(upper_bound - bound, 1e-9 * upper_bound) / norm * subgradient
+    return float(best), False
+
+# --------------------------
+# CACHE CẬN DƯỚI THEO TẬP THÀNH PHỐ VÀ KHOẢNG CÁCH
+# --------------------------
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+# Khóa đang được tính -> Event; các luồng khác cùng khóa chờ kết quả thay vì tính lại
+_pending = {}
+CACHE_SIZE = 256
+
+def nearest_neighbor_length(distance_matrix, start=0):
+    """Độ dài tour Nearest Neighbor từ thành phố start (cận trên cho bước subgradient của cận dưới)"""
+    length, last = 0.0, start
+    for _, last, h, _, _ in nearest_neighbor_steps(len(distance_matrix), distance_matrix, start=start):
+        length += h
+    return length + float(distance_matrix[last, start])
+
+def cached_lower_bound(city_data, distance_matrix, **options):
+    """
+    one_tree_lower_bound có nhớ kết quả theo tập thành phố, khoảng cách (distance_cache_key;
+    cận không phụ thuộc thứ tự) và options. Cache được tra trước mọi tính toán O(n^2).
+    Cận trên của bước subgradient là tour Nearest Neighbor, chỉ được tính khi cache không có cận.
+    Thành phố xuất phát của tour đó và root của 1-tree là thành phố đầu theo thứ tự chuẩn: kết quả chỉ phụ thuộc
+    dữ liệu, không phụ thuộc thứ tự thành phố hay thuật toán nào yêu cầu trước.
+    Các thuật toán chạy song song trong cùng request nhận cùng một cận: chỉ luồng đầu tiên tính, các luồng khác chờ.
+    """
+    key, order = distance_cache_key(city_data, distance_matrix)
+    key = (key, tuple(sorted(options.items())))
+    while True:
+        with _cache_lock:
+            cached = _cache.get(key)
+            if cached is not None:
+                _cache.move_to_end(key)
+                return cached
+            pending = _pending.get(key)
+            if pending is None:
+                pending = _pending[key] = threading.Event()
+                break
+        pending.wait()
+
+    try:
+        root = int(order[0])
+        upper_bound = nearest_neighbor_length(distance_matrix, start=root)
+        cached = one_tree_lower_bound(distance_matrix, upper_bound, root=root, **options)
+        with _cache_lock:
+            _cache[key] = cached
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+    finally:
+        with _cache_lock:
+            del _pending[key]
+        pending.set()
+    return cached
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,117 @@
+import bisect
+import threading
+
+# --------------------------
+# METRICS DẠNG PROMETHEUS TEXT (KHÔNG CẦN THƯ VIỆN NGOÀI)
+# --------------------------
+# Bucket (giây) cho thời gian từng pha và thời gian request
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Bucket cho số thành phố mỗi request
+CITY_BUCKETS = (2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 50000, 100000)
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Bộ đếm tăng dần theo bộ nhãn"""
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple((k, str(labels[k])) for k in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    """Histogram có bucket cố định theo bộ nhãn (bucket tích lũy như Prometheus)"""
+
+    def __init__(self, name, help_text, buckets, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.label_names = tuple(label_names)
+        self._values = {}  # nhãn -> [số đếm từng bucket (+Inf ở cuối), tổng]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple((k, str(labels[k])) for k in self.label_names)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][i] += 1
+            entry[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += count
+                    labels = _format_labels(key + (("le", bound if bound == "+Inf" else _format_value(bound)),))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """Tập các metric của server, xuất ra định dạng text của Prometheus"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, help_text, label_names=()):
+        metric = Counter(name, help_text, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, buckets, label_names=()):
+        metric = Histogram(name, help_text, buckets, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# Các metric dùng chung trong toàn bộ process
+registry = MetricsRegistry()
+requests_total = registry.counter(
+    "tsp_requests_total", "HTTP requests by endpoint and status code", ("endpoint", "status")
+)
+request_duration_seconds = registry.histogram(
+    "tsp_request_duration_seconds", "HTTP request duration", SECONDS_BUCKETS, ("endpoint",)
+)
+request_cities = registry.histogram(
+    "tsp_request_cities", "Number of cities per route request", CITY_BUCKETS
+)
+phase_seconds = registry.histogram(
+    "tsp_phase_seconds", "Time spent per algorithm phase", SECONDS_BUCKETS, ("algorithm", "phase")
+)
+
+def observe_timings(result):
+    """Ghi timings của một kết quả thuật toán vào histogram theo pha"""
+    algorithm = result.get("algorithm", "unknown")
+    for phase, seconds in result.get("timings", {}).items():
+        phase_seconds.observe(seconds, algorithm=algorithm, phase=phase)
@@ -0,0 +1,39 @@
+import numpy as np
+
+from cancellation import check_cancelled, check_deadline
+
+# --------------------------
+# BƯỚC CHỌN THÀNH PHỐ CHƯA THĂM GẦN NHẤT
+# (DÙNG CHUNG CHO gbfs_tsp, LUỒNG TIẾN TRÌNH SSE VÀ TOUR NEAREST NEIGHBOR CỦA BASELINE)
+# --------------------------
+def nearest_neighbor_steps(num_cities, distance_matrix=None, grid=None, start=0, cancel_event=None, deadline=None):
+    """
+    Generator các bước của GBFS / Nearest Neighbor: từ start, mỗi bước đi tới thành phố chưa thăm gần nhất.
+    Tìm bằng argmin trên hàng của distance_matrix (ma trận hoặc backend của distance_store),
+    hoặc bằng grid (spatial.SphereGrid chứa mọi thành phố, không cần ma trận).
+    Mỗi bước yield (current, next_idx, next_h, current_row, visited):
+    - current_row: hàng khoảng cách của current (None khi dùng grid)
+    - visited: mảng bool các thành phố đã thăm, chưa gồm next_idx (được đánh dấu khi generator chạy tiếp)
+    Dừng sau num_cities - 1 bước (bước quay về start do nơi gọi xử lý).
+    cancel_event: threading.Event; khi được set thì ném SolveCancelled ở bước kế tiếp
+    deadline: mốc time.monotonic(); quá hạn thì ném DeadlineExceeded ở bước kế tiếp (tour dở dang không dùng được)
+    """
+    visited = np.zeros(num_cities, dtype=bool)
+    visited[start] = True
+    if grid is not None:
+        grid.remove(start)
+    current = start
+    for _ in range(num_cities - 1):
+        check_cancelled(cancel_event)
+        check_deadline(deadline)
+        if grid is not None:
+            next_idx, next_h = grid.nearest(current)
+            grid.remove(next_idx)
+            current_row = None
+        else:
+            current_row = distance_matrix[current]
+            next_idx = int(np.argmin(np.where(visited, np.inf, current_row)))
+            next_h = float(current_row[next_idx])
+        yield current, next_idx, next_h, current_row, visited
+        visited[next_idx] = True
+        current = next_idx
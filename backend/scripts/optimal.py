@@ -0,0 +1,96 @@
+import math
+
+from distance import build_distance_matrix
+from local_search import tour_length, two_opt
+from held_karp import HELD_KARP_MAX_CITIES, exact_tour
+from nearest_neighbor import nearest_neighbor_steps
+from lower_bound import cached_lower_bound
+
+# Loại baseline của optimal_distance:
+# "exact":       tối ưu thật (Held-Karp, n <= HELD_KARP_MAX_CITIES)
+# "lower_bound": cận dưới 1-tree (<= tối ưu) nên solution_quality là cận dưới được chứng minh
+# "heuristic":   độ dài một tour heuristic (>= tối ưu), chỉ mang tính ước lượng
+BASELINE_KINDS = ("exact", "lower_bound", "heuristic")
+# Số vòng subgradient của cận dưới (kết quả được nhớ theo tập thành phố).
+# Mỗi vòng là một 1-tree có n bước Prim (~10 ms ở n = 1000): số vòng = LOWER_BOUND_STEP_BUDGET // n,
+# trong [1, LOWER_BOUND_MAX_ITER]. Chỉ phụ thuộc n (không theo thời gian) để cận, và các kết quả
+# được cache theo seed, giống nhau giữa các lần chạy và các máy.
+LOWER_BOUND_STEP_BUDGET = 6000
+LOWER_BOUND_MAX_ITER = 100
+
+def lower_bound_iterations(num_cities):
+    """Số vòng subgradient cho bài toán num_cities thành phố"""
+    return max(1, min(LOWER_BOUND_MAX_ITER, LOWER_BOUND_STEP_BUDGET // max(1, num_cities)))
+
+# --------------------------
+# HÀM TÍNH OPTIMAL DISTANCE - DÙNG CHUNG CHO GBFS VÀ WCO
+# --------------------------
+def optimal_baseline(city_data, distance_matrix=None):
+    """
+    Khoảng cách baseline để tính solution_quality.
+    Chỉ phụ thuộc tập thành phố và khoảng cách (không phụ thuộc thuật toán hay thứ tự gọi),
+    nên GBFS và WCO của cùng request nhận cùng một baseline.
+    Trả về (khoảng cách, loại baseline trong BASELINE_KINDS).
+    """
+    if len(city_data) < 2:
+        return 0, "exact"
+
+    if distance_matrix is None:
+        distance_matrix = build_distance_matrix(city_data)
+
+    if len(city_data) <= HELD_KARP_MAX_CITIES:
+        exact_distance, _ = exact_tour(city_data, distance_matrix)
+        return round(exact_distance, 2), "exact"
+
+    bound, exact = cached_lower_bound(
+        city_data, distance_matrix, max_iter=lower_bound_iterations(len(city_data))
+    )
+    # Làm tròn xuống để giá trị hiển thị vẫn là cận dưới
+    return math.floor(bound * 100) / 100, "exact" if exact else "lower_bound"
+
+def heuristic_optimal_distance(distance_matrix):
+    """Ước lượng khoảng cách tối ưu bằng Nearest Neighbor + 2-opt"""
+    # Sử dụng Nearest Neighbor algorithm để tìm tour gần tối ưu
+    tour = nearest_neighbor_tour(distance_matrix)
+
+    # Tính khoảng cách tour
+    nn_distance = tour_length(tour, distance_matrix)
+
+    # Có thể thử thêm 2-opt local search để cải thiện
+    _, improved_distance = two_opt(tour, distance_matrix)
+
+    return round(min(nn_distance, improved_distance), 2)
+
+def nearest_neighbor_tour(distance_matrix, start=0):
+    """Tour Nearest Neighbor dạng mảng chỉ số (không lặp lại điểm đầu ở cuối)"""
+    tour = [start]
+    # Cùng bước chọn với GBFS: thành phố chưa thăm gần nhất
+    for _, next_idx, _, _, _ in nearest_neighbor_steps(len(distance_matrix), distance_matrix, start=start):
+        tour.append(next_idx)
+    return tour
+
+# --------------------------
+# HÀM TÍNH SOLUTION QUALITY
+# --------------------------
+def calculate_solution_quality(best_distance, optimal_distance):
+    """
+    Tính chất lượng nghiệm (0-100%); None nếu không tính baseline (optimal_distance None)
+    """
+    if optimal_distance is None:
+        return None
+    if best_distance <= 0 or optimal_distance <= 0:
+        return 0.0
+
+    quality = (optimal_distance / best_distance) * 100
+
+    # Giới hạn tối đa 100%
+    return min(round(quality, 1), 100.0)
+
+def calculate_gap_bound(best_distance, optimal_distance, kind):
+    """
+    Cận trên được chứng minh của khoảng cách tới tối ưu (%): (best / baseline - 1)·100.
+    None nếu baseline là heuristic (không chứng minh được gì) hoặc không được tính (kind None).
+    """
+    if kind in (None, "heuristic") or best_distance <= 0 or optimal_distance <= 0:
+        return None
+    return round(max(0.0, (best_distance / optimal_distance - 1) * 100), 2)
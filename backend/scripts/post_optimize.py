@@ -0,0 +1,52 @@
+import time
+
+from local_search import IMPROVEMENT_MODES, improve_tour
+from optimal import calculate_solution_quality, calculate_gap_bound
+
+# --------------------------
+# BƯỚC HẬU TỐI ƯU CHO KẾT QUẢ CỦA GBFS / WCO
+# --------------------------
+def post_optimize_result(result, distance_matrix, mode="full", time_budget_ms=200):
+    """
+    Đánh bóng best_solution của gbfs_tsp hoặc wco_tsp bằng local search
+    (2-opt và/hoặc Or-opt) trong giới hạn time_budget_ms.
+    Cập nhật best_solution, best_distance, solution_quality và thêm trường "post_optimization".
+    distance_matrix phải cùng thứ tự với result["cities"].
+    """
+    if mode == "none" or len(result.get("best_solution", [])) < 4:
+        return result
+    if mode not in IMPROVEMENT_MODES:
+        raise ValueError(f"Unknown post_optimize mode: {mode}")
+
+    start_time = time.time()
+    name_to_idx = {c["name"]: i for i, c in enumerate(result["cities"])}
+    cities = [c["name"] for c in result["cities"]]
+
+    tour = [name_to_idx[city] for city in result["best_solution"][:-1]]  # bỏ điểm khép vòng
+    initial_distance = result["best_distance"]
+    tour, improved_distance = improve_tour(tour, distance_matrix, mode=mode, time_budget_ms=time_budget_ms)
+
+    if round(improved_distance, 2) < initial_distance:
+        path = [cities[i] for i in tour]
+        path.append(path[0])
+        result["best_solution"] = path
+        result["best_distance"] = round(improved_distance, 2)
+        result["solution_quality"] = calculate_solution_quality(
+            result["best_distance"], result["optimal_distance"]
+        )
+        if "optimal_kind" in result:
+            result["gap_bound_pct"] = calculate_gap_bound(
+                result["best_distance"], result["optimal_distance"], result["optimal_kind"]
+            )
+
+    elapsed = time.time() - start_time
+    result["post_optimization"] = {
+        "mode": mode,
+        "initial_distance": initial_distance,
+        "improved_distance": result["best_distance"],
+        "execution_time": round(elapsed, 4),
+    }
+    result["execution_time"] = round(result["execution_time"] + elapsed, 4)
+    if "timings" in result:
+        result["timings"]["post_optimize"] = round(elapsed, 4)
+    return result
@@ -0,0 +1,209 @@
+import itertools
+import json
+import os
+import random
+import threading
+import time
+
+import numpy as np
+
+from wco import init_population, evolve_population
+from nearest_neighbor import nearest_neighbor_steps
+from spatial import SphereGrid, unit_sphere_coords, distance_row_km
+from solvers import get_solver
+
+# Khoảng thời gian tối đa (giây) giữa hai lần ghi ra stream: WCO không cải thiện best vẫn gửi comment
+# keep-alive để phát hiện client ngắt kết nối và dừng tính toán
+SSE_KEEPALIVE_SECONDS = float(os.environ.get('SSE_KEEPALIVE_SECONDS', 1.0))
+
+# --------------------------
+# LUỒNG TIẾN TRÌNH (SERVER-SENT EVENTS) CHO GBFS VÀ WCO
+# (CÁC THUẬT TOÁN KHÁC TRONG REGISTRY CHỈ CÓ SỰ KIỆN KẾT QUẢ)
+# --------------------------
+def format_sse(event, data):
+    """Định dạng một sự kiện Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def format_sse_comment(text="keep-alive"):
+    """Dòng comment SSE (client bỏ qua), dùng để giữ kết nối và phát hiện client đã ngắt"""
+    return f": {text}\n\n"
+
+def path_delta(previous, current, cities):
+    """
+    Mã hóa sự thay đổi giữa hai lộ trình (mảng chỉ số cùng độ dài) theo tên thành phố.
+    Trả về {"changes": [[vị trí, tên], ...]} nếu ít thay đổi, ngược lại {"full": [tên, ...]}.
+    """
+    current = np.asarray(current)
+    if previous is None:
+        return {"full": [cities[j] for j in current.tolist()]}
+    changed = np.nonzero(np.asarray(previous) != current)[0]
+    if len(changed) * 2 > len(current):
+        return {"full": [cities[j] for j in current.tolist()]}
+    return {"changes": [[int(i), cities[int(current[i])]] for i in changed]}
+
+def gbfs_step_event(step, cities, current, next_idx, length):
+    return {
+        "algorithm": "GBFS",
+        "step": step,
+        "currentCity": cities[current],
+        "chosenCity": cities[next_idx],
+        "partialPathDelta": [cities[next_idx]],
+        "currentBestDistance": round(length, 2),
+    }
+
+def gbfs_progress(city_data, distance_matrix, index="matrix", cancel_event=None):
+    """
+    Generator các bước GBFS (cùng bước chọn với gbfs_tsp): mỗi bước chỉ gửi thành phố vừa chọn
+    (delta của partialPath) và độ dài đường đi hiện tại, không giữ lại toàn bộ trace.
+    index: như gbfs_tsp - với "spatial" distance_matrix bị bỏ qua (có thể là None)
+    cancel_event: threading.Event; khi được set thì ném SolveCancelled
+    """
+    cities = [c["name"] for c in city_data]
+    num_cities = len(cities)
+    grid = None
+    if index == "spatial":
+        coords = unit_sphere_coords(city_data)
+        grid = SphereGrid(coords)
+    length = 0.0
+
+    yield {"algorithm": "GBFS", "step": 0, "currentCity": cities[0],
+           "partialPathDelta": [cities[0]], "currentBestDistance": 0.0}
+
+    current = 0
+    moves = nearest_neighbor_steps(num_cities, distance_matrix, grid=grid, cancel_event=cancel_event)
+    for step, (current, next_idx, next_h, _, _) in enumerate(moves, start=1):
+        length += next_h
+        yield gbfs_step_event(step, cities, current, next_idx, length)
+        current = next_idx
+
+    # Quay về điểm xuất phát
+    if grid is not None:
+        length += float(distance_row_km(coords, current, [0])[0])
+    else:
+        length += float(distance_matrix[current, 0])
+    yield gbfs_step_event(num_cities, cities, current, 0, length)
+
+def wco_progress(city_data, distance_matrix, num_whales=30, max_iter=100, deadline=None, cancel_event=None,
+                 seed=None, time_budget_ms=None, stall_iterations=None):
+    """
+    Generator tiến trình WCO: phát một sự kiện mỗi khi iteration tìm được best mới,
+    None cho iteration không cải thiện (để nơi gọi gửi keep-alive).
+    partialPath được gửi dạng delta so với best đã phát trước đó.
+    seed, time_budget_ms, stall_iterations: như wco_tsp (time_budget_ms != None thì max_iter bị bỏ qua)
+    """
+    cities = [c["name"] for c in city_data]
+    rng = random if seed is None else random.Random(seed)
+    whales, fitness = init_population(num_whales, distance_matrix, rng)
+    best_idx = int(np.argmin(fitness))
+    best_whale = whales[best_idx].copy()
+    best_distance = float(fitness[best_idx])
+    emitted = None
+
+    time_window = None
+    if time_budget_ms is not None:
+        max_iter = None
+        loop_start = time.monotonic()
+        time_window = (loop_start, loop_start + float(time_budget_ms) / 1000.0)
+    iterations = itertools.count() if max_iter is None else range(max_iter)
+    stall = 0
+    stop_reason = "max_iter"
+
+    for iteration in iterations:
+        if stall_iterations is not None and stall >= stall_iterations:
+            stop_reason = "stalled"
+            break
+        best_whale, new_distance, history, stop_reason = evolve_population(
+            whales, fitness, best_whale, best_distance, distance_matrix,
+            range(iteration, iteration + 1), max_iter, rng=rng, verbose=False,
+            deadline=deadline, cancel_event=cancel_event, time_window=time_window
+        )
+        if not history:
+            break  # hết deadline hoặc time budget
+        stop_reason = "max_iter"
+        improved = new_distance < best_distance
+        stall = 0 if improved else stall + 1
+        if emitted is None or improved:
+            yield {
+                "algorithm": "WCO",
+                "iteration": iteration + 1,
+                "currentBestDistance": round(new_distance, 2),
+                "partialPathDelta": path_delta(emitted, best_whale, cities),
+            }
+            emitted = best_whale.copy()
+        else:
+            yield None
+        best_distance = new_distance
+
+    best_solution = [cities[j] for j in best_whale.tolist()]
+    best_solution.append(best_solution[0])
+    yield {
+        "algorithm": "WCO",
+        "done": True,
+        "best_solution": best_solution,
+        "best_distance": round(best_distance, 2),
+        "stop_reason": stop_reason,
+    }
+
+def solver_result_event(name, city_data, distance_matrix, options, cancel_event=None):
+    """
+    Sự kiện kết quả (cùng dạng với sự kiện cuối của WCO) cho thuật toán trong registry không có
+    tiến trình từng bước, ví dụ các heuristic xây dựng tour: chạy solve một lần, không tạo steps/edges
+    """
+    result = get_solver(name).solve(
+        city_data, distance_matrix, dict(options, trace="none", edge_mode="none"), cancel_event=cancel_event
+    )
+    return {
+        "algorithm": name,
+        "done": True,
+        "best_solution": result["best_solution"],
+        "best_distance": result["best_distance"],
+    }
+
+def route_progress_events(city_data, distance_matrix, algorithms=("GBFS", "WCO"), wco_deadline=None,
+                          seed=None, distance_source=None, gbfs_index="matrix", options=None,
+                          cancel_event=None):
+    """
+    Chuỗi sự kiện SSE cho các thuật toán được yêu cầu (theo thứ tự trong algorithms):
+    "progress" cho từng bước, "result" khi một thuật toán kết thúc, "done" ở cuối.
+    Thuật toán khác GBFS/WCO chỉ có sự kiện "result" (solver_result_event).
+    distance_source: nguồn khoảng cách ghi vào sự kiện "done" (None = không ghi)
+    gbfs_index: cách tìm thành phố gần nhất của GBFS (như gbfs_tsp)
+    options: tham số đã kiểm tra (parse_route_request); wco_time_budget_ms/wco_stall_iterations
+             được dùng cho WCO, các thuật toán khác GBFS/WCO cần toàn bộ options
+    cancel_event: threading.Event được set khi generator bị đóng (client ngắt kết nối) để dừng tính toán
+    """
+    options = options or {}
+    cancel_event = cancel_event if cancel_event is not None else threading.Event()
+    start_time = time.time()
+    try:
+        for name in algorithms:
+            if name == "GBFS":
+                events = gbfs_progress(city_data, distance_matrix, index=gbfs_index, cancel_event=cancel_event)
+                for event in events:
+                    yield format_sse("progress", event)
+            elif name == "WCO":
+                events = wco_progress(
+                    city_data, distance_matrix, deadline=wco_deadline, cancel_event=cancel_event, seed=seed,
+                    time_budget_ms=options.get("wco_time_budget_ms"),
+                    stall_iterations=options.get("wco_stall_iterations"),
+                )
+                last_write = time.monotonic()
+                for event in events:
+                    if event is None:
+                        if time.monotonic() - last_write < SSE_KEEPALIVE_SECONDS:
+                            continue
+                        yield format_sse_comment()
+                    else:
+                        yield format_sse("result" if event.get("done") else "progress", event)
+                    last_write = time.monotonic()
+            else:
+                yield format_sse("result", solver_result_event(
+                    name, city_data, distance_matrix, options, cancel_event=cancel_event
+                ))
+        done = {"execution_time": round(time.time() - start_time, 4)}
+        if distance_source is not None:
+            done["distance_source"] = distance_source
+        yield format_sse("done", done)
+    finally:
+        # GeneratorExit (client ngắt kết nối) hoặc stream kết thúc: dừng các thuật toán còn dùng cancel_event
+        cancel_event.set()
@@ -0,0 +1,68 @@
+# --------------------------
+# 63 TỈNH/THÀNH PHỐ VIỆT NAM (cùng tọa độ với VIETNAM_PROVINCES của frontend)
+# --------------------------
+VIETNAM_PROVINCES = [
+    {"name": "Hà Nội", "lat": 21.028, "lng": 105.8542},
+    {"name": "Hồ Chí Minh", "lat": 10.7765, "lng": 106.7019},
+    {"name": "Hải Phòng", "lat": 20.8449, "lng": 106.6881},
+    {"name": "Đà Nẵng", "lat": 16.0544, "lng": 108.2022},
+    {"name": "Cần Thơ", "lat": 10.0342, "lng": 105.7656},
+    {"name": "An Giang", "lat": 10.5216, "lng": 105.423},
+    {"name": "Bà Rịa – Vũng Tàu", "lat": 10.4114, "lng": 107.1362},
+    {"name": "Bắc Giang", "lat": 21.2732, "lng": 106.1946},
+    {"name": "Bắc Kạn", "lat": 22.147, "lng": 105.8348},
+    {"name": "Bạc Liêu", "lat": 9.2942, "lng": 105.7277},
+    {"name": "Bắc Ninh", "lat": 21.1861, "lng": 106.071},
+    {"name": "Bến Tre", "lat": 10.2415, "lng": 106.3759},
+    {"name": "Bình Định", "lat": 13.7829, "lng": 109.2197},
+    {"name": "Bình Dương", "lat": 10.9798, "lng": 106.6522},
+    {"name": "Bình Phước", "lat": 11.7519, "lng": 106.7232},
+    {"name": "Bình Thuận", "lat": 10.9333, "lng": 108.1033},
+    {"name": "Cà Mau", "lat": 9.1768, "lng": 105.1502},
+    {"name": "Cao Bằng", "lat": 22.666, "lng": 106.258},
+    {"name": "Đắk Lắk", "lat": 12.71, "lng": 108.2377},
+    {"name": "Đắk Nông", "lat": 11.9375, "lng": 107.6922},
+    {"name": "Điện Biên", "lat": 21.3886, "lng": 103.0198},
+    {"name": "Đồng Nai", "lat": 10.9447, "lng": 106.8243},
+    {"name": "Đồng Tháp", "lat": 10.4938, "lng": 105.6885},
+    {"name": "Gia Lai", "lat": 13.9833, "lng": 108.0},
+    {"name": "Hà Giang", "lat": 22.8019, "lng": 104.9786},
+    {"name": "Hà Nam", "lat": 20.54, "lng": 105.914},
+    {"name": "Hà Tĩnh", "lat": 18.342, "lng": 105.9056},
+    {"name": "Hải Dương", "lat": 20.939, "lng": 106.3307},
+    {"name": "Hậu Giang", "lat": 9.7827, "lng": 105.4663},
+    {"name": "Hòa Bình", "lat": 20.827, "lng": 105.34},
+    {"name": "Hưng Yên", "lat": 20.6464, "lng": 106.0511},
+    {"name": "Khánh Hòa", "lat": 12.2451, "lng": 109.1943},
+    {"name": "Kiên Giang", "lat": 10.012, "lng": 105.0809},
+    {"name": "Kon Tum", "lat": 14.3545, "lng": 108.0076},
+    {"name": "Lai Châu", "lat": 22.396, "lng": 103.458},
+    {"name": "Lâm Đồng", "lat": 11.9465, "lng": 108.4419},
+    {"name": "Lạng Sơn", "lat": 21.8525, "lng": 106.761},
+    {"name": "Lào Cai", "lat": 22.4856, "lng": 103.9707},
+    {"name": "Long An", "lat": 10.6956, "lng": 106.243},
+    {"name": "Nam Định", "lat": 20.4339, "lng": 106.1624},
+    {"name": "Nghệ An", "lat": 18.6767, "lng": 105.6813},
+    {"name": "Ninh Bình", "lat": 20.2581, "lng": 105.9797},
+    {"name": "Ninh Thuận", "lat": 11.5672, "lng": 108.9917},
+    {"name": "Phú Thọ", "lat": 21.3262, "lng": 105.132},
+    {"name": "Phú Yên", "lat": 13.1046, "lng": 109.0922},
+    {"name": "Quảng Bình", "lat": 17.4669, "lng": 106.6009},
+    {"name": "Quảng Nam", "lat": 15.5762, "lng": 108.48},
+    {"name": "Quảng Ngãi", "lat": 15.1214, "lng": 108.8045},
+    {"name": "Quảng Ninh", "lat": 20.9562, "lng": 107.0425},
+    {"name": "Quảng Trị", "lat": 16.7942, "lng": 107.141},
+    {"name": "Sóc Trăng", "lat": 9.5999, "lng": 105.9719},
+    {"name": "Sơn La", "lat": 21.327, "lng": 103.918},
+    {"name": "Tây Ninh", "lat": 11.3085, "lng": 106.0957},
+    {"name": "Thái Bình", "lat": 20.446, "lng": 106.34},
+    {"name": "Thái Nguyên", "lat": 21.5942, "lng": 105.8435},
+    {"name": "Thanh Hóa", "lat": 19.807, "lng": 105.7764},
+    {"name": "Thừa Thiên Huế", "lat": 16.4637, "lng": 107.5909},
+    {"name": "Tiền Giang", "lat": 10.3722, "lng": 106.36},
+    {"name": "Trà Vinh", "lat": 9.9472, "lng": 106.3422},
+    {"name": "Tuyên Quang", "lat": 21.8143, "lng": 105.2146},
+    {"name": "Vĩnh Long", "lat": 10.2537, "lng": 105.9722},
+    {"name": "Vĩnh Phúc", "lat": 21.3055, "lng": 105.6049},
+    {"name": "Yên Bái", "lat": 21.7168, "lng": 104.8984},
+]
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from solvers import algorithm_results
+
+# --------------------------
+# CACHE KẾT QUẢ GIẢI THEO REQUEST (TTL + LRU)
+# --------------------------
+def result_cache_key(options):
+    """
+    Khóa chuẩn của một request đã kiểm tra (parse_route_request).
+    Gồm danh sách thành phố theo đúng thứ tự sau khi đặt điểm xuất phát (tour trả về phụ thuộc thứ tự),
+    mọi tham số thuật toán và seed. "id" của client trong lô không ảnh hưởng kết quả nên bị bỏ qua.
+    """
+    records = [(str(c["name"]), float(c["lat"]), float(c["lng"])) for c in options["cities"]]
+    params = {k: v for k, v in options.items() if k not in ("cities", "id")}
+    payload = json.dumps([records, params], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def is_cacheable(options, result):
+    """
+    Chỉ kết quả tất định mới được cache: có seed, không chạy theo time budget
+    và không thuật toán nào bị lỗi hoặc dừng giữa chừng do deadline.
+    """
+    if options.get("seed") is None or options.get("wco_time_budget_ms") is not None:
+        return False
+    return all("error" not in r and not r.get("partial") for r in algorithm_results(result).values())
+
+class ResultCache:
+    """
+    LRU cache kết quả giải, mỗi mục hết hạn sau ttl giây.
+    Kết quả trả về là chính đối tượng đã lưu: người gọi không được sửa nó.
+    """
+
+    def __init__(self, max_entries=256, ttl=300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (thời điểm hết hạn, kết quả)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Kết quả còn hạn của key hoặc None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, result):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,141 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+
+import numpy as np
+
+# Nguồn khoảng cách ghi trong response ("distance_source")
+# "road":      ma trận khoảng cách đường bộ tính sẵn (file .npy/.bin, đọc qua memmap)
+# "haversine": khoảng cách đường chim bay tính từ tọa độ
+DISTANCE_SOURCES = ("road", "haversine")
+
+# --------------------------
+# MA TRẬN KHOẢNG CÁCH ĐƯỜNG BỘ TÍNH SẴN (MEMORY-MAPPED)
+# --------------------------
+def names_path_for(path):
+    """File tên thành phố đi kèm ma trận: <tên file không đuôi>.names.json (danh sách JSON theo thứ tự hàng)"""
+    return os.path.splitext(path)[0] + ".names.json"
+
+def is_symmetric(matrix, block_rows=1024):
+    """np.allclose(matrix, matrix.T) theo từng khối hàng (không tạo bản sao n×n của memmap)"""
+    n = len(matrix)
+    for start in range(0, n, block_rows):
+        stop = min(start + block_rows, n)
+        if not np.allclose(matrix[start:stop], matrix[:, start:stop].T):
+            return False
+    return True
+
+class RoadDistanceMatrix:
+    """
+    Ma trận khoảng cách n×n (km) đọc bằng numpy memmap, tra theo tên thành phố.
+    File .npy được mở bằng np.load(mmap_mode="r"); file nhị phân thô (.bin) cần dtype, kích thước suy ra từ số tên.
+    Các process cùng đọc một file dùng chung page cache của hệ điều hành; mở file không phải parse dữ liệu.
+    Ma trận phải đối xứng (các thuật toán local search giả định d(i, j) = d(j, i)): được kiểm tra khi mở,
+    đọc cả file một lần theo từng khối hàng.
+    """
+
+    def __init__(self, path, names_path=None, dtype="float32"):
+        with open(names_path or names_path_for(path), encoding="utf-8") as f:
+            self.names = json.load(f)
+        n = len(self.names)
+        if path.endswith(".npy"):
+            self.matrix = np.load(path, mmap_mode="r")
+        else:
+            self.matrix = np.memmap(path, dtype=np.dtype(dtype), mode="r", shape=(n, n))
+        if self.matrix.shape != (n, n):
+            raise ValueError(f"Road distance matrix shape {self.matrix.shape} does not match {n} names")
+        self.index = {name: i for i, name in enumerate(self.names)}
+        if len(self.index) != n:
+            raise ValueError("Duplicate city names in road distance matrix")
+        if not is_symmetric(self.matrix):
+            raise ValueError(f"Road distance matrix is not symmetric: {path}")
+        self.path = path
+
+    def covers(self, city_data):
+        return all(c["name"] in self.index for c in city_data)
+
+    def indices(self, city_data):
+        return np.fromiter((self.index[c["name"]] for c in city_data), dtype=np.intp, count=len(city_data))
+
+    def submatrix(self, city_data):
+        """Ma trận float64 theo đúng thứ tự city_data (chỉ đọc các ô cần thiết từ file)"""
+        idx = self.indices(city_data)
+        return np.asarray(self.matrix[np.ix_(idx, idx)], dtype=np.float64)
+
+    def row(self, city, city_data):
+        """Khoảng cách từ city đến từng thành phố trong city_data (một hàng, O(n))"""
+        return np.asarray(self.matrix[self.index[city["name"]], self.indices(city_data)], dtype=np.float64)
+
+_road_matrix = None
+_road_matrix_error = None
+_road_matrix_loaded = False
+_road_matrix_lock = threading.Lock()
+
+def get_road_matrix():
+    """
+    Ma trận đường bộ cấu hình bởi ROAD_DISTANCE_MATRIX (đường dẫn .npy/.bin; ROAD_DISTANCE_DTYPE cho .bin),
+    mở một lần cho cả process. None nếu không cấu hình.
+    Server gọi hàm này khi khởi động để file thiếu/sai làm server dừng ngay; lỗi khi mở được nhớ lại
+    và ném lại ở các lần gọi sau thay vì đọc lại file ở mỗi request.
+    """
+    global _road_matrix, _road_matrix_error, _road_matrix_loaded
+    with _road_matrix_lock:
+        if not _road_matrix_loaded:
+            _road_matrix_loaded = True
+            path = os.environ.get('ROAD_DISTANCE_MATRIX')
+            if path:
+                try:
+                    _road_matrix = RoadDistanceMatrix(path, dtype=os.environ.get('ROAD_DISTANCE_DTYPE', 'float32'))
+                except (OSError, ValueError) as e:
+                    _road_matrix_error = e
+        if _road_matrix_error is not None:
+            raise _road_matrix_error
+        return _road_matrix
+
+def road_matrix_for(city_data):
+    """Ma trận đường bộ nếu mọi thành phố của request đều có trong file, ngược lại None"""
+    road = get_road_matrix()
+    if road is not None and road.covers(city_data):
+        return road
+    return None
+
+# --------------------------
+# TẠO FILE MA TRẬN TỪ CSV
+# --------------------------
+def write_road_matrix(path, names, matrix):
+    """Ghi ma trận (.npy) và file tên đi kèm; ma trận được đối xứng hóa bằng trung bình hai chiều"""
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if matrix.shape != (len(names), len(names)):
+        raise ValueError(f"Matrix shape {matrix.shape} does not match {len(names)} names")
+    matrix = (matrix + matrix.T) / 2
+    np.save(path, matrix.astype(np.float32))
+    with open(names_path_for(path), "w", encoding="utf-8") as f:
+        json.dump(list(names), f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+def read_csv_matrix(path):
+    """CSV vuông: hàng đầu là tên các cột, mỗi hàng sau bắt đầu bằng tên thành phố rồi đến khoảng cách (km)"""
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    names = rows[0][1:]
+    order = {name: i for i, name in enumerate(names)}
+    matrix = np.zeros((len(names), len(names)))
+    for row in rows[1:]:
+        matrix[order[row[0]]] = [float(x) for x in row[1:]]
+    return names, matrix
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chuyển ma trận khoảng cách đường bộ dạng CSV sang .npy (dùng với memmap)")
+    parser.add_argument("csv", help="CSV vuông có hàng/cột tiêu đề là tên thành phố")
+    parser.add_argument("output", help="đường dẫn .npy (file tên .names.json được ghi cạnh đó)")
+    args = parser.parse_args(argv)
+    names, matrix = read_csv_matrix(args.csv)
+    write_road_matrix(args.output, names, matrix)
+    print(f"Wrote {len(names)}x{len(names)} matrix to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
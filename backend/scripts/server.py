@@ -1,18 +1,132 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import math
+import os
 import numpy as np
 import time
 import random
 
 # Import các thuật toán từ file bên ngoài
-from GBFS import gbfs_tsp
-from wco import wco_tsp
+from GBFS import validate_gbfs_index
+from solvers import (
+    DEFAULT_SOLVERS, get_solver, validate_solvers, solvers_need_distances, build_tour_result, algorithm_results
+)
+from sessions import SessionManager
+from distance import distance_cache
+from distance_store import get_distances, resolve_backend, distance_source
+from road_distance import road_matrix_for, get_road_matrix
+from local_search import IMPROVEMENT_MODES, rotate_to_start
+from post_optimize import post_optimize_result
+from jobs import JobManager, QueueFullError
+from cancellation import DeadlineExceeded, SolverCancelEvent
+from progress import route_progress_events
+from batch import batch_events
+from step_trace import validate_trace
+from edges import build_edges, edge_page, validate_edge_mode
+from timing import PhaseTimer
+from result_cache import ResultCache, result_cache_key, is_cacheable
+from metrics import registry, requests_total, request_duration_seconds, request_cities, observe_timings
 
 app = Flask(__name__)
 CORS(app)
 
+# Mở ma trận đường bộ (ROAD_DISTANCE_MATRIX) ngay khi khởi động: file thiếu hoặc không hợp lệ
+# làm server dừng với lỗi rõ ràng thay vì lỗi 500 ở mọi request
+get_road_matrix()
+
+# Pool chạy song song các thuật toán trong cùng một request
+# (phần nặng của WCO là các phép NumPy theo lô nên nhả GIL)
+algorithm_pool = ThreadPoolExecutor(max_workers=int(os.environ.get('ALGORITHM_WORKERS', 8)))
+# Worker pool cho các job bất đồng bộ (HTTP 429 khi hàng đợi đầy)
+job_manager = JobManager(
+    max_workers=int(os.environ.get('JOB_WORKERS', 4)),
+    max_queue=int(os.environ.get('JOB_QUEUE_SIZE', 16)),
+)
+# Worker pool cho endpoint giải theo lô
+batch_pool = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('BATCH_WORKERS', os.cpu_count() or 4)), thread_name_prefix="batch"
+)
+# Cache kết quả của các request có seed (request lặp lại trả về ngay, không chạy lại thuật toán)
+result_cache = ResultCache(
+    max_entries=int(os.environ.get('RESULT_CACHE_SIZE', 256)),
+    ttl=float(os.environ.get('RESULT_CACHE_TTL', 300)),
+)
+# Phiên giải tăng dần (giữ tour + ma trận để thêm/xóa điểm dừng không phải giải lại từ đầu)
+session_manager = SessionManager(
+    max_sessions=int(os.environ.get('SESSION_LIMIT', 256)),
+    ttl=float(os.environ.get('SESSION_TTL', 1800)),
+)
+# Số bài toán tối đa trong một lô
+MAX_BATCH_PROBLEMS = 100
+# Số cạnh tối đa trong một trang của /api/edges
+MAX_EDGE_PAGE_SIZE = 10000
+# Số đảo WCO tối đa của một request (mỗi đảo là một quần thể và một task trên process pool)
+MAX_WCO_ISLANDS = int(os.environ.get('MAX_WCO_ISLANDS', 16))
+# Số láng giềng tối đa mỗi thành phố của edge_mode "knn"
+MAX_EDGE_K = int(os.environ.get('MAX_EDGE_K', 50))
+# Thời gian chờ thêm sau deadline để thuật toán dừng vòng lặp và tạo response
+DEADLINE_GRACE_SECONDS = 2.0
+
+def bounded_int(value, name, low, high):
+    """int(value) trong [low, high]; ngoài khoảng thì ném ValueError (HTTP 400)"""
+    value = int(value)
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be between {low} and {high}")
+    return value
+
+def make_deadline(deadline_ms):
+    """Đổi deadline tương đối (ms) thành mốc time.monotonic(); None = không giới hạn"""
+    if deadline_ms is None:
+        return None
+    return time.monotonic() + float(deadline_ms) / 1000.0
+
+def wait_for_result(future, deadline, algorithm, stop_event=None):
+    """
+    Chờ kết quả của một thuật toán, không quá deadline (+ thời gian ân hạn).
+    Quá hạn thì set stop_event (SolverCancelEvent của thuật toán) để worker dừng ở bước kế tiếp
+    và trả slot cho algorithm_pool thay vì chạy tiếp khi không còn ai chờ kết quả.
+    """
+    timeout = None
+    if deadline is not None:
+        timeout = max(0.0, deadline - time.monotonic()) + DEADLINE_GRACE_SECONDS
+    try:
+        return future.result(timeout=timeout)
+    except (FutureTimeoutError, DeadlineExceeded):
+        if stop_event is not None:
+            stop_event.set()
+        return {"algorithm": algorithm, "error": "Deadline exceeded", "partial": True}
+
+# --------------------------
+# METRICS CHO MỌI REQUEST (số request theo status, thời gian xử lý)
+# --------------------------
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    endpoint = request.endpoint or "unknown"
+    requests_total.inc(endpoint=endpoint, status=response.status_code)
+    if "request_start" in g:
+        request_start = g.request_start
+
+        def observe():
+            request_duration_seconds.observe(time.perf_counter() - request_start, endpoint=endpoint)
+
+        # Response stream (SSE): thời gian xử lý tính đến khi stream kết thúc hoặc client ngắt kết nối
+        if response.is_streamed:
+            response.call_on_close(observe)
+        else:
+            observe()
+    return response
+
+# Metrics dạng Prometheus text: số request, phân bố số thành phố, histogram thời gian từng pha
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
 # Health check endpoint, kiểm tra server có hoạt động không
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -22,43 +136,409 @@ def health_check():
         "timestamp": datetime.now().isoformat()
     })
 
+# Thống kê cache ma trận khoảng cách và cache kết quả (hit/miss) để điều chỉnh kích thước cache
+@app.route('/api/cache-stats', methods=['GET'])
+def cache_stats():
+    return jsonify({"distance_matrix": distance_cache.stats(), "results": result_cache.stats()})
+
+# --------------------------
+# XỬ LÝ REQUEST GIẢI BÀI TOÁN (DÙNG CHUNG CHO ENDPOINT ĐỒNG BỘ VÀ JOB)
+# --------------------------
+def parse_route_request(data):
+    """Đọc và kiểm tra tham số của request giải TSP; dữ liệu không hợp lệ thì ném ValueError"""
+    data = data or {}
+    options = {
+        "cities": list(data.get('cities', [])),
+        # Các thuật toán cần chạy (tên trong registry solvers.SOLVERS), mặc định GBFS + WCO
+        "algorithms": data.get('algorithms', list(DEFAULT_SOLVERS)),
+        # False = bỏ qua optimal_distance/solution_quality (tiết kiệm thời gian khi chỉ cần tour)
+        "baseline": bool(data.get('baseline', True)),
+        "starting_point": data.get('starting_point', ''),
+        # Hậu tối ưu bằng local search: "none" | "2opt" | "oropt" | "full"
+        "post_optimize": data.get('post_optimize', 'none'),
+        "post_optimize_time_ms": data.get('post_optimize_time_ms', 200),
+        # Số đảo WCO chạy song song (<= 1: chạy WCO tuần tự như cũ)
+        "wco_islands": bounded_int(data.get('wco_islands', 0), "wco_islands", 0, MAX_WCO_ISLANDS),
+        "migration_interval": int(data.get('migration_interval', 10)),
+        # Deadline cho từng thuật toán (ms); WCO quá hạn trả về best-so-far với "partial": true
+        "gbfs_deadline_ms": data.get('gbfs_deadline_ms'),
+        "wco_deadline_ms": data.get('wco_deadline_ms'),
+        # Chế độ anytime của WCO: chạy đến hết time budget (ms) hoặc khi best đứng yên N iteration
+        "wco_time_budget_ms": data.get('wco_time_budget_ms'),
+        "wco_stall_iterations": data.get('wco_stall_iterations'),
+        # Mức chi tiết của steps: "full" (animation) | "summary" (delta) | "none" (production)
+        "trace": data.get('trace', 'full'),
+        "trace_top_k": data.get('trace_top_k'),
+        # Danh sách cạnh: "all" (mọi cặp) | "knn" (edge_k cạnh gần nhất mỗi thành phố) | "none"
+        "edge_mode": data.get('edge_mode', 'all'),
+        "edge_k": bounded_int(data.get('edge_k', 5), "edge_k", 1, MAX_EDGE_K),
+        # GBFS tìm thành phố gần nhất bằng "matrix" (ma trận n×n) hoặc "spatial" (lưới không gian)
+        "gbfs_index": data.get('gbfs_index', 'matrix'),
+        # Seed cho RNG của WCO: cùng request + cùng seed -> cùng kết quả (và được cache)
+        "seed": data.get('seed'),
+    }
+
+    if len(options["cities"]) < 2:
+        raise ValueError("Need at least 2 cities")
+    if options["post_optimize"] not in IMPROVEMENT_MODES:
+        raise ValueError(f"Invalid post_optimize: {options['post_optimize']}")
+    options["algorithms"] = validate_solvers(options["algorithms"])
+    validate_trace(options["trace"])
+    validate_edge_mode(options["edge_mode"])
+    validate_gbfs_index(options["gbfs_index"])
+    if options["trace_top_k"] is not None:
+        options["trace_top_k"] = int(options["trace_top_k"])
+    if options["post_optimize_time_ms"] is not None:
+        options["post_optimize_time_ms"] = float(options["post_optimize_time_ms"])
+    if options["wco_time_budget_ms"] is not None:
+        options["wco_time_budget_ms"] = float(options["wco_time_budget_ms"])
+    if options["wco_stall_iterations"] is not None:
+        options["wco_stall_iterations"] = int(options["wco_stall_iterations"])
+    if options["seed"] is not None:
+        options["seed"] = int(options["seed"])
+
+    # Đặt điểm xuất phát
+    cities = options["cities"]
+    starting_point = options["starting_point"]
+    if starting_point:
+        for i, city in enumerate(cities):
+            if city['name'] == starting_point:
+                if i != 0:
+                    cities[0], cities[i] = cities[i], cities[0]
+                break
+    # Trên ngưỡng bộ nhớ khoảng cách được lưu gọn (distance_store): các bước cần ma trận đầy đủ bị từ chối
+    if resolve_backend(cities) not in ("road", "dense"):
+        if options["edge_mode"] == "all":
+            raise ValueError("edge_mode 'all' requires the full distance matrix; use 'knn' or 'none'")
+        if options["post_optimize"] != "none":
+            raise ValueError("post_optimize requires the full distance matrix")
+        if options["wco_islands"] > 1:
+            raise ValueError("wco_islands requires the full distance matrix")
+    request_cities.observe(len(cities))
+    return options
+
+def solve_route(options, cancel_event=None, distance_matrix=None):
+    """
+    Chạy các thuật toán được yêu cầu cho các tham số đã kiểm tra; ném SolveCancelled nếu cancel_event được set
+    distance_matrix: ma trận đã có sẵn (ví dụ cắt từ ma trận chung của một lô); None = get_distances
+    (ma trận qua cache, hoặc backend gọn của distance_store khi số thành phố lớn).
+    Khi mọi thuật toán đều không cần khoảng cách (GBFS "spatial" với edge_mode "knn"/"none")
+    thì không tạo khoảng cách lẫn danh sách cạnh: thuật toán tự tìm cạnh kNN trên lưới không gian.
+    Trả về {tên thuật toán: kết quả, "edges": danh sách cạnh dùng chung}; kết quả của từng thuật toán
+    không chứa edges (danh sách chỉ được gửi một lần dù chạy bao nhiêu thuật toán).
+    """
+    cities = options["cities"]
+    solvers = [get_solver(name) for name in options["algorithms"]]
+    deadlines = {
+        solver.name: make_deadline(options[solver.deadline_option]) if solver.deadline_option else None
+        for solver in solvers
+    }
+
+    # Lấy khoảng cách (ma trận đường bộ, qua cache hoặc backend gọn), dùng chung cho mọi thuật toán
+    timer = PhaseTimer()
+    edges = None
+    if solvers_need_distances(options["algorithms"], options):
+        if distance_matrix is None:
+            distance_matrix = get_distances(cities)
+        timer.lap("distance_matrix")
+
+        # Danh sách cạnh được tạo một lần cho cả request và dùng chung cho mọi thuật toán
+        edges = build_edges(cities, distance_matrix, options["edge_mode"], options["edge_k"])
+        timer.lap("edges")
+
+    # Chạy các thuật toán song song - thời gian phản hồi là max thay vì tổng.
+    # Mỗi thuật toán có event hủy riêng (gắn với event của cả request) để dừng riêng khi quá deadline
+    stop_events = {solver.name: SolverCancelEvent(cancel_event) for solver in solvers}
+    futures = {
+        solver.name: algorithm_pool.submit(
+            solver.solve, cities, distance_matrix, options,
+            deadline=deadlines[solver.name], cancel_event=stop_events[solver.name], edges=edges
+        )
+        for solver in solvers
+    }
+    results = {
+        name: wait_for_result(future, deadlines[name], name, stop_events[name])
+        for name, future in futures.items()
+    }
+
+    # Đánh bóng nghiệm của từng thuật toán nếu client yêu cầu
+    if options["post_optimize"] != 'none':
+        for result in results.values():
+            if "error" in result:
+                continue
+            post_optimize_result(
+                result, distance_matrix, options["post_optimize"], options["post_optimize_time_ms"]
+            )
+
+    # Các pha dùng chung của request (ma trận qua cache, danh sách cạnh) được cộng vào timings của từng thuật toán
+    source = distance_source(cities)
+    for solver in solvers:
+        result = results[solver.name]
+        if "timings" not in result:
+            continue
+        # Thuật toán không dùng ma trận tự tính khoảng cách Haversine từ tọa độ
+        result["distance_source"] = source if solver.needs_distances(options) else "haversine"
+        for phase, seconds in timer.as_dict().items():
+            result["timings"][phase] = round(result["timings"].get(phase, 0.0) + seconds, 4)
+        observe_timings(result)
+
+    for result in results.values():
+        own_edges = result.pop("edges", None)
+        if edges is None:
+            edges = own_edges  # cạnh kNN do thuật toán không dùng ma trận tự tạo
+    results["edges"] = edges if edges is not None else []
+    return results
+
+def cached_solve_route(options, cancel_event=None, distance_matrix=None):
+    """solve_route qua cache kết quả: chỉ request có seed mới được tra/lưu cache"""
+    if options["seed"] is None:
+        return solve_route(options, cancel_event=cancel_event, distance_matrix=distance_matrix)
+    key = result_cache_key(options)
+    result = result_cache.get(key)
+    if result is None:
+        result = solve_route(options, cancel_event=cancel_event, distance_matrix=distance_matrix)
+        if is_cacheable(options, result):
+            result_cache.put(key, result)
+    return result
+
 # --------------------------
 # Endpoint tích hợp cả 2 thuật toán - SỬ DỤNG IMPORT
 # --------------------------
 @app.route('/api/calculate-route', methods=['POST'])
 def calculate_route():
     try:
-        data = request.get_json()
-        cities = data.get('cities', [])
-        starting_point = data.get('starting_point', '')
-        
-        if len(cities) < 2:
-            return jsonify({"error": "Need at least 2 cities"}), 400
-
-        # Đặt điểm xuất phát
-        if starting_point:
-            for i, city in enumerate(cities):
-                if city['name'] == starting_point:
-                    if i != 0:
-                        cities[0], cities[i] = cities[i], cities[0]
-                    break
-
-        # Tính GBFS - SỬ DỤNG HÀM IMPORT
-        gbfs_result = gbfs_tsp(cities)
-        # Tính WCO - SỬ DỤNG HÀM IMPORT
-        wco_result = wco_tsp(cities)
-
-        return jsonify({"GBFS": gbfs_result, "WCO": wco_result})
-        
+        options = parse_route_request(request.get_json())
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        return jsonify(cached_solve_route(options))
     except Exception as e:
         print(f" Error in calculate-route: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+# --------------------------
+# Giải nhiều bài toán trong một request: kết quả stream về (SSE) theo thứ tự hoàn thành
+# --------------------------
+@app.route('/api/calculate-route/batch', methods=['POST'])
+def calculate_route_batch():
+    data = request.get_json() or {}
+    problems = data.get('problems', [])
+    # Tham số chung cho mọi bài toán, từng bài toán có thể ghi đè
+    defaults = data.get('defaults', {})
+    if not isinstance(problems, list) or not problems:
+        return jsonify({"error": "Need a non-empty list of problems"}), 400
+    if len(problems) > MAX_BATCH_PROBLEMS:
+        return jsonify({"error": f"At most {MAX_BATCH_PROBLEMS} problems per batch"}), 400
+
+    parsed = []
+    for index, problem in enumerate(problems):
+        try:
+            options = parse_route_request({**defaults, **problem})
+        except (ValueError, TypeError) as e:
+            return jsonify({"error": str(e), "index": index}), 400
+        options["id"] = problem.get('id')
+        parsed.append(options)
+
+    return Response(
+        stream_with_context(batch_events(parsed, cached_solve_route, batch_pool)),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# --------------------------
+# Danh sách cạnh phân trang, dùng ma trận khoảng cách trong cache (hoặc backend gọn khi n lớn)
+# --------------------------
+@app.route('/api/edges', methods=['POST'])
+def list_edges():
+    data = request.get_json() or {}
+    cities = data.get('cities', [])
+    if len(cities) < 2:
+        return jsonify({"error": "Need at least 2 cities"}), 400
+    try:
+        mode = data.get('edge_mode', 'all')
+        validate_edge_mode(mode)
+        offset = int(data.get('offset', 0))
+        limit = min(int(data.get('limit', 1000)), MAX_EDGE_PAGE_SIZE)
+        edge_k = bounded_int(data.get('edge_k', 5), "edge_k", 1, MAX_EDGE_K)
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    distance_matrix = get_distances(cities)
+    if mode == 'all':
+        edges, total = edge_page(cities, distance_matrix, offset, limit)
+    else:
+        all_edges = build_edges(cities, distance_matrix, mode, edge_k)
+        edges, total = all_edges[offset:offset + limit], len(all_edges)
+    next_offset = offset + len(edges)
+    return jsonify({
+        "edges": edges,
+        "total": total,
+        "offset": offset,
+        "next_offset": next_offset if next_offset < total else None,
+        "distance_source": distance_source(cities),
+    })
+
+# --------------------------
+# Stream tiến trình GBFS/WCO dạng Server-Sent Events (không buffer toàn bộ trace);
+# các thuật toán khác chỉ gửi sự kiện "result" khi xong; client ngắt kết nối thì tính toán dừng
+# --------------------------
+@app.route('/api/calculate-route/stream', methods=['POST'])
+def calculate_route_stream():
+    try:
+        options = parse_route_request(request.get_json())
+        # Stream chỉ có tiến trình của WCO tuần tự
+        if options["wco_islands"] > 1:
+            raise ValueError("wco_islands is not supported by the stream endpoint")
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    cities = options["cities"]
+    # Stream không gửi danh sách cạnh: chỉ tạo khoảng cách khi có thuật toán dùng ma trận
+    distance_matrix, source = None, "haversine"
+    if any(get_solver(name).needs_distances(options) for name in options["algorithms"]):
+        distance_matrix, source = get_distances(cities), distance_source(cities)
+    events = route_progress_events(
+        cities, distance_matrix, algorithms=options["algorithms"],
+        wco_deadline=make_deadline(options["wco_deadline_ms"]), seed=options["seed"],
+        distance_source=source, gbfs_index=options["gbfs_index"], options=options
+    )
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# --------------------------
+# Job bất đồng bộ: POST để gửi, GET để xem trạng thái/kết quả, DELETE để hủy
+# --------------------------
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    try:
+        options = parse_route_request(request.get_json())
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        job = job_manager.submit(cached_solve_route, options)
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 429
+    return jsonify(job.to_dict(include_result=False)), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict(include_result=False))
+
+# --------------------------
+# Phiên giải tăng dần: POST để giải lần đầu, POST .../update để thêm/xóa thành phố
+# (chỉ tính hàng ma trận mới, chèn rẻ nhất + 2-opt cục bộ), GET để xem tour, DELETE để đóng
+# --------------------------
+@app.route('/api/sessions', methods=['POST'])
+def create_session():
+    try:
+        options = parse_route_request(request.get_json())
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    cities = options["cities"]
+    # Phiên giữ ma trận n×n đầy đủ để thêm/xóa thành phố O(n): trên ngưỡng ma trận dense thì từ chối
+    if resolve_backend(cities) not in ("road", "dense"):
+        return jsonify({"error": "Too many cities for a session: the full distance matrix exceeds DISTANCE_DENSE_MAX_BYTES"}), 400
+
+    try:
+        # Phiên dùng cùng nguồn khoảng cách với lần giải đầu (get_distances: ma trận đường bộ nếu phủ hết,
+        # ngược lại Haversine qua cache). Ma trận được lấy một lần và dùng cho cả lần giải đầu lẫn phiên
+        road = road_matrix_for(cities)
+        distance_matrix = get_distances(cities)
+        results = cached_solve_route(options, distance_matrix=distance_matrix)
+    except Exception as e:
+        print(f" Error in create-session: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+    solved = {
+        name: r for name, r in algorithm_results(results).items() if "error" not in r and r.get("best_solution")
+    }
+    if not solved:
+        return jsonify({"error": "No algorithm produced a tour", "results": results}), 500
+
+    # Tour tốt nhất trong các thuật toán đã chạy là tour ban đầu của phiên
+    algorithm = min(solved, key=lambda name: solved[name]["best_distance"])
+    name_to_idx = {c["name"]: i for i, c in enumerate(cities)}
+    tour = rotate_to_start([name_to_idx[name] for name in solved[algorithm]["best_solution"][:-1]], 0)
+    session = session_manager.create(cities, distance_matrix, tour, options, road=road)
+    return jsonify({**session.to_dict(), "algorithm": algorithm, "results": results}), 201
+
+@app.route('/api/sessions/<session_id>', methods=['GET'])
+def get_session(session_id):
+    session = session_manager.get(session_id)
+    if session is None:
+        return jsonify({"error": "Session not found"}), 404
+    return jsonify(session.to_dict())
+
+@app.route('/api/sessions/<session_id>/update', methods=['POST'])
+def update_session(session_id):
+    session = session_manager.get(session_id)
+    if session is None:
+        return jsonify({"error": "Session not found"}), 404
+    data = request.get_json() or {}
+    # Mặc định không tính baseline/cạnh (đều O(n^2)) để cập nhật chỉ tốn O(n)
+    options = {
+        **session.options,
+        "baseline": bool(data.get('baseline', False)),
+        "edge_mode": data.get('edge_mode', 'none'),
+        "edge_k": data.get('edge_k', session.options["edge_k"]),
+    }
+    start_time = time.time()
+    timer = PhaseTimer()
+    try:
+        validate_edge_mode(options["edge_mode"])
+        options["edge_k"] = bounded_int(options["edge_k"], "edge_k", 1, MAX_EDGE_K)
+        with session.lock:
+            session.update(add=list(data.get('add', [])), remove=list(data.get('remove', [])))
+            timer.lap("search")
+            result = build_tour_result(
+                "INCREMENTAL", list(session.cities), session.distance_matrix, session.tour,
+                start_time, timer, options
+            )
+            result["distance_source"] = "road" if session.road is not None else "haversine"
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": str(e)}), 400
+    observe_timings(result)
+    return jsonify({"session_id": session.id, "result": result})
+
+@app.route('/api/sessions/<session_id>', methods=['DELETE'])
+def delete_session(session_id):
+    session = session_manager.delete(session_id)
+    if session is None:
+        return jsonify({"error": "Session not found"}), 404
+    return jsonify({"session_id": session.id, "deleted": True})
+
 if __name__ == '__main__':
     print(" Starting Flask GBFS + WCO TSP Server...")
     print(" Endpoint: http://127.0.0.1:5000")
     print(" Available routes:")
     print("   GET  /api/health")
-    print("   POST /api/calculate-route   (GBFS + WCO)")
+    print("   GET  /api/cache-stats")
+    print("   GET  /api/metrics           (Prometheus metrics)")
+    print("   POST /api/calculate-route   (GBFS + WCO or chosen algorithms)")
+    print("   POST /api/calculate-route/stream   (SSE progress)")
+    print("   POST /api/calculate-route/batch    (many problems, SSE results)")
+    print("   POST /api/edges             (paginated edges)")
+    print("   POST /api/jobs              (submit solve job)")
+    print("   GET  /api/jobs/<id>         (job status/result)")
+    print("   DELETE /api/jobs/<id>       (cancel job)")
+    print("   POST /api/sessions          (solve and keep tour for incremental updates)")
+    print("   POST /api/sessions/<id>/update     (add/remove cities)")
+    print("   GET  /api/sessions/<id>     (current tour)")
+    print("   DELETE /api/sessions/<id>   (close session)")
     print(" Using imported algorithms from external files")
     app.run(debug=True, host='127.0.0.1', port=5000)
\ No newline at end of file
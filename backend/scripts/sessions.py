@@ -0,0 +1,204 @@
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from distance import haversine_row
+from distance_store import choose_backend
+from local_search import local_two_opt, tour_length
+
+# Chỗ trống tối thiểu của bộ đệm ma trận (số thành phố có thể thêm trước khi phải cấp phát lại)
+SESSION_MIN_SLACK = 16
+
+# --------------------------
+# PHIÊN GIẢI TĂNG DẦN: GIỮ TOUR VÀ MA TRẬN, CHÈN/XÓA THÀNH PHỐ VỚI CHI PHÍ O(n)
+# --------------------------
+class RouteSession:
+    """
+    Tour và ma trận khoảng cách của một danh sách điểm dừng đang thay đổi.
+    Ma trận nằm trong bộ đệm có sẵn chỗ trống (n + max(16, n/8) khi tạo) và tăng ~1.25 lần khi đầy,
+    nên thêm một thành phố chỉ tính một hàng mới (O(n), chi phí sao chép khi tăng dung lượng được phân bổ đều).
+    Hệ số tăng nhỏ vì bộ đệm là capacity^2: gấp đôi sẽ làm bộ nhớ tăng gấp bốn.
+    Xóa thành phố i chuyển thành phố cuối vào chỗ của i (O(n)) và nối hai láng giềng của i trong tour.
+    tour là danh sách chỉ số bắt đầu tại thành phố xuất phát, không lặp lại điểm đầu.
+    road: RoadDistanceMatrix nếu phiên dùng khoảng cách đường bộ (chỉ thêm được thành phố có trong file),
+          None = Haversine
+    """
+
+    def __init__(self, city_data, distance_matrix, tour, options, road=None):
+        n = len(city_data)
+        self.id = uuid.uuid4().hex
+        self.options = options
+        self.road = road
+        self.cities = list(city_data)
+        self.index = {c["name"]: i for i, c in enumerate(self.cities)}
+        self.tour = [int(c) for c in tour]
+        self.size = n
+        capacity = n + max(SESSION_MIN_SLACK, n // 8)
+        self._matrix = np.empty((capacity, capacity), dtype=np.float64)
+        self._matrix[:n, :n] = distance_matrix
+        self._lat = np.empty(capacity, dtype=np.float64)
+        self._lng = np.empty(capacity, dtype=np.float64)
+        self._lat[:n] = np.radians([float(c["lat"]) for c in city_data])
+        self._lng[:n] = np.radians([float(c["lng"]) for c in city_data])
+        self.updated_at = time.time()
+        self.lock = threading.Lock()
+
+    @property
+    def distance_matrix(self):
+        """Ma trận n×n hiện tại (view trên bộ đệm, không sao chép)"""
+        return self._matrix[:self.size, :self.size]
+
+    def _reserve(self, capacity):
+        if capacity <= len(self._matrix):
+            return
+        current = len(self._matrix)
+        capacity = max(capacity, current + max(SESSION_MIN_SLACK, current // 4))
+        matrix = np.empty((capacity, capacity), dtype=np.float64)
+        matrix[:self.size, :self.size] = self.distance_matrix
+        self._matrix = matrix
+        self._lat = np.resize(self._lat, capacity)
+        self._lng = np.resize(self._lng, capacity)
+
+    def add_city(self, city):
+        """Thêm một thành phố (chỉ tính một hàng khoảng cách) và chèn vào vị trí rẻ nhất của tour"""
+        name = city["name"]
+        if name in self.index:
+            raise ValueError(f"City already in session: {name}")
+        k = self.size
+        self._reserve(k + 1)
+        lat, lng = np.radians(float(city["lat"])), np.radians(float(city["lng"]))
+        if self.road is not None:
+            row = self.road.row(city, self.cities)
+        else:
+            row = haversine_row(lat, lng, self._lat[:k], self._lng[:k])
+        self._matrix[k, :k] = row
+        self._matrix[:k, k] = row
+        self._matrix[k, k] = 0.0
+        self._lat[k], self._lng[k] = lat, lng
+        self.cities.append(city)
+        self.index[name] = k
+        self.size += 1
+
+        # Cheapest insertion: vị trí giữa tour[i] và tour[i+1] làm tăng độ dài ít nhất
+        a = np.asarray(self.tour, dtype=np.intp)
+        b = np.roll(a, -1)
+        cost = self._matrix[k, a] + self._matrix[k, b] - self._matrix[a, b]
+        self.tour.insert(int(np.argmin(cost)) + 1, k)
+        return k
+
+    def remove_city(self, name):
+        """
+        Xóa một thành phố: nối hai láng giềng của nó trong tour (splice).
+        Trả về tên hai thành phố vừa được nối để sửa cục bộ.
+        """
+        if name not in self.index:
+            raise ValueError(f"City not in session: {name}")
+        if self.size <= 2:
+            raise ValueError("Need at least 2 cities")
+        i = self.index.pop(name)
+        position = self.tour.index(i)
+        del self.tour[position]
+        joined = [self.cities[c]["name"] for c in (self.tour[position - 1], self.tour[position % len(self.tour)])]
+
+        # Chuyển thành phố cuối vào chỗ trống để ma trận vẫn liền khối
+        last = self.size - 1
+        if i != last:
+            self._matrix[i, :last] = self._matrix[last, :last]
+            self._matrix[:last, i] = self._matrix[:last, last]
+            self._matrix[i, i] = 0.0
+            self._lat[i], self._lng[i] = self._lat[last], self._lng[last]
+            self.cities[i] = self.cities[last]
+            self.index[self.cities[i]["name"]] = i
+            self.tour[self.tour.index(last)] = i
+        self.cities.pop()
+        self.size -= 1
+        return joined
+
+    def validate_update(self, add, remove):
+        """Kiểm tra toàn bộ thay đổi trước khi sửa phiên (lỗi thì phiên giữ nguyên); ném ValueError"""
+        names = set(self.index)
+        for name in remove:
+            if name not in names:
+                raise ValueError(f"City not in session: {name}")
+            names.discard(name)
+        for city in add:
+            if city["name"] in names:
+                raise ValueError(f"City already in session: {city['name']}")
+            if self.road is not None and not self.road.covers([city]):
+                raise ValueError(f"City not in road distance matrix: {city['name']}")
+            float(city["lat"]), float(city["lng"])
+            names.add(city["name"])
+        if len(names) < 2:
+            raise ValueError("Need at least 2 cities")
+        if self.road is None and choose_backend(len(names)) != "dense":
+            raise ValueError("Too many cities for a session: the full distance matrix exceeds DISTANCE_DENSE_MAX_BYTES")
+
+    def update(self, add=(), remove=(), k=10):
+        """
+        Xóa rồi thêm thành phố, sau đó sửa tour bằng 2-opt cục bộ quanh các vị trí đã thay đổi.
+        Thành phố xuất phát bị xóa thì thành phố kế tiếp trong tour trở thành điểm xuất phát.
+        Trả về độ dài tour mới.
+        """
+        self.validate_update(add, remove)
+        touched = []
+        for name in remove:
+            touched.extend(self.remove_city(name))
+        for city in add:
+            self.add_city(city)
+            touched.append(city["name"])
+        touched = [self.index[name] for name in touched if name in self.index]
+        self.tour, length = local_two_opt(self.tour, self.distance_matrix, touched, k=k)
+        self.updated_at = time.time()
+        return length
+
+    def to_dict(self):
+        path = [self.cities[i]["name"] for i in self.tour]
+        path.append(path[0])
+        return {
+            "session_id": self.id,
+            "num_cities": self.size,
+            "best_solution": path,
+            "best_distance": round(tour_length(self.tour, self.distance_matrix), 2),
+            "distance_source": "road" if self.road is not None else "haversine",
+            "updated_at": self.updated_at,
+        }
+
+class SessionManager:
+    """
+    Lưu các RouteSession trong bộ nhớ.
+    Phiên không được cập nhật quá ttl giây bị xóa; vượt quá max_sessions thì xóa phiên cũ nhất.
+    """
+
+    def __init__(self, max_sessions=256, ttl=1800):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def create(self, city_data, distance_matrix, tour, options, road=None):
+        session = RouteSession(city_data, distance_matrix, tour, options, road)
+        with self._lock:
+            self._prune_locked()
+            self._sessions[session.id] = session
+            while len(self._sessions) > self.max_sessions:
+                oldest = min(self._sessions.values(), key=lambda s: s.updated_at)
+                del self._sessions[oldest.id]
+        return session
+
+    def get(self, session_id):
+        with self._lock:
+            self._prune_locked()
+            return self._sessions.get(session_id)
+
+    def delete(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def _prune_locked(self):
+        """Xóa các phiên không được cập nhật quá ttl giây"""
+        now = time.time()
+        expired = [sid for sid, s in self._sessions.items() if now - s.updated_at > self.ttl]
+        for sid in expired:
+            del self._sessions[sid]
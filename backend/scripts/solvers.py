@@ -0,0 +1,169 @@
+import time
+
+from GBFS import gbfs_tsp
+from wco import wco_tsp
+from wco_parallel import wco_tsp_parallel
+from construction import cheapest_insertion_tour, farthest_insertion_tour, double_tree_tour
+from edges import build_edges
+from local_search import tour_length
+from optimal import optimal_baseline, calculate_solution_quality, calculate_gap_bound
+from timing import PhaseTimer
+
+# Các thuật toán chạy khi request không chỉ định "algorithms" (như cũ)
+DEFAULT_SOLVERS = ("GBFS", "WCO")
+# Khóa cấp cao nhất của response dùng chung cho mọi thuật toán (không được dùng làm tên thuật toán)
+SHARED_RESPONSE_KEYS = ("edges",)
+
+# --------------------------
+# REGISTRY CÁC THUẬT TOÁN GIẢI TSP
+# --------------------------
+class Solver:
+    """
+    Một thuật toán trong registry.
+    solve(city_data, distance_matrix, options, deadline=None, cancel_event=None, edges=None) -> kết quả
+    options: tham số đã kiểm tra bởi parse_route_request
+    deadline_option: tên tham số deadline (ms) của request dành cho thuật toán này (None = không có)
+    needs_distances(options) -> bool: False nếu với các tham số này thuật toán không dùng distance_matrix
+                                      (tự tính khoảng cách từ tọa độ); None = luôn cần
+    """
+
+    def __init__(self, name, solve, deadline_option=None, needs_distances=None):
+        self.name = name
+        self.solve = solve
+        self.deadline_option = deadline_option
+        self._needs_distances = needs_distances
+
+    def needs_distances(self, options):
+        return self._needs_distances is None or bool(self._needs_distances(options))
+
+SOLVERS = {}
+
+def register_solver(name, deadline_option=None, needs_distances=None):
+    """Decorator đăng ký hàm solve vào registry với tên name (needs_distances: xem Solver)"""
+    if name in SHARED_RESPONSE_KEYS:
+        raise ValueError(f"Reserved algorithm name: {name}")
+
+    def decorator(solve):
+        SOLVERS[name] = Solver(name, solve, deadline_option, needs_distances)
+        return solve
+    return decorator
+
+def get_solver(name):
+    solver = SOLVERS.get(name)
+    if solver is None:
+        raise ValueError(f"Unknown algorithm: {name}")
+    return solver
+
+def algorithm_results(response):
+    """Kết quả theo tên thuật toán trong response của server (bỏ các khóa dùng chung như "edges")"""
+    return {name: r for name, r in response.items() if name not in SHARED_RESPONSE_KEYS}
+
+def validate_solvers(names):
+    """Danh sách tên thuật toán không trùng lặp (giữ thứ tự); tên không có trong registry thì ném ValueError"""
+    if isinstance(names, str):
+        names = [names]
+    names = list(dict.fromkeys(names))
+    if not names:
+        raise ValueError("Need at least one algorithm")
+    for name in names:
+        get_solver(name)
+    return names
+
+def solvers_need_distances(names, options):
+    """
+    True nếu request cần khoảng cách giữa các thành phố: có thuật toán dùng distance_matrix,
+    hoặc cần danh sách mọi cạnh / hậu tối ưu (các bước này luôn đọc ma trận)
+    """
+    if options["edge_mode"] == "all" or options["post_optimize"] != "none":
+        return True
+    return any(get_solver(name).needs_distances(options) for name in names)
+
+# --------------------------
+# GBFS VÀ WCO
+# --------------------------
+# Lưới không gian ("spatial") không dùng ma trận: server bỏ qua việc tạo khoảng cách và danh sách cạnh
+@register_solver(
+    "GBFS", deadline_option="gbfs_deadline_ms",
+    needs_distances=lambda options: options["gbfs_index"] != "spatial"
+)
+def solve_gbfs(city_data, distance_matrix, options, deadline=None, cancel_event=None, edges=None):
+    return gbfs_tsp(
+        city_data, distance_matrix=distance_matrix, cancel_event=cancel_event, deadline=deadline,
+        trace=options["trace"], trace_top_k=options["trace_top_k"], edges=edges,
+        edge_mode=options["edge_mode"], edge_k=options["edge_k"],
+        index=options["gbfs_index"], baseline=options["baseline"]
+    )
+
+@register_solver("WCO", deadline_option="wco_deadline_ms")
+def solve_wco(city_data, distance_matrix, options, deadline=None, cancel_event=None, edges=None):
+    common = {
+        "distance_matrix": distance_matrix, "deadline": deadline, "cancel_event": cancel_event,
+        "trace": options["trace"], "trace_top_k": options["trace_top_k"], "edges": edges,
+        "edge_mode": options["edge_mode"], "edge_k": options["edge_k"],
+        "seed": options["seed"], "baseline": options["baseline"], "verbose": False,
+    }
+    if options["wco_islands"] > 1:
+        return wco_tsp_parallel(
+            city_data, num_islands=options["wco_islands"],
+            migration_interval=options["migration_interval"], **common
+        )
+    # Có time budget thì số iteration không bị giới hạn, vòng lặp dừng theo thời gian
+    return wco_tsp(
+        city_data, time_budget_ms=options["wco_time_budget_ms"],
+        stall_iterations=options["wco_stall_iterations"],
+        max_iter=None if options["wco_time_budget_ms"] is not None else 100, **common
+    )
+
+# --------------------------
+# HEURISTIC XÂY DỰNG TOUR (KHÔNG CÓ STEPS CHO ANIMATION)
+# --------------------------
+def build_tour_result(name, city_data, distance_matrix, tour, start_time, timer, options, edges=None):
+    """Response cùng định dạng với GBFS/WCO cho một tour dạng mảng chỉ số bắt đầu tại 0"""
+    cities = [c["name"] for c in city_data]
+    best_distance = tour_length(tour, distance_matrix)
+    path = [cities[j] for j in tour]
+    path.append(path[0])
+
+    if edges is None:
+        edges = build_edges(city_data, distance_matrix, options["edge_mode"], options["edge_k"])
+    timer.lap("edges")
+
+    optimal_distance, optimal_kind = None, None
+    if options["baseline"]:
+        optimal_distance, optimal_kind = optimal_baseline(city_data, distance_matrix)
+    timer.lap("optimal_distance")
+
+    return {
+        "best_solution": path,
+        "best_distance": round(best_distance, 2),
+        "execution_time": round(time.time() - start_time, 4),
+        "cities": city_data,
+        "edges": edges,
+        "steps": [],
+        "starting_point": path[0],
+        "algorithm": name,
+        "optimal_distance": optimal_distance,
+        "solution_quality": calculate_solution_quality(best_distance, optimal_distance),
+        "optimal_exact": optimal_kind == "exact",
+        "optimal_kind": optimal_kind,
+        "gap_bound_pct": calculate_gap_bound(best_distance, optimal_distance, optimal_kind),
+        "timings": timer.as_dict(),
+    }
+
+def register_construction(name, build_tour):
+    """
+    Đăng ký heuristic build_tour(distance_matrix, cancel_event=None) -> tour thành một thuật toán trong registry
+    (build_tour kiểm tra cancel_event ở mỗi bước để server dừng được thuật toán khi thôi chờ)
+    """
+    @register_solver(name)
+    def solve(city_data, distance_matrix, options, deadline=None, cancel_event=None, edges=None):
+        start_time = time.time()
+        timer = PhaseTimer()
+        tour = build_tour(distance_matrix, cancel_event=cancel_event)
+        timer.lap("search")
+        return build_tour_result(name, city_data, distance_matrix, tour, start_time, timer, options, edges)
+    return solve
+
+register_construction("CHEAPEST_INSERTION", cheapest_insertion_tour)
+register_construction("FARTHEST_INSERTION", farthest_insertion_tour)
+register_construction("DOUBLE_TREE", double_tree_tour)
@@ -0,0 +1,188 @@
+import heapq
+import math
+
+import numpy as np
+
+from distance import EARTH_RADIUS_KM
+
+# --------------------------
+# TỌA ĐỘ 3-D TRÊN MẶT CẦU ĐƠN VỊ
+# --------------------------
+def unit_sphere_coords(city_data):
+    """Đổi (lat, lng) sang tọa độ (x, y, z) trên mặt cầu đơn vị, mảng (n, 3)"""
+    lat = np.radians(np.array([c["lat"] for c in city_data], dtype=np.float64))
+    lng = np.radians(np.array([c["lng"] for c in city_data], dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)], axis=1)
+
+def chord_to_km(chord):
+    """
+    Độ dài dây cung trên mặt cầu đơn vị -> khoảng cách đường tròn lớn (km).
+    Hàm đồng biến nên thành phố gần nhất theo dây cung cũng gần nhất theo Haversine.
+    """
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+def distance_row_km(coords, source, targets):
+    """Khoảng cách (km) từ thành phố source đến các thành phố trong targets, trả về mảng độ dài n"""
+    row = np.zeros(len(coords), dtype=np.float64)
+    targets = np.asarray(targets, dtype=np.intp)
+    chord = np.linalg.norm(coords[targets] - coords[source], axis=1)
+    row[targets] = 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, chord / 2))
+    return row
+
+# --------------------------
+# LƯỚI ĐỀU CÓ HỖ TRỢ XÓA ĐIỂM
+# --------------------------
+_shell_cache = {}
+
+def _shell_offsets(r):
+    """Các ô (dx, dy, dz) có max(|dx|, |dy|, |dz|) == r, tạo O(r^2) và cache lại"""
+    offsets = _shell_cache.get(r)
+    if offsets is not None:
+        return offsets
+    if r == 0:
+        offsets = [(0, 0, 0)]
+    else:
+        offsets = []
+        full = range(-r, r + 1)
+        for dx in full:
+            for dy in full:
+                if abs(dx) == r or abs(dy) == r:
+                    offsets.extend((dx, dy, dz) for dz in full)
+                else:
+                    offsets.append((dx, dy, -r))
+                    offsets.append((dx, dy, r))
+    _shell_cache[r] = offsets
+    return offsets
+
+class SphereGrid:
+    """
+    Lưới đều trên hộp bao các điểm (x, y, z) để tìm thành phố gần nhất còn lại.
+    - Mỗi ô giữ danh sách chỉ số thành phố; remove() xóa thành phố đã thăm
+    - Truy vấn duyệt các vỏ ô đồng tâm quanh điểm hỏi, dừng khi không vỏ nào còn lại có thể gần hơn
+    - Khi số điểm còn lại giảm dưới 1/4 lúc dựng lưới thì dựng lại với ô lớn hơn,
+      để các truy vấn cuối GBFS không phải duyệt nhiều ô rỗng
+    Không bao giờ tạo ma trận khoảng cách: bộ nhớ O(n).
+    """
+
+    def __init__(self, coords, points_per_cell=2):
+        self.coords = np.asarray(coords, dtype=np.float64)
+        self.points_per_cell = points_per_cell
+        # list tuple truy cập từng phần tử nhanh hơn ndarray trong vòng lặp Python
+        self._points = [tuple(p) for p in self.coords.tolist()]
+        self._build(np.arange(len(self.coords)))
+
+    def __len__(self):
+        return self.size
+
+    def _build(self, ids):
+        ids = np.asarray(ids, dtype=np.intp)
+        self.size = self._built_size = len(ids)
+        self.cells = {}
+        self._cell_key = {}
+        if len(ids) == 0:
+            return
+        points = self.coords[ids]
+        lo = points.min(axis=0)
+        extent = float(np.max(points.max(axis=0) - lo))
+        self.origin = tuple(lo.tolist())
+        # Các điểm nằm trên một mảnh mặt cầu (gần như 2-D): ~points_per_cell điểm mỗi ô
+        self.dims = max(1, int(math.ceil(math.sqrt(len(ids) / self.points_per_cell))))
+        self.cell_size = extent / self.dims if extent > 0 else 1.0
+        cell_idx = np.floor((points - lo) / self.cell_size).astype(np.int64)
+        np.clip(cell_idx, 0, self.dims - 1, out=cell_idx)
+        keys = (cell_idx[:, 0] * self.dims + cell_idx[:, 1]) * self.dims + cell_idx[:, 2]
+        for i, key in zip(ids.tolist(), keys.tolist()):
+            self.cells.setdefault(key, []).append(i)
+            self._cell_key[i] = key
+
+    def _cell_of(self, point):
+        size = self.cell_size
+        return tuple(int(math.floor((p - o) / size)) for p, o in zip(point, self.origin))
+
+    def remove(self, i):
+        """Xóa thành phố i khỏi lưới (i phải đang có trong lưới)"""
+        key = self._cell_key.pop(i)
+        bucket = self.cells[key]
+        bucket.remove(i)
+        if not bucket:
+            del self.cells[key]
+        self.size -= 1
+        if 0 < self.size < self._built_size // 4:
+            self._build([j for bucket in self.cells.values() for j in bucket])
+
+    def _search(self, point, visit):
+        """
+        Duyệt các ô theo vỏ đồng tâm quanh point, gọi visit(bucket) cho từng ô có điểm.
+        visit trả về bán kính dây cung hiện cần xét; dừng khi mọi ô chưa duyệt đều xa hơn.
+        """
+        if not self.cells:
+            return
+        dims = self.dims
+        qx, qy, qz = self._cell_of(point)
+        # Vỏ nhỏ nhất còn chạm tới lưới (điểm hỏi có thể nằm ngoài hộp bao sau khi dựng lại)
+        r = max(0, -qx, qx - dims + 1, -qy, qy - dims + 1, -qz, qz - dims + 1)
+        r_max = max(qx, dims - 1 - qx, qy, dims - 1 - qy, qz, dims - 1 - qz)
+        radius = math.inf
+        while r <= r_max:
+            # Ô ở vỏ r cách point ít nhất (r - 1) * cell_size
+            if (r - 1) * self.cell_size > radius:
+                return
+            shell = _shell_offsets(r)
+            if len(shell) > len(self.cells):
+                # Vỏ lớn hơn số ô còn điểm: quét thẳng các ô chưa duyệt (ngoài khối vỏ < r)
+                for key, bucket in self.cells.items():
+                    cx, rest = divmod(key, dims * dims)
+                    cy, cz = divmod(rest, dims)
+                    if max(abs(cx - qx), abs(cy - qy), abs(cz - qz)) >= r:
+                        visit(bucket)
+                return
+            for dx, dy, dz in shell:
+                cx, cy, cz = qx + dx, qy + dy, qz + dz
+                if 0 <= cx < dims and 0 <= cy < dims and 0 <= cz < dims:
+                    bucket = self.cells.get((cx * dims + cy) * dims + cz)
+                    if bucket:
+                        radius = visit(bucket)
+            r += 1
+
+    def nearest(self, source):
+        """Thành phố còn trong lưới gần source nhất; trả về (chỉ số, khoảng cách km) hoặc (None, inf)"""
+        px, py, pz = point = self._points[source]
+        points = self._points
+        best = [None, math.inf]  # chỉ số, bình phương dây cung
+
+        def visit(bucket):
+            for j in bucket:
+                x, y, z = points[j]
+                d = (x - px) ** 2 + (y - py) ** 2 + (z - pz) ** 2
+                if d < best[1] or (d == best[1] and j < best[0]):
+                    best[0], best[1] = j, d
+            return math.sqrt(best[1])
+
+        self._search(point, visit)
+        if best[0] is None:
+            return None, math.inf
+        return best[0], chord_to_km(math.sqrt(best[1]))
+
+    def nearest_k(self, source, k):
+        """k thành phố gần source nhất (không tính source), sắp xếp tăng dần: [(chỉ số, km), ...]"""
+        if k <= 0:
+            return []
+        px, py, pz = point = self._points[source]
+        points = self._points
+        heap = []  # max-heap theo (-bình phương dây cung, -chỉ số)
+
+        def visit(bucket):
+            for j in bucket:
+                if j == source:
+                    continue
+                x, y, z = points[j]
+                item = (-((x - px) ** 2 + (y - py) ** 2 + (z - pz) ** 2), -j)
+                if len(heap) < k:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+            return math.sqrt(-heap[0][0]) if len(heap) == k else math.inf
+
+        self._search(point, visit)
+        return [(-j, chord_to_km(math.sqrt(-d))) for d, j in sorted(heap, reverse=True)]
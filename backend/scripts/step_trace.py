@@ -0,0 +1,28 @@
+import numpy as np
+
+# --------------------------
+# MỨC ĐỘ CHI TIẾT CỦA STEP TRACE
+# --------------------------
+# "full":    steps đầy đủ cho animation của frontend (mặc định, như cũ)
+# "summary": steps mã hóa delta - mỗi bước chỉ mang chỉ số thành phố được chọn
+# "none":    không tạo trace (dùng cho production)
+TRACE_LEVELS = ("none", "summary", "full")
+
+def validate_trace(trace):
+    if trace not in TRACE_LEVELS:
+        raise ValueError(f"Invalid trace level: {trace}")
+
+def nearest_candidates(row, candidates, k):
+    """
+    k ứng viên gần nhất (theo row) trong mảng chỉ số candidates, sắp xếp tăng dần.
+    Trả về danh sách [chỉ số, h] với h làm tròn 2 chữ số.
+    """
+    candidates = np.asarray(candidates)
+    if k is None or k >= len(candidates):
+        chosen = candidates[np.argsort(row[candidates], kind="stable")]
+    elif k <= 0:
+        return []
+    else:
+        part = np.argpartition(row[candidates], k - 1)[:k]
+        chosen = candidates[part[np.argsort(row[candidates[part]], kind="stable")]]
+    return [[int(j), round(float(row[j]), 2)] for j in chosen]
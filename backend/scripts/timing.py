@@ -0,0 +1,32 @@
+import time
+
+# --------------------------
+# ĐO THỜI GIAN THEO TỪNG PHA (CHI PHÍ THẤP)
+# --------------------------
+class PhaseTimer:
+    """
+    Cộng dồn thời gian (giây) theo tên pha.
+    lap(name) gán thời gian từ lần lap trước (hoặc lúc tạo) cho pha name;
+    add(name, seconds) cộng thêm thời gian đo riêng cho pha name;
+    charge(name, seconds) như add nhưng trừ khoảng đó khỏi lap kế tiếp,
+    dùng cho pha xen kẽ trong vòng lặp (ví dụ tạo trace trong vòng lặp tìm kiếm).
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self._last = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.add(name, now - self._last)
+        self._last = now
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def charge(self, name, seconds):
+        self.add(name, seconds)
+        self._last += seconds
+
+    def as_dict(self):
+        return {name: round(seconds, 4) for name, seconds in self.phases.items()}
@@ -1,354 +1,413 @@
+import itertools
 import random
-import math
 import time
 
-# Hàm tính khoảng cách Haversine - BỔ SUNG MỚI
-def haversine_distance(lat1, lon1, lat2, lon2):
-    """Calculate Haversine distance between two points in km"""
-    R = 6371  # Earth radius in kilometers
-    lat1_rad = math.radians(lat1)
-    lon1_rad = math.radians(lon1)
-    lat2_rad = math.radians(lat2)
-    lon2_rad = math.radians(lon2)
-    dlat = lat2_rad - lat1_rad
-    dlon = lon2_rad - lon1_rad
-    a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    return R * c
+import numpy as np
+
+from distance import build_distance_matrix
+from optimal import optimal_baseline, calculate_solution_quality, calculate_gap_bound
+from cancellation import check_cancelled
+from step_trace import validate_trace, nearest_candidates
+from edges import build_edges
+from timing import PhaseTimer
 
 # --------------------------
-# HÀM TÍNH OPTIMAL DISTANCE - BỔ SUNG MỚI
+# ĐÁNH GIÁ FITNESS THEO LÔ
 # --------------------------
-def calculate_optimal_distance(city_data):
+def population_distances(population, distance_matrix):
     """
-    Tính khoảng cách tối ưu sử dụng Nearest Neighbor heuristic
+    Tính độ dài chu trình của cả quần thể trong một lần gather-and-sum.
+    population: mảng (số cá thể, số thành phố) các hoán vị chỉ số.
     """
-    if len(city_data) < 2:
-        return 0
-    
-    cities = [c["name"] for c in city_data]
-    num_cities = len(cities)
-    name_to_idx = {c["name"]: i for i, c in enumerate(city_data)}
-    
-    # Tạo ma trận khoảng cách
-    distance_matrix = [[0]*num_cities for _ in range(num_cities)]
-    for i in range(num_cities):
-        for j in range(num_cities):
-            if i != j:
-                distance_matrix[i][j] = haversine_distance(
-                    city_data[i]["lat"], city_data[i]["lng"],
-                    city_data[j]["lat"], city_data[j]["lng"]
-                )
-    
-    def tour_distance(path):
-        """Tính tổng khoảng cách của tour"""
-        dist = 0
-        for i in range(len(path)-1):
-            dist += distance_matrix[name_to_idx[path[i]]][name_to_idx[path[i+1]]]
-        # Quay lại điểm xuất phát
-        dist += distance_matrix[name_to_idx[path[-1]]][name_to_idx[path[0]]]
-        return dist
-    
-    # Sử dụng Nearest Neighbor algorithm để tìm tour gần tối ưu
-    start_city = cities[0]
-    unvisited = set(cities[1:])  # Bỏ qua thành phố đầu
-    current_city = start_city
-    tour = [current_city]
-    
-    while unvisited:
-        # Tìm thành phố gần nhất
-        nearest_city = min(unvisited, 
-                          key=lambda city: distance_matrix[name_to_idx[current_city]][name_to_idx[city]])
-        tour.append(nearest_city)
-        unvisited.remove(nearest_city)
-        current_city = nearest_city
-    
-    # Quay lại điểm xuất phát
-    tour.append(start_city)
-    
-    # Tính khoảng cách tour
-    nn_distance = tour_distance(tour)
-    
-    # Có thể thử thêm 2-opt local search để cải thiện
-    improved_distance = two_opt_improvement(tour, distance_matrix, name_to_idx)
-    
-    return round(min(nn_distance, improved_distance), 2)
+    population = np.asarray(population)
+    return distance_matrix[population, np.roll(population, -1, axis=1)].sum(axis=1)
 
-def two_opt_improvement(tour, distance_matrix, name_to_idx):
+# --------------------------
+# LAI GHÉP OX (ORDER CROSSOVER) THỜI GIAN TUYẾN TÍNH
+# --------------------------
+def order_crossover_batch(parents1, parents2, starts, ends):
     """
-    Cải thiện tour bằng 2-opt local search
+    Lai ghép OX cho nhiều cặp cha mẹ cùng lúc (mỗi hàng là một cặp), O(m·n) bằng NumPy.
+    parents1, parents2: mảng (m, n); starts, ends: mảng (m,) vị trí đoạn giữ lại.
     """
-    best_tour = tour[:-1]  # Bỏ điểm cuối (trùng với điểm đầu)
-    best_distance = tour_distance(best_tour + [best_tour[0]], distance_matrix, name_to_idx)
-    improved = True
-    
-    while improved:
-        improved = False
-        for i in range(1, len(best_tour)-2):
-            for j in range(i+1, len(best_tour)):
-                if j - i == 1:
-                    continue  # Bỏ qua cạnh liền kề
-                
-                # Tạo tour mới bằng cách đảo ngược đoạn i-j
-                new_tour = best_tour[:i] + best_tour[i:j+1][::-1] + best_tour[j+1:]
-                new_distance = tour_distance(new_tour + [new_tour[0]], distance_matrix, name_to_idx)
-                
-                if new_distance < best_distance:
-                    best_tour = new_tour
-                    best_distance = new_distance
-                    improved = True
-                    break
-            if improved:
-                break
-    
-    return best_distance
+    parents1 = np.asarray(parents1)
+    parents2 = np.asarray(parents2)
+    num_children, size = parents1.shape
+    rows = np.arange(num_children)[:, None]
+    positions = np.arange(size)[None, :]
+    starts = np.asarray(starts)[:, None]
+    ends = np.asarray(ends)[:, None]
 
-def tour_distance(path, distance_matrix, name_to_idx):
-    """Tính khoảng cách tour với ma trận khoảng cách cho trước"""
-    dist = 0
-    for i in range(len(path)-1):
-        dist += distance_matrix[name_to_idx[path[i]]][name_to_idx[path[i+1]]]
-    return dist
+    # Vị trí thuộc đoạn giữ lại của parent1 và bitmap thành phố tương ứng
+    segment_mask = (positions >= starts) & (positions <= ends)
+    in_segment = np.zeros((num_children, size), dtype=bool)
+    seg_rows, seg_cols = np.nonzero(segment_mask)
+    in_segment[seg_rows, parents1[seg_rows, seg_cols]] = True
+
+    # Các gen còn lại của parent2 (giữ thứ tự) được điền vòng từ end+1
+    keep = ~in_segment[rows, parents2]
+    rank = np.cumsum(keep, axis=1) - 1
+    targets = (ends + 1 + rank) % size
+
+    children = np.empty((num_children, size), dtype=np.int32)
+    children[segment_mask] = parents1[segment_mask]
+    keep_rows, keep_cols = np.nonzero(keep)
+    children[keep_rows, targets[keep_rows, keep_cols]] = parents2[keep_rows, keep_cols]
+    return children
 
 # --------------------------
-# HÀM TÍNH SOLUTION QUALITY - BỔ SUNG MỚI
+# TOÁN TỬ ĐỘT BIẾN
 # --------------------------
-def calculate_solution_quality(best_distance, optimal_distance):
-    """
-    Tính chất lượng nghiệm (0-100%)
-    """
-    if best_distance <= 0 or optimal_distance <= 0:
-        return 0.0
-    
-    quality = (optimal_distance / best_distance) * 100
-    
-    # Giới hạn tối đa 100%
-    return min(round(quality, 1), 100.0)
+# Toán tử cho TSP hoán đổi và đảo ngược (toán tử tiến hóa mutation và crossover)
+def swap_mutation(path, rng=random): # hoán đổi giúp đa dạng hóa quần thể
+    """Đột biến hoán đổi 2 thành phố"""
+    new_path = path.copy()
+    if len(path) < 2:
+        return new_path
+    i, j = rng.sample(range(len(new_path)), 2)
+    new_path[i], new_path[j] = new_path[j], new_path[i]
+    return new_path
+
+def inversion_mutation(path, rng=random): # đảo ngược giúp tìm kiếm cục bộ, cải thiện khai phá
+    """Đột biến đảo ngược đoạn"""
+    new_path = path.copy()
+    if len(path) < 3:
+        return new_path
+    i, j = sorted(rng.sample(range(len(new_path)), 2))
+    new_path[i:j+1] = new_path[i:j+1][::-1]
+    return new_path
 
 # --------------------------
-# HÀM WCO CHÍNH - GIỮ NGUYÊN CẤU TRÚC CŨ + BỔ SUNG TÍNH NĂNG MỚI
+# QUẦN THỂ VÀ VÒNG LẶP TIẾN HÓA
 # --------------------------
-def wco_tsp(city_data: list, num_whales=30, max_iter=100):
+# Lý do dừng vòng lặp WCO
+# "max_iter":    chạy đủ số iteration
+# "time_budget": hết time_budget_ms
+# "stalled":     stall_iterations iteration liên tiếp không cải thiện best
+# "deadline":    hết deadline của request (kết quả là best-so-far, "partial": true)
+STOP_REASONS = ("max_iter", "time_budget", "stalled", "deadline")
+
+def init_population(num_whales, distance_matrix, rng=random):
     """
-    WCO (Whale Optimization Algorithm) cho TSP - Phiên bản sửa lỗi hoàn toàn
+    Khởi tạo quần thể cá voi với các lộ trình ngẫu nhiên.
+    Trả về (whales, fitness): whales là mảng (num_whales, num_cities) int32, fitness là độ dài từng cá thể.
     """
-    start_time = time.time() #Lưu thời gian bắt đầu, tính toán thời gian chạy
-    
-    if not city_data or len(city_data) < 2: #Nếu không có dữ liệu hoặc dưới 2 thành phố thì trả về kết quả trống
-        return {
-            "best_solution": [], "best_distance": 0, "execution_time": 0,
-            "cities": [], "edges": [], "steps": [], 
-            "starting_point": "", "algorithm": "WCO",
-            "optimal_distance": 0, "solution_quality": 0  # BỔ SUNG MỚI
-        }
-    
-    cities = [c["name"] for c in city_data] #Chuẩn bị danh sách tên thành phố
-    num_cities = len(cities)
-    name_to_idx = {c["name"]: i for i, c in enumerate(city_data)} #Lưu chỉ số (index) cho từng thành phố => Tạo map để truy cập nhanh ma trận khoảng cách
-    
-    # Ma trận khoảng cách (tính toán khoảng cách giữa mọi thành phố bằng công thức haversine)
-    distance_matrix = [[0]*num_cities for _ in range(num_cities)]
-    for i in range(num_cities):
-        for j in range(num_cities):
-            if i != j:
-                distance_matrix[i][j] = haversine_distance(
-                    city_data[i]["lat"], city_data[i]["lng"],
-                    city_data[j]["lat"], city_data[j]["lng"]
-                )
-    
-    # Hàm tính tổng khoảng cách lộ trình (đánh giá chất lượng lộ trình)
-    def total_distance(path):
-        """Tính tổng khoảng cách của lộ trình TSP"""
-        dist = 0
-        for i in range(len(path)-1):
-            dist += distance_matrix[name_to_idx[path[i]]][name_to_idx[path[i+1]]]
-        return dist
-    
-    # Toán tử cho TSP hoán đổi và đảo ngược (toán tử tiến hóa mutation và crossover)
-    def swap_mutation(path): # hoán đổi giúp đa dạng hóa quần thể
-        """Đột biến hoán đổi 2 thành phố"""
-        if len(path) < 2:
-            return path.copy()
-        new_path = path.copy()
-        i, j = random.sample(range(len(new_path)), 2)
-        new_path[i], new_path[j] = new_path[j], new_path[i]
-        return new_path
-    
-    def inversion_mutation(path): # đảo ngược giúp tìm kiếm cục bộ, cải thiện khai phá
-        """Đột biến đảo ngược đoạn"""
-        if len(path) < 3:
-            return path.copy()
-        new_path = path.copy()
-        i, j = sorted(random.sample(range(len(new_path)), 2))
-        new_path[i:j+1] = reversed(new_path[i:j+1])
-        return new_path
+    num_cities = len(distance_matrix)
+    whales = np.empty((num_whales, num_cities), dtype=np.int32)
+    for i in range(num_whales): #mỗi cá thể là một lộ trình ngẫu nhiên
+        whales[i] = rng.sample(range(num_cities), num_cities)
+    return whales, population_distances(whales, distance_matrix)
+
+def evolve_population(whales, fitness, best_whale, best_distance, distance_matrix,
+                      iterations, max_iter, rng=random, verbose=True, deadline=None,
+                      cancel_event=None, time_window=None, stall_iterations=None):
+    """
+    Chạy các iteration của WCO trên quần thể (whales, fitness được cập nhật tại chỗ).
+    iterations: dãy chỉ số iteration cần chạy (ví dụ range(0, max_iter)), max_iter dùng cho lịch giảm của a
+                (None = không giới hạn số iteration, a chỉ theo thời gian)
+    deadline: mốc time.monotonic() để dừng sớm, giữ lại best-so-far (None = chạy hết)
+    cancel_event: threading.Event; khi được set thì ném SolveCancelled
+    time_window: (start, end) theo time.monotonic() của time budget; dừng tại end
+                 và a giảm theo tỉ lệ thời gian đã trôi qua
+    stall_iterations: dừng sau số iteration liên tiếp không cải thiện best (None = không dừng sớm)
+    Trả về (best_whale, best_distance, history, stop_reason) với history là danh sách
+    (iteration, iteration_best, iteration_best_whale) của từng iteration đã chạy
+    và stop_reason thuộc STOP_REASONS.
+    """
+    num_whales, num_cities = whales.shape
+    history = []
+    stall = 0
+    stop_reason = "max_iter"
     
-    def crossover(parent1, parent2): # lai giúp kết hợp thông tin từ 2 cá thể tốt, giữ nguyên thứ tự thành phố
-        """Lai ghép OX (Order Crossover) cho TSP"""
-        if len(parent1) != len(parent2):
-            return parent1.copy()
-            
-        size = len(parent1)
-        start, end = sorted(random.sample(range(size), 2))
+    for iteration in iterations:
+        check_cancelled(cancel_event)
+        now = time.monotonic()
+        if deadline is not None and now >= deadline:
+            stop_reason = "deadline"
+            break
+        if time_window is not None and now >= time_window[1]:
+            stop_reason = "time_budget"
+            break
+        if stall_iterations is not None and stall >= stall_iterations:
+            stop_reason = "stalled"
+            break
         
-        child = [None] * size
-        child[start:end+1] = parent1[start:end+1]
-        
-        # Điền các thành phố còn lại từ parent2
-        pointer = (end + 1) % size
-        for city in parent2:
-            if city not in child:
-                child[pointer] = city
-                pointer = (pointer + 1) % size
-        
-        return child
-    
-    # Khởi tạo quần thể cá voi (whales) với các lộ trình ngẫu nhiên
-    whales = []
-    for _ in range(num_whales): #mỗi cá thể là một lộ trình ngẫu nhiên
-        path = cities.copy()
-        random.shuffle(path)
-        path.append(path[0])  # khép vòng bằng việc append city đầu tiên vào cuối
-        whales.append(path)
-    
-    best_whale = min(whales, key=total_distance) #tìm cá thể tốt nhất ban đầu
-    best_distance = total_distance(best_whale)
-    
-    steps = []
-    iteration_best_distances = []  # Lưu best distance của từng iteration
-    
-    print(f" WCO starting - Population: {num_whales}, Iterations: {max_iter}")
-    print(f" Initial best distance: {best_distance:.2f} km")
-    
-    #vòng lặp chính của WCO
-    for iteration in range(max_iter):
-        a = 2.0 - iteration * (2.0 / max_iter)  # a giảm từ 2 -> 0, điều khiển cân bằng khám phá và khai thác
+        # Tiến độ của lần chạy (0 -> 1): theo số iteration và/hoặc theo thời gian đã trôi qua
+        progress = iteration / max_iter if max_iter else 0.0
+        if time_window is not None:
+            start, end = time_window
+            progress = max(progress, (now - start) / (end - start) if end > start else 1.0)
+        a = 2.0 - 2.0 * min(1.0, progress)  # a giảm từ 2 -> 0, điều khiển cân bằng khám phá và khai thác
         
         iteration_best = best_distance
-        iteration_best_whale = best_whale.copy()
+        iteration_best_whale = best_whale
         
+        # Sinh toàn bộ cá thể mới của iteration từ quần thể hiện tại, sau đó đánh giá theo lô
+        candidates = np.empty_like(whales)
+        crossover_rows, crossover_mates = [], []  # lai ghép được gom lại để chạy theo lô
         for i in range(num_whales):
-            current_whale = whales[i][:-1]  # bỏ city cuối
+            current_whale = whales[i]
             
             #cập nhật vị trí cá voi, A,p quyết định chiến lược di chuyển
-            r = random.random()
+            r = rng.random()
             A = 2 * a * r - a  # A ∈ [-a, a]
-            p = random.random()
+            p = rng.random()
             
             if p < 0.5: 
                 if abs(A) < 1: # nếu |A| < 1 thì thực hiện khai thác
                     # EXPLOITATION: Di chuyển về best solution
-                    if random.random() < 0.7:
-                        new_whale = crossover(current_whale, best_whale[:-1])
+                    if rng.random() < 0.7:
+                        crossover_rows.append(i)
+                        crossover_mates.append(best_whale)
+                        continue
                     else:
-                        new_whale = swap_mutation(best_whale[:-1])
+                        new_whale = swap_mutation(best_whale, rng)
                 else:
                     # nếu |A| >= 1 thì thực hiện khám phá ngẫu nhiên
                     # EXPLORATION: Tìm kiếm ngẫu nhiên
-                    rand_idx = random.randint(0, num_whales-1)
-                    rand_whale = whales[rand_idx][:-1]
+                    rand_idx = rng.randint(0, num_whales-1)
+                    rand_whale = whales[rand_idx]
                     
-                    if random.random() < 0.7:
-                        new_whale = crossover(current_whale, rand_whale)
+                    if rng.random() < 0.7:
+                        crossover_rows.append(i)
+                        crossover_mates.append(rand_whale)
+                        continue
                     else:
-                        new_whale = swap_mutation(rand_whale)
+                        new_whale = swap_mutation(rand_whale, rng)
             else:
                 # SPIRAL UPDATE: Local search
-                if random.random() < 0.5: # cập nhật bằng xoắn ốc (spiral)
-                    new_whale = inversion_mutation(current_whale)
+                if rng.random() < 0.5: # cập nhật bằng xoắn ốc (spiral)
+                    new_whale = inversion_mutation(current_whale, rng)
                 else:
-                    new_whale = swap_mutation(current_whale)
-            
-            # Đảm bảo lộ trình hợp lệ
-            new_whale.append(new_whale[0])
-            
-            # Chọn lọc
-            new_distance = total_distance(new_whale)
-            if new_distance < total_distance(whales[i]): # giữ cá thể tốt hơn
-                whales[i] = new_whale
-            
-            # Cập nhật best toàn cục
-            if new_distance < best_distance:
-                best_whale = new_whale.copy()
-                best_distance = new_distance
-                print(f"🔥 Iteration {iteration}: New best distance = {best_distance:.2f} km")
+                    new_whale = swap_mutation(current_whale, rng)
             
-            # Cập nhật best của iteration
-            if new_distance < iteration_best:
-                iteration_best = new_distance
-                iteration_best_whale = new_whale.copy()
+            candidates[i] = new_whale
         
-        # Lưu best distance của iteration
-        iteration_best_distances.append(iteration_best)
+        # Lai ghép OX theo lô: mỗi cá voi giữ một đoạn của chính nó, phần còn lại theo thứ tự của bạn lai
+        if crossover_rows:
+            cuts = np.sort(np.array([rng.sample(range(num_cities), 2) for _ in crossover_rows]), axis=1)
+            candidates[crossover_rows] = order_crossover_batch(
+                whales[crossover_rows], np.stack(crossover_mates), cuts[:, 0], cuts[:, 1]
+            )
         
-        # Lưu bước cho animation - MỖI ITERATION ĐỀU CÓ DỮ LIỆU KHÁC NHAU
-        current_best_for_step = iteration_best_whale
+        # Chọn lọc: chỉ đánh giá các cá thể mới, fitness của cá thể cũ đã lưu sẵn
+        candidate_distances = population_distances(candidates, distance_matrix)
+        improved = candidate_distances < fitness # giữ cá thể tốt hơn
+        whales[improved] = candidates[improved]
+        fitness[improved] = candidate_distances[improved]
         
-        # Tạo neighbors thực tế
-        current_city = current_best_for_step[0]
-        neighbors = []
-        for city in cities:
-            if city != current_city and city in current_best_for_step:
-                distance = distance_matrix[name_to_idx[current_city]][name_to_idx[city]]
-                neighbors.append({
-                    "name": city, 
-                    "h": round(distance, 2)
-                })
+        # Cập nhật best của iteration và best toàn cục
+        candidate_idx = int(np.argmin(candidate_distances))
+        if candidate_distances[candidate_idx] < iteration_best:
+            iteration_best = float(candidate_distances[candidate_idx])
+            iteration_best_whale = candidates[candidate_idx].copy()
+        if iteration_best < best_distance:
+            best_whale = iteration_best_whale
+            best_distance = iteration_best
+            stall = 0
+            if verbose:
+                print(f"🔥 Iteration {iteration}: New best distance = {best_distance:.2f} km")
+        else:
+            stall += 1
+        
+        history.append((iteration, iteration_best, iteration_best_whale))
+    
+    return best_whale, best_distance, history, stop_reason
+
+# --------------------------
+# TẠO RESPONSE CHO FRONTEND
+# --------------------------
+def build_wco_steps(history, cities, distance_matrix, max_steps=50, trace="full", trace_top_k=None):
+    """
+    Tạo steps cho animation từ lịch sử best của từng iteration (lấy đều tối đa max_steps bước)
+    trace: "full" (như cũ) | "summary" (chỉ iteration và currentBestDistance) | "none" (không có steps)
+    trace_top_k: số neighbors gần nhất trong mỗi step ở mức "full" (mặc định 3), cùng nghĩa với GBFS
+    """
+    if trace == "none":
+        return []
+    num_neighbors = 3 if trace_top_k is None else trace_top_k
+    
+    # Đảm bảo có đúng 50 steps (lấy đều từ các iteration)
+    if len(history) > max_steps:
+        step_interval = max(1, len(history) // max_steps)
+        history = history[::step_interval][:max_steps]
+    
+    if trace == "summary":
+        return [
+            {"step": k + 1, "iteration": iteration + 1, "currentBestDistance": round(iteration_best, 2)}
+            for k, (iteration, iteration_best, _) in enumerate(history)
+        ]
+    
+    steps = []
+    for iteration_best, current_best_for_step in ((h[1], h[2]) for h in history):
+        # Neighbors là các thành phố gần thành phố hiện tại nhất (như step của GBFS)
+        current_idx = int(current_best_for_step[0])
+        current_city = cities[current_idx]
+        others = np.delete(np.arange(len(cities)), current_idx)
+        neighbors = [
+            {"name": cities[j], "h": h}
+            for j, h in nearest_candidates(distance_matrix[current_idx], others, num_neighbors)
+        ]
         
         # Lấy thành phố tiếp theo trong lộ trình
-        next_city_idx = (current_best_for_step.index(current_city) + 1) % len(current_best_for_step)
-        chosen_city = current_best_for_step[next_city_idx]
+        chosen_city = cities[int(current_best_for_step[1 % len(cities)])]
         
         steps.append({
-            "step": iteration + 1,
+            "step": len(steps) + 1,
             "currentCity": current_city,
-            "neighbors": neighbors[:3],  # Chỉ lấy 3 neighbors đầu
+            "neighbors": neighbors,  # Chỉ lấy vài neighbors gần nhất
             "chosenCity": chosen_city,
             "consideredEdge": {"from": current_city, "to": chosen_city},
             "chosenEdge": {"from": current_city, "to": chosen_city},
-            "partialPath": current_best_for_step[:-1],  # Bỏ city cuối
+            "partialPath": [cities[j] for j in current_best_for_step.tolist()],
             "currentBestDistance": round(iteration_best, 2)
         })
-    
-    # Đảm bảo có đúng 50 steps (lấy đều từ các iteration)
-    if len(steps) > 50:
-        step_interval = max(1, len(steps) // 50)
-        steps = steps[::step_interval][:50]
-    
-    # Cập nhật step numbers
-    for i, step in enumerate(steps):
-        step["step"] = i + 1
+    return steps
+
+def build_wco_result(city_data, distance_matrix, best_whale, best_distance, history, start_time,
+                     verbose=True, partial=False, trace="full", trace_top_k=None,
+                     edges=None, edge_mode="all", edge_k=5, stop_reason=None, timer=None, baseline=True):
+    """
+    Ánh xạ kết quả dạng chỉ số về tên thành phố và tạo response cho frontend
+    partial: True nếu thuật toán bị dừng do hết deadline (kết quả là best-so-far)
+    stop_reason: lý do dừng (STOP_REASONS); None = suy ra từ partial
+    trace, trace_top_k: mức chi tiết của steps (xem build_wco_steps)
+    edges: danh sách cạnh đã tạo sẵn cho cả request (None = tự tạo theo edge_mode/edge_k)
+    timer: PhaseTimer của lần chạy (các pha tạo response được ghi tiếp vào đó)
+    baseline: False = bỏ qua optimal_distance (các trường chất lượng nghiệm là None)
+    """
+    if timer is None:
+        timer = PhaseTimer()
+    cities = [c["name"] for c in city_data]
+    num_cities = len(cities)
+    steps = build_wco_steps(history, cities, distance_matrix, trace=trace, trace_top_k=trace_top_k)
+    timer.lap("trace")
     
     # Tạo edges
-    edges = []
-    for i in range(num_cities):
-        for j in range(i+1, num_cities):
-            edges.append({
-                "from": cities[i],
-                "to": cities[j], 
-                "distance": round(distance_matrix[i][j], 2)
-            })
+    if edges is None:
+        edges = build_edges(city_data, distance_matrix, edge_mode, edge_k)
+    timer.lap("edges")
     
     # BỔ SUNG TÍNH NĂNG MỚI TỪ SERVER
-    optimal_distance = calculate_optimal_distance(city_data)
+    optimal_distance, optimal_kind = None, None
+    if baseline:
+        optimal_distance, optimal_kind = optimal_baseline(city_data, distance_matrix)
     solution_quality = calculate_solution_quality(best_distance, optimal_distance)
+    timer.lap("optimal_distance")
     
-    print(f" WCO completed - Total iterations: {max_iter}")
-    print(f" Steps generated: {len(steps)}")
-    print(f" Final best distance: {round(best_distance, 2)} km")
-    print(f" Best distance improvement: {iteration_best_distances[0]:.2f} -> {best_distance:.2f} km")
-    print(f" Optimal distance: {optimal_distance:.2f} km")  # BỔ SUNG MỚI
-    print(f" Solution quality: {solution_quality}%")  # BỔ SUNG MỚI
+    if verbose:
+        print(f" WCO completed - Total iterations: {len(history)}")
+        print(f" Steps generated: {len(steps)}")
+        print(f" Final best distance: {round(best_distance, 2)} km")
+        if history:
+            print(f" Best distance improvement: {history[0][1]:.2f} -> {best_distance:.2f} km")
+        if baseline:
+            print(f" Optimal distance: {optimal_distance:.2f} km")  # BỔ SUNG MỚI
+            print(f" Solution quality: {solution_quality}%")  # BỔ SUNG MỚI
+    
+    # Ánh xạ chỉ số về tên thành phố và khép vòng
+    best_solution = [cities[j] for j in best_whale.tolist()]
+    best_solution.append(best_solution[0])
     
     return {
-        "best_solution": best_whale,
+        "best_solution": best_solution,
         "best_distance": round(best_distance, 2),
         "execution_time": round(time.time() - start_time, 4),
         "cities": city_data,
         "edges": edges,
         "steps": steps,
-        "starting_point": best_whale[0],
+        "starting_point": best_solution[0],
         "algorithm": "WCO",
         "optimal_distance": optimal_distance,  # BỔ SUNG MỚI
-        "solution_quality": solution_quality   # BỔ SUNG MỚI
-    }
\ No newline at end of file
+        "solution_quality": solution_quality,  # BỔ SUNG MỚI
+        "optimal_exact": optimal_kind == "exact",  # True nếu optimal_distance là tối ưu thật (Held-Karp)
+        "optimal_kind": optimal_kind,  # "exact" | "lower_bound" | "heuristic"
+        "gap_bound_pct": calculate_gap_bound(best_distance, optimal_distance, optimal_kind),
+        "partial": partial,
+        "iterations": len(history),
+        "stop_reason": stop_reason or ("deadline" if partial else "max_iter"),
+        "timings": timer.as_dict()
+    }
+
+def empty_wco_result():
+    """Kết quả rỗng khi không đủ dữ liệu"""
+    return {
+        "best_solution": [], "best_distance": 0, "execution_time": 0,
+        "cities": [], "edges": [], "steps": [], 
+        "starting_point": "", "algorithm": "WCO",
+        "optimal_distance": 0, "solution_quality": 0,  # BỔ SUNG MỚI
+        "optimal_exact": True, "optimal_kind": "exact", "gap_bound_pct": 0
+    }
+
+# --------------------------
+# HÀM WCO CHÍNH - GIỮ NGUYÊN CẤU TRÚC CŨ + BỔ SUNG TÍNH NĂNG MỚI
+# --------------------------
+def wco_tsp(city_data: list, num_whales=30, max_iter=100, distance_matrix=None, deadline=None,
+            cancel_event=None, trace="full", trace_top_k=None, edges=None, edge_mode="all", edge_k=5,
+            time_budget_ms=None, stall_iterations=None, seed=None, baseline=True, verbose=True):
+    """
+    WCO (Whale Optimization Algorithm) cho TSP - Phiên bản sửa lỗi hoàn toàn
+    distance_matrix: ma trận NumPy tính sẵn bởi build_distance_matrix hoặc backend của distance_store
+                     (nếu None sẽ tự tạo)
+    max_iter: số iteration tối đa; None = không giới hạn (cần time_budget_ms)
+    deadline: mốc time.monotonic(); quá hạn thì trả về best-so-far với "partial": True
+    time_budget_ms: chế độ anytime - dừng khi hết thời gian, a giảm theo thời gian đã trôi qua
+    stall_iterations: dừng sớm sau số iteration liên tiếp không cải thiện best
+    baseline: False = bỏ qua optimal_distance (các trường chất lượng nghiệm là None)
+    seed: seed cho RNG riêng của lần chạy (cùng dữ liệu + cùng seed -> cùng kết quả); None = module random
+    cancel_event: threading.Event; khi được set thì ném SolveCancelled ở iteration kế tiếp
+    trace: "full" | "summary" | "none" - mức chi tiết của steps
+    edges: danh sách cạnh đã tạo sẵn cho cả request (None = tự tạo theo edge_mode/edge_k)
+    verbose: False = không in tiến trình ra stdout (server)
+    """
+    start_time = time.time() #Lưu thời gian bắt đầu, tính toán thời gian chạy
+    timer = PhaseTimer()
+    validate_trace(trace)
+    if max_iter is None and time_budget_ms is None:
+        raise ValueError("max_iter=None requires time_budget_ms")
+    
+    if not city_data or len(city_data) < 2: #Nếu không có dữ liệu hoặc dưới 2 thành phố thì trả về kết quả trống
+        return empty_wco_result()
+    
+    # Ma trận khoảng cách (dùng chung ma trận đã tính nếu server truyền vào)
+    if distance_matrix is None:
+        distance_matrix = build_distance_matrix(city_data)
+        timer.lap("distance_matrix")
+    else:
+        timer.lap("setup")
+    
+    # Mỗi cá voi là một hoán vị int32 các chỉ số thành phố (không lưu lại thành phố đầu ở cuối),
+    # tên thành phố chỉ được ánh xạ lại khi tạo response
+    rng = random if seed is None else random.Random(seed)
+    whales, fitness = init_population(num_whales, distance_matrix, rng)
+    
+    best_idx = int(np.argmin(fitness)) #tìm cá thể tốt nhất ban đầu
+    best_whale = whales[best_idx].copy()
+    best_distance = float(fitness[best_idx])
+    timer.lap("init_population")
+    
+    if verbose:
+        print(f" WCO starting - Population: {num_whales}, Iterations: {max_iter}")
+        print(f" Initial best distance: {best_distance:.2f} km")
+    
+    # Time budget tính từ lúc bắt đầu vòng lặp (sau khi khởi tạo quần thể)
+    time_window = None
+    if time_budget_ms is not None:
+        loop_start = time.monotonic()
+        time_window = (loop_start, loop_start + float(time_budget_ms) / 1000.0)
+    iterations = itertools.count() if max_iter is None else range(max_iter)
+    
+    #vòng lặp chính của WCO
+    best_whale, best_distance, history, stop_reason = evolve_population(
+        whales, fitness, best_whale, best_distance, distance_matrix, iterations, max_iter, rng=rng,
+        verbose=verbose, deadline=deadline, cancel_event=cancel_event, time_window=time_window,
+        stall_iterations=stall_iterations
+    )
+    timer.lap("search")
+    
+    return build_wco_result(
+        city_data, distance_matrix, best_whale, best_distance, history, start_time, verbose=verbose,
+        partial=stop_reason == "deadline", trace=trace, trace_top_k=trace_top_k,
+        edges=edges, edge_mode=edge_mode, edge_k=edge_k, stop_reason=stop_reason, timer=timer,
+        baseline=baseline
+    )
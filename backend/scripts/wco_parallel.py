@@ -0,0 +1,170 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from distance import build_distance_matrix
+from wco import init_population, evolve_population, build_wco_result, empty_wco_result
+from cancellation import check_cancelled
+from step_trace import validate_trace
+from timing import PhaseTimer
+
+# --------------------------
+# PROCESS POOL DÙNG CHUNG CHO CÁC ĐẢO (ISLANDS)
+# --------------------------
+_island_pool = None
+_island_pool_lock = threading.Lock()
+
+def get_island_pool(max_workers=None):
+    """Tạo (một lần) process pool chạy các đảo WCO"""
+    global _island_pool
+    with _island_pool_lock:
+        if _island_pool is None:
+            _island_pool = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count())
+        return _island_pool
+
+def _attach_shared_matrix(shm_name, shape):
+    """Gắn vào ma trận khoảng cách trong shared memory (không copy, không pickle)"""
+    try:
+        shm = shared_memory.SharedMemory(name=shm_name, track=False)  # Python >= 3.13
+    except TypeError:
+        # Worker dùng chung resource_tracker với process cha, process cha sẽ unlink vùng nhớ
+        shm = shared_memory.SharedMemory(name=shm_name)
+    return shm, np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+def _run_island_epoch(shm_name, shape, whales, fitness, best_whale, best_distance,
+                      start_iter, end_iter, max_iter, seed, deadline=None):
+    """Chạy một đảo từ start_iter đến end_iter trong process con"""
+    shm, distance_matrix = _attach_shared_matrix(shm_name, shape)
+    try:
+        best_whale, best_distance, history, _ = evolve_population(
+            whales, fitness, best_whale, best_distance, distance_matrix,
+            range(start_iter, end_iter), max_iter, rng=random.Random(seed), verbose=False,
+            deadline=deadline
+        )
+        return whales, fitness, best_whale, best_distance, history
+    finally:
+        del distance_matrix
+        shm.close()
+
+# --------------------------
+# DI CƯ GIỮA CÁC ĐẢO (MÔ HÌNH VÒNG)
+# --------------------------
+def migrate(islands, num_migrants):
+    """
+    Mỗi đảo gửi num_migrants cá voi tốt nhất sang đảo kế tiếp trong vòng,
+    thay thế các cá voi kém nhất ở đó.
+    islands: danh sách dict có "whales" và "fitness".
+    """
+    if len(islands) < 2 or num_migrants <= 0:
+        return
+    emigrants = []
+    for island in islands:
+        elite = np.argsort(island["fitness"])[:num_migrants]
+        emigrants.append((island["whales"][elite].copy(), island["fitness"][elite].copy()))
+
+    for k, island in enumerate(islands):
+        whales, fitness = emigrants[k - 1]  # nhận từ đảo đứng trước
+        worst = np.argsort(island["fitness"])[::-1][:len(whales)]
+        island["whales"][worst] = whales
+        island["fitness"][worst] = fitness
+
+# --------------------------
+# HÀM WCO SONG SONG THEO MÔ HÌNH ĐẢO
+# --------------------------
+def wco_tsp_parallel(city_data: list, num_islands=4, num_whales=30, max_iter=100,
+                     migration_interval=10, num_migrants=2, distance_matrix=None, max_workers=None,
+                     deadline=None, cancel_event=None, trace="full", trace_top_k=None,
+                     edges=None, edge_mode="all", edge_k=5, seed=None,
+                     baseline=True, verbose=True):
+    """
+    WCO chạy nhiều quần thể độc lập (đảo) song song trên process pool.
+    - Ma trận khoảng cách được chia sẻ qua shared memory thay vì pickle cho từng task
+    - Sau mỗi migration_interval iteration, các đảo trao đổi num_migrants cá voi tốt nhất
+    - deadline: mốc time.monotonic() (dùng chung giữa các process); quá hạn thì trả về best-so-far
+    - cancel_event: threading.Event của process cha, được kiểm tra giữa các lần di cư
+    - trace, trace_top_k, edges, edge_mode, edge_k, baseline, verbose: như wco_tsp
+    - seed: quyết định quần thể ban đầu và seed của từng đảo ở mỗi epoch (None = module random)
+    Trả về kết quả tốt nhất toàn cục với cùng định dạng như wco_tsp.
+    """
+    start_time = time.time()
+    timer = PhaseTimer()
+    validate_trace(trace)
+
+    if not city_data or len(city_data) < 2:
+        return empty_wco_result()
+
+    if distance_matrix is None:
+        distance_matrix = build_distance_matrix(city_data)
+        timer.lap("distance_matrix")
+    distance_matrix = np.ascontiguousarray(distance_matrix, dtype=np.float64)
+    migration_interval = max(1, int(migration_interval))
+    rng = random if seed is None else random.Random(seed)
+    timer.lap("setup")
+
+    # Khởi tạo quần thể của từng đảo ngay tại process cha
+    islands = []
+    for _ in range(max(1, num_islands)):
+        whales, fitness = init_population(num_whales, distance_matrix, rng)
+        best_idx = int(np.argmin(fitness))
+        islands.append({
+            "whales": whales,
+            "fitness": fitness,
+            "best_whale": whales[best_idx].copy(),
+            "best_distance": float(fitness[best_idx]),
+            "history": [],
+        })
+    timer.lap("init_population")
+
+    if verbose:
+        print(f" WCO parallel starting - Islands: {len(islands)}, Population/island: {num_whales}, Iterations: {max_iter}")
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, distance_matrix.nbytes))
+    try:
+        np.ndarray(distance_matrix.shape, dtype=np.float64, buffer=shm.buf)[:] = distance_matrix
+        pool = get_island_pool(max_workers)
+
+        for epoch_start in range(0, max_iter, migration_interval):
+            check_cancelled(cancel_event)
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            epoch_end = min(epoch_start + migration_interval, max_iter)
+            futures = [
+                pool.submit(
+                    _run_island_epoch, shm.name, distance_matrix.shape,
+                    island["whales"], island["fitness"], island["best_whale"], island["best_distance"],
+                    epoch_start, epoch_end, max_iter, rng.randrange(2**32), deadline
+                )
+                for island in islands
+            ]
+            for island, future in zip(islands, futures):
+                whales, fitness, best_whale, best_distance, history = future.result()
+                island.update(whales=whales, fitness=fitness, best_whale=best_whale, best_distance=best_distance)
+                island["history"].extend(history)
+
+            if epoch_end < max_iter:
+                migrate(islands, num_migrants)
+    finally:
+        shm.close()
+        shm.unlink()
+
+    # Best toàn cục và lịch sử best theo từng iteration (lấy đảo tốt nhất ở mỗi iteration)
+    best_island = min(islands, key=lambda island: island["best_distance"])
+    history = [
+        min(entries, key=lambda entry: entry[1])
+        for entries in zip(*(island["history"] for island in islands))
+    ]
+
+    timer.lap("search")
+
+    result = build_wco_result(
+        city_data, distance_matrix, best_island["best_whale"], best_island["best_distance"], history, start_time,
+        verbose=verbose, partial=len(history) < max_iter, trace=trace, trace_top_k=trace_top_k,
+        edges=edges, edge_mode=edge_mode, edge_k=edge_k, timer=timer, baseline=baseline
+    )
+    result["islands"] = len(islands)
+    return result
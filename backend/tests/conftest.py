@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Các module của backend là module phẳng trong backend/scripts (server.py import trực tiếp theo tên)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
@@ -0,0 +1,23 @@
+import itertools
+
+import numpy as np
+
+from local_search import tour_length
+
+# --------------------------
+# DỮ LIỆU NGẪU NHIÊN DÙNG CHUNG CHO CÁC TEST
+# --------------------------
+def random_cities(n, seed, prefix="P"):
+    """n thành phố ngẫu nhiên (seed cố định) trong lãnh thổ Việt Nam, tên prefix0..prefix{n-1}"""
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(8.4, 23.4, n)
+    lng = rng.uniform(102.1, 109.5, n)
+    return [{"name": f"{prefix}{i}", "lat": float(a), "lng": float(b)} for i, (a, b) in enumerate(zip(lat, lng))]
+
+def is_permutation(tour, n):
+    return sorted(int(c) for c in tour) == list(range(n))
+
+def brute_force_tsp(dist):
+    """Độ dài tour tối ưu bằng cách thử mọi hoán vị của các thành phố 1..n-1"""
+    n = len(dist)
+    return min(tour_length([0, *perm], dist) for perm in itertools.permutations(range(1, n)))
@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import server
+from batch import batch_union, solve_batch
+from distance import build_distance_matrix
+from helpers import random_cities
+
+def batch_problems():
+    cities = random_cities(30, seed=1)
+    # Các bài toán chồng lấn nhau, thứ tự thành phố khác nhau
+    return [cities[:12], cities[6:20], cities[15:30][::-1] + cities[:3]]
+
+# --------------------------
+# MA TRẬN CHUNG CỦA LÔ
+# --------------------------
+def test_union_indices_map_back_to_problem_cities():
+    problems = batch_problems()
+    union, indices = batch_union(problems)
+    assert len(union.cities) == 30
+    for cities, idx in zip(problems, indices):
+        assert [union.cities[i] for i in idx] == cities
+        np.testing.assert_allclose(union.submatrix(idx), build_distance_matrix(cities))
+
+def test_no_union_without_overlap_or_above_limits(monkeypatch):
+    cities = random_cities(20, seed=2)
+    assert batch_union([cities[:10], cities[10:]]) == (None, None)
+    assert batch_union(batch_problems(), union_limit=29) == (None, None)
+    # Hợp vượt giới hạn ma trận đầy đủ: mỗi bài toán lấy khoảng cách riêng
+    monkeypatch.setenv("DISTANCE_BACKEND", "condensed")
+    assert batch_union(batch_problems()) == (None, None)
+
+def test_batch_results_match_individual_solves():
+    problems = [
+        server.parse_route_request({
+            "cities": cities, "algorithms": ["GBFS", "CHEAPEST_INSERTION"],
+            "trace": "none", "edge_mode": "knn", "edge_k": 3,
+        })
+        for cities in batch_problems()
+    ]
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        items = sorted(solve_batch(problems, server.solve_route, pool), key=lambda item: item["index"])
+    assert [item["index"] for item in items] == [0, 1, 2]
+    for item, options in zip(items, problems):
+        assert "error" not in item
+        expected = server.solve_route(options)
+        for name in ("GBFS", "CHEAPEST_INSERTION"):
+            assert item["result"][name]["best_solution"] == expected[name]["best_solution"]
+            assert item["result"][name]["best_distance"] == expected[name]["best_distance"]
+        assert item["result"]["edges"] == expected["edges"]
@@ -0,0 +1,47 @@
+import pytest
+
+from benchmark import compare_results, run_benchmark
+
+def benchmark_result(**runs):
+    return {"instances": {"uniform_100": {"algorithms": runs}}}
+
+# --------------------------
+# BENCHMARK VÀ PHÁT HIỆN HỒI QUY
+# --------------------------
+def test_run_benchmark_reports_gaps():
+    result = run_benchmark(["vietnam_63"], ["gbfs", "cheapest_insertion"], repeat=1, log=lambda line: None)
+    instance = result["instances"]["vietnam_63"]
+    assert instance["num_cities"] == 63
+    runs = instance["algorithms"]
+    assert min(r["gap_pct"] for r in runs.values()) == 0.0
+    assert instance["best_known"] == min(r["tour_length"] for r in runs.values())
+    assert all(r["time_s"] >= 0 and r["peak_memory_bytes"] > 0 for r in runs.values())
+
+def test_run_benchmark_skips_matrix_algorithms_above_limit():
+    result = run_benchmark(["uniform_100"], ["gbfs", "wco"], matrix_limit=50, repeat=1, log=lambda line: None)
+    runs = result["instances"]["uniform_100"]["algorithms"]
+    assert runs["gbfs"]["index"] == "spatial"
+    assert "skipped" in runs["wco"]
+
+@pytest.mark.parametrize("new_run, metric", [
+    ({"tour_length": 101.0, "time_s": 1.0, "peak_memory_bytes": 1000}, "tour_length"),
+    ({"tour_length": 100.0, "time_s": 1.5, "peak_memory_bytes": 1000}, "time_s"),
+    ({"tour_length": 100.0, "time_s": 1.0, "peak_memory_bytes": 1500}, "peak_memory_bytes"),
+])
+def test_compare_results_flags_regressions(new_run, metric):
+    old = benchmark_result(gbfs={"tour_length": 100.0, "time_s": 1.0, "peak_memory_bytes": 1000})
+    regressions = compare_results(old, benchmark_result(gbfs=new_run))
+    assert [(r["algorithm"], r["metric"]) for r in regressions] == [("gbfs", metric)]
+
+def test_compare_results_ignores_noise_and_skipped_runs():
+    old = benchmark_result(
+        gbfs={"tour_length": 100.0, "time_s": 0.01, "peak_memory_bytes": 1000},
+        wco={"skipped": "more than 50 cities"},
+    )
+    new = benchmark_result(
+        # Thời gian tăng gấp ba nhưng dưới min_time_delta; độ dài tăng trong length_tolerance
+        gbfs={"tour_length": 100.05, "time_s": 0.03, "peak_memory_bytes": 1100},
+        wco={"tour_length": 500.0, "time_s": 9.0, "peak_memory_bytes": 1},
+        cheapest_insertion={"tour_length": 120.0, "time_s": 0.1, "peak_memory_bytes": 10},
+    )
+    assert compare_results(old, new) == []
@@ -0,0 +1,72 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import server
+from cancellation import DeadlineExceeded, SolveCancelled, SolverCancelEvent, check_cancelled
+from construction import cheapest_insertion_tour, double_tree_tour, farthest_insertion_tour
+from distance import build_distance_matrix
+from GBFS import gbfs_tsp
+from helpers import random_cities
+
+# --------------------------
+# DEADLINE VÀ HỦY TỪNG THUẬT TOÁN
+# --------------------------
+def test_solver_event_follows_request_event():
+    request_event = threading.Event()
+    solver_event = SolverCancelEvent(request_event)
+    assert not solver_event.is_set()
+    request_event.set()
+    with pytest.raises(SolveCancelled):
+        check_cancelled(solver_event)
+
+    # Set riêng event của thuật toán không hủy cả request
+    request_event = threading.Event()
+    solver_event = SolverCancelEvent(request_event)
+    solver_event.set()
+    assert solver_event.is_set() and not request_event.is_set()
+
+def test_gbfs_stops_at_deadline():
+    cities = random_cities(30, seed=1)
+    with pytest.raises(DeadlineExceeded):
+        gbfs_tsp(cities, trace="none", edge_mode="none", deadline=time.monotonic() - 1)
+    result = gbfs_tsp(cities, trace="none", edge_mode="none", baseline=False, deadline=time.monotonic() + 60)
+    assert len(result["best_solution"]) == 31
+
+@pytest.mark.parametrize("build_tour", [cheapest_insertion_tour, farthest_insertion_tour, double_tree_tour])
+def test_constructions_check_cancel_event(build_tour):
+    dist = build_distance_matrix(random_cities(20, seed=2))
+    event = threading.Event()
+    event.set()
+    with pytest.raises(SolveCancelled):
+        build_tour(dist, cancel_event=event)
+    assert sorted(build_tour(dist, cancel_event=threading.Event())) == list(range(20))
+
+def test_wait_for_result_stops_worker_after_timeout(monkeypatch):
+    monkeypatch.setattr(server, "DEADLINE_GRACE_SECONDS", 0.05)
+    stop_event = SolverCancelEvent()
+
+    def slow_solver():
+        while True:
+            check_cancelled(stop_event)
+            time.sleep(0.01)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        future = pool.submit(slow_solver)
+        result = server.wait_for_result(future, time.monotonic(), "SLOW", stop_event)
+        assert result["error"] == "Deadline exceeded" and result["partial"]
+        # Worker dừng ở lần kiểm tra kế tiếp và trả slot cho pool
+        with pytest.raises(SolveCancelled):
+            future.result(timeout=5)
+
+def test_route_reports_gbfs_deadline_as_partial_error():
+    response = server.app.test_client().post("/api/calculate-route", json={
+        "cities": random_cities(40, seed=3), "algorithms": ["GBFS", "DOUBLE_TREE"],
+        "gbfs_deadline_ms": 0, "trace": "none", "edge_mode": "none",
+    })
+    assert response.status_code == 200
+    results = response.get_json()
+    assert results["GBFS"] == {"algorithm": "GBFS", "error": "Deadline exceeded", "partial": True}
+    assert len(results["DOUBLE_TREE"]["best_solution"]) == 41
@@ -0,0 +1,53 @@
+import pytest
+
+from construction import cheapest_insertion_tour, double_tree_tour, farthest_insertion_tour
+from distance import build_distance_matrix
+from distance_store import CondensedDistances
+from helpers import brute_force_tsp, is_permutation, random_cities
+from local_search import tour_length
+
+def naive_cheapest_insertion(dist):
+    """Cheapest insertion tính lại chi phí của mọi (thành phố, cạnh) ở mỗi bước, O(n^3)"""
+    n = len(dist)
+    tour = [0]
+    remaining = set(range(1, n))
+    while remaining:
+        best = None
+        for c in sorted(remaining):
+            for i, a in enumerate(tour):
+                b = tour[(i + 1) % len(tour)]
+                cost = dist[a, c] + dist[c, b] - dist[a, b]
+                if best is None or cost < best[0]:
+                    best = (cost, c, i)
+        _, c, i = best
+        tour.insert(i + 1, c)
+        remaining.remove(c)
+    return tour
+
+# --------------------------
+# CHEAPEST INSERTION (CẬP NHẬT LƯỜI VỚI CỜ STALE)
+# --------------------------
+@pytest.mark.parametrize("n", [3, 4, 10, 40])
+def test_cheapest_insertion_matches_naive(n):
+    for seed in range(3):
+        cities = random_cities(n, seed=300 * n + seed)
+        dist = build_distance_matrix(cities)
+        expected = naive_cheapest_insertion(dist)
+        assert cheapest_insertion_tour(dist) == expected
+        assert cheapest_insertion_tour(CondensedDistances(cities)) == expected
+
+# --------------------------
+# CÁC HEURISTIC XÂY DỰNG TOUR KHÁC
+# --------------------------
+@pytest.mark.parametrize("build_tour", [cheapest_insertion_tour, farthest_insertion_tour, double_tree_tour])
+def test_constructions_return_tours_starting_at_zero(build_tour):
+    for n in (2, 3, 25):
+        tour = build_tour(build_distance_matrix(random_cities(n, seed=n)))
+        assert is_permutation(tour, n) and tour[0] == 0
+
+@pytest.mark.parametrize("build_tour", [cheapest_insertion_tour, double_tree_tour])
+def test_constructions_within_twice_optimum(build_tour):
+    # Cheapest insertion và double tree đều bảo đảm <= 2 lần tối ưu trên khoảng cách metric
+    for seed in range(3):
+        dist = build_distance_matrix(random_cities(8, seed=400 + seed))
+        assert tour_length(build_tour(dist), dist) <= 2 * brute_force_tsp(dist) + 1e-6
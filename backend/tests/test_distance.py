@@ -0,0 +1,59 @@
+import numpy as np
+
+from distance import DistanceMatrixCache, build_distance_matrix, haversine_distance, haversine_row
+from helpers import random_cities
+
+# --------------------------
+# MA TRẬN KHOẢNG CÁCH VECTOR HÓA
+# --------------------------
+def test_matrix_matches_pairwise_haversine():
+    cities = random_cities(25, seed=1)
+    matrix = build_distance_matrix(cities)
+    expected = np.array([
+        [haversine_distance(a["lat"], a["lng"], b["lat"], b["lng"]) for b in cities] for a in cities
+    ])
+    np.testing.assert_allclose(matrix, expected, rtol=1e-9, atol=1e-9)
+    np.testing.assert_array_equal(matrix, matrix.T)
+    assert not np.diag(matrix).any()
+
+def test_haversine_row_matches_matrix_row():
+    cities = random_cities(30, seed=2)
+    matrix = build_distance_matrix(cities)
+    lat = np.radians([c["lat"] for c in cities])
+    lng = np.radians([c["lng"] for c in cities])
+    for i in (0, 7, 29):
+        np.testing.assert_allclose(haversine_row(lat[i], lng[i], lat, lng), matrix[i], atol=1e-9)
+
+# --------------------------
+# CACHE MA TRẬN THEO TẬP THÀNH PHỐ
+# --------------------------
+def test_cache_hits_for_permuted_city_order():
+    cache = DistanceMatrixCache()
+    cities = random_cities(20, seed=3)
+    first = cache.get(cities)
+    order = np.random.default_rng(4).permutation(20)
+    permuted = [cities[i] for i in order]
+
+    second = cache.get(permuted)
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    # Ma trận trả về theo đúng thứ tự của request
+    np.testing.assert_array_equal(second, first[np.ix_(order, order)])
+    np.testing.assert_allclose(second, build_distance_matrix(permuted), atol=1e-9)
+
+def test_cache_evicts_least_recently_used_by_bytes():
+    small = [random_cities(10, seed=s) for s in range(3)]
+    cache = DistanceMatrixCache(max_bytes=2 * 10 * 10 * 8)
+    cache.get(small[0])
+    cache.get(small[1])
+    cache.get(small[0])  # small[0] vừa được dùng, small[1] bị loại khi thêm small[2]
+    cache.get(small[2])
+    assert cache.stats()["entries"] == 2
+    cache.get(small[0])
+    assert cache.stats()["hits"] == 2
+    cache.get(small[1])
+    assert cache.stats()["misses"] == 4
+
+def test_cache_skips_matrices_larger_than_capacity():
+    cache = DistanceMatrixCache(max_bytes=100)
+    cache.get(random_cities(10, seed=5))
+    assert cache.stats()["entries"] == 0 and cache.stats()["bytes"] == 0
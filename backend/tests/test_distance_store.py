@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from distance import build_distance_matrix
+from distance_store import CondensedDistances, OnDemandDistances, choose_backend
+from helpers import random_cities
+
+# --------------------------
+# BACKEND KHOẢNG CÁCH CỦA distance_store
+# --------------------------
+@pytest.mark.parametrize("n", [2, 3, 17, 64])
+def test_condensed_layout_matches_upper_triangle(n):
+    d = CondensedDistances(random_cities(n, seed=n))
+    dense = build_distance_matrix(random_cities(n, seed=n))
+    rows, cols = np.triu_indices(n, k=1)
+    # Cặp (i, j), i < j nằm ở offsets[i] + (j - i - 1); cột j của tam giác trên nằm ở column_base[i] + j
+    np.testing.assert_array_equal(d.offsets[rows] + (cols - rows - 1), np.arange(n * (n - 1) // 2))
+    np.testing.assert_array_equal(d.column_base[rows] + cols, d.offsets[rows] + (cols - rows - 1))
+    np.testing.assert_allclose(d.data, dense[rows, cols], rtol=1e-6)
+
+@pytest.mark.parametrize("backend", [CondensedDistances, OnDemandDistances])
+def test_backends_match_dense_matrix(backend):
+    cities = random_cities(50, seed=1)
+    dense = build_distance_matrix(cities)
+    d = backend(cities)
+    # float32 của CondensedDistances: sai số tương đối cỡ 1e-7
+    tolerance = {"rtol": 1e-6, "atol": 1e-6}
+
+    for i in range(len(cities)):
+        np.testing.assert_allclose(d[i], dense[i], **tolerance)
+    rng = np.random.default_rng(2)
+    rows = rng.integers(0, 50, 500)
+    cols = rng.integers(0, 50, 500)
+    cols[:50] = rows[:50]  # có cả đường chéo
+    np.testing.assert_allclose(d[rows, cols], dense[rows, cols], **tolerance)
+    np.testing.assert_allclose(d[rows[:, None], cols[None, :10]], dense[rows[:, None], cols[None, :10]], **tolerance)
+    assert d[3, 3] == 0.0
+    assert d[7, 11] == pytest.approx(dense[7, 11], rel=1e-6)
+    np.testing.assert_allclose(d[12, 5:30], dense[12, 5:30], **tolerance)
+    np.testing.assert_allclose(d[:, 9], dense[:, 9], **tolerance)
+    np.testing.assert_allclose(np.asarray(d), dense, **tolerance)
+
+def test_choose_backend_by_memory(monkeypatch):
+    monkeypatch.delenv("DISTANCE_BACKEND", raising=False)
+    assert choose_backend(100, dense_max_bytes=100 * 100 * 8) == "dense"
+    assert choose_backend(101, dense_max_bytes=100 * 100 * 8, memory_cap=101 * 50 * 4) == "condensed"
+    assert choose_backend(101, dense_max_bytes=100 * 100 * 8, memory_cap=1000) == "ondemand"
+    monkeypatch.setenv("DISTANCE_BACKEND", "ondemand")
+    assert choose_backend(10) == "ondemand"
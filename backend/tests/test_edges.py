@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+import server
+from distance import build_distance_matrix
+from edges import build_edges, build_spatial_edges, edge_page
+from helpers import random_cities
+
+# --------------------------
+# CẠNH k-NN VÀ PHÂN TRANG DANH SÁCH CẠNH
+# --------------------------
+@pytest.mark.parametrize("limit", [1, 7, 45, 1000])
+def test_edge_pages_concatenate_to_all_edges(limit):
+    cities = random_cities(10, seed=1)
+    dist = build_distance_matrix(cities)
+    pages, offset = [], 0
+    while True:
+        edges, total = edge_page(cities, dist, offset, limit)
+        assert total == 45
+        if not edges:
+            break
+        assert len(edges) <= limit
+        pages += edges
+        offset += len(edges)
+    assert pages == build_edges(cities, dist, "all")
+
+def test_edge_page_out_of_range():
+    cities = random_cities(5, seed=2)
+    dist = build_distance_matrix(cities)
+    assert edge_page(cities, dist, offset=10, limit=5) == ([], 10)
+    assert edge_page(cities, dist, offset=3, limit=0) == ([], 10)
+
+def test_knn_edges_contain_nearest_neighbours():
+    cities = random_cities(40, seed=3)
+    dist = build_distance_matrix(cities)
+    names = [c["name"] for c in cities]
+    k = 4
+    pairs = {(e["from"], e["to"]) for e in build_edges(cities, dist, "knn", k)}
+    for i in range(40):
+        for j in [j for j in np.argsort(dist[i]) if j != i][:k]:
+            assert (names[min(i, j)], names[max(i, j)]) in pairs
+    # Không có cạnh nào ngoài k láng giềng của một trong hai đầu
+    assert len(pairs) <= 40 * k
+
+def test_spatial_edges_match_matrix_knn():
+    cities = random_cities(60, seed=4)
+    dist = build_distance_matrix(cities)
+    matrix_edges = build_edges(cities, dist, "knn", 3)
+    spatial_edges = build_spatial_edges(cities, "knn", 3)
+    assert [(e["from"], e["to"]) for e in spatial_edges] == [(e["from"], e["to"]) for e in matrix_edges]
+    for a, b in zip(spatial_edges, matrix_edges):
+        assert a["distance"] == pytest.approx(b["distance"], abs=0.02)
+
+def test_edges_endpoint_pages():
+    client = server.app.test_client()
+    cities = random_cities(8, seed=5)
+    body = client.post("/api/edges", json={"cities": cities, "offset": 0, "limit": 20}).get_json()
+    assert body["total"] == 28 and len(body["edges"]) == 20 and body["next_offset"] == 20
+    rest = client.post("/api/edges", json={"cities": cities, "offset": 20, "limit": 20}).get_json()
+    assert len(rest["edges"]) == 8 and rest["next_offset"] is None
+    assert body["edges"] + rest["edges"] == build_edges(cities, build_distance_matrix(cities), "all")
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from distance import build_distance_matrix
+from held_karp import HELD_KARP_MAX_CITIES, held_karp
+from helpers import brute_force_tsp, is_permutation, random_cities
+from local_search import tour_length
+from optimal import optimal_baseline
+
+# --------------------------
+# HELD-KARP (NGHIỆM TỐI ƯU CHÍNH XÁC CHO n NHỎ)
+# --------------------------
+@pytest.mark.parametrize("n", [2, 3, 4, 6, 8])
+def test_held_karp_matches_brute_force(n):
+    for seed in range(3):
+        dist = build_distance_matrix(random_cities(n, seed=100 * n + seed))
+        length, tour = held_karp(dist)
+        assert is_permutation(tour, n) and tour[0] == 0
+        assert length == pytest.approx(tour_length(tour, dist))
+        assert length == pytest.approx(brute_force_tsp(dist))
+
+def test_held_karp_collinear_points():
+    # Tour tối ưu hiển nhiên trên các điểm cùng một đường thẳng: đi ra rồi quay về
+    dist = np.abs(np.subtract.outer([0.0, 3.0, 1.0, 4.0, 2.0], [0.0, 3.0, 1.0, 4.0, 2.0]))
+    length, _ = held_karp(dist)
+    assert length == pytest.approx(8.0)
+
+def test_baseline_is_exact_up_to_limit():
+    cities = random_cities(9, seed=5)
+    dist = build_distance_matrix(cities)
+    assert optimal_baseline(cities, dist) == (pytest.approx(brute_force_tsp(dist)), "exact")
+    larger = random_cities(HELD_KARP_MAX_CITIES + 1, seed=6)
+    assert optimal_baseline(larger, build_distance_matrix(larger))[1] != "exact"
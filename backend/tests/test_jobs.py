@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+import server
+from cancellation import check_cancelled
+from helpers import random_cities
+from jobs import JobManager, QueueFullError
+
+# --------------------------
+# HÀNG ĐỢI JOB GIỚI HẠN VÀ HỦY JOB
+# --------------------------
+def blocking_solve(release, started=None, cancel_event=None):
+    """Job giả: chờ release, kiểm tra cancel_event định kỳ như các thuật toán thật"""
+    if started is not None:
+        started.set()
+    while not release.is_set():
+        check_cancelled(cancel_event)
+        time.sleep(0.005)
+    return {"ok": True}
+
+def wait_for_status(manager, job, statuses, timeout=5):
+    end = time.monotonic() + timeout
+    while manager.get(job.id).status not in statuses:
+        assert time.monotonic() < end, f"job still {job.status}"
+        time.sleep(0.005)
+
+def test_queue_full_raises_and_frees_slots():
+    manager = JobManager(max_workers=1, max_queue=1)
+    release = threading.Event()
+    jobs = [manager.submit(blocking_solve, release) for _ in range(2)]
+    with pytest.raises(QueueFullError):
+        manager.submit(blocking_solve, release)
+
+    release.set()
+    for job in jobs:
+        wait_for_status(manager, job, ("succeeded",))
+        assert manager.get(job.id).result == {"ok": True}
+    wait_for_status(manager, manager.submit(blocking_solve, release), ("succeeded",))
+    assert manager.stats()["active"] == 0
+
+def test_cancel_running_and_queued_jobs():
+    manager = JobManager(max_workers=1, max_queue=1)
+    release, started = threading.Event(), threading.Event()
+    running = manager.submit(blocking_solve, release, started)
+    queued = manager.submit(blocking_solve, release)
+    assert started.wait(5)
+
+    assert manager.cancel(queued.id).status == "cancelled"
+    assert manager.cancel(running.id).status == "cancelled"
+    # Job đang chạy dừng ở lần kiểm tra cancel_event kế tiếp; job trong hàng đợi không bao giờ chạy
+    running.future.result(timeout=5)
+    queued.future.result(timeout=5)
+    assert queued.started_at is None
+    assert manager.get(running.id).status == "cancelled" and manager.get(running.id).result is None
+    assert manager.stats()["active"] == 0
+    assert manager.cancel("missing") is None
+
+def test_jobs_endpoint_returns_429_when_full(monkeypatch):
+    manager = JobManager(max_workers=1, max_queue=0)
+    monkeypatch.setattr(server, "job_manager", manager)
+    release = threading.Event()
+    manager.submit(blocking_solve, release)
+    client = server.app.test_client()
+    try:
+        response = client.post("/api/jobs", json={"cities": random_cities(5, seed=1)})
+        assert response.status_code == 429
+    finally:
+        release.set()
+
+def test_jobs_endpoint_runs_and_cancels(monkeypatch):
+    monkeypatch.setattr(server, "job_manager", JobManager(max_workers=1, max_queue=1))
+    client = server.app.test_client()
+    response = client.post("/api/jobs", json={
+        "cities": random_cities(8, seed=2), "algorithms": ["GBFS"], "trace": "none", "edge_mode": "none"
+    })
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+    server.job_manager.get(job_id).future.result(timeout=10)
+    body = client.get(f"/api/jobs/{job_id}").get_json()
+    assert body["status"] == "succeeded" and "GBFS" in body["result"]
+    # Job đã xong không bị hủy nữa; job không tồn tại trả về 404
+    assert client.delete(f"/api/jobs/{job_id}").get_json()["status"] == "succeeded"
+    assert client.delete("/api/jobs/missing").status_code == 404
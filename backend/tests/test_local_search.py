@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from distance import build_distance_matrix
+from helpers import is_permutation, random_cities
+from local_search import IMPROVEMENT_MODES, improve_tour, or_opt, two_opt, tour_length
+
+# --------------------------
+# 2-OPT VỚI DELTA O(1), NEIGHBOR LISTS VÀ DON'T-LOOK BITS
+# --------------------------
+def random_tour(n, seed):
+    tour = np.random.default_rng(seed).permutation(n).tolist()
+    return tour[tour.index(0):] + tour[:tour.index(0)]
+
+def best_two_opt_delta(tour, dist):
+    """Delta tốt nhất trên mọi nước đi 2-opt (đảo đoạn tour[i+1..j]), vét cạn O(n^2)"""
+    n = len(tour)
+    best = 0.0
+    for i in range(n - 1):
+        for j in range(i + 2, n if i else n - 1):
+            a, b, c, d = tour[i], tour[i + 1], tour[j], tour[(j + 1) % n]
+            best = min(best, dist[a, c] + dist[b, d] - dist[a, b] - dist[c, d])
+    return best
+
+@pytest.mark.parametrize("n", [3, 4, 5, 12, 60])
+def test_two_opt_returns_shorter_permutation(n):
+    dist = build_distance_matrix(random_cities(n, seed=n))
+    for seed in range(3):
+        tour = random_tour(n, seed)
+        improved, length = two_opt(tour, dist)
+        assert is_permutation(improved, n) and improved[0] == tour[0]
+        assert length == pytest.approx(tour_length(improved, dist))
+        assert length <= tour_length(tour, dist) + 1e-9
+
+def test_two_opt_with_full_neighbor_lists_is_two_optimal():
+    n = 25
+    dist = build_distance_matrix(random_cities(n, seed=7))
+    improved, _ = two_opt(random_tour(n, seed=8), dist, k=n - 1)
+    assert best_two_opt_delta(improved, dist) > -1e-7
+
+def test_two_opt_stops_at_deadline():
+    dist = build_distance_matrix(random_cities(200, seed=9))
+    tour = random_tour(200, seed=10)
+    # Deadline đã qua: không có nước đi nào, tour giữ nguyên
+    improved, length = two_opt(tour, dist, deadline=0.0)
+    assert improved == tour
+    assert length == pytest.approx(tour_length(tour, dist))
+
+# --------------------------
+# OR-OPT VÀ PIPELINE improve_tour
+# --------------------------
+def best_or_opt_delta(tour, dist, max_segment=3):
+    """Delta tốt nhất trên mọi nước đi Or-opt (dời đoạn 1..max_segment, giữ hoặc đảo chiều), vét cạn"""
+    n = len(tour)
+    best = 0.0
+    for length in range(1, max_segment + 1):
+        for i in range(n):
+            segment = [tour[(i + t) % n] for t in range(length)]
+            prev, nxt = tour[(i - 1) % n], tour[(i + length) % n]
+            removed = dist[prev, segment[0]] + dist[segment[-1], nxt] - dist[prev, nxt]
+            rest = [tour[(i + length + t) % n] for t in range(n - length)]
+            for p in range(len(rest) - 1):
+                a, b = rest[p], rest[p + 1]
+                if (a, b) == (prev, nxt):
+                    continue
+                forward = dist[a, segment[0]] + dist[segment[-1], b]
+                backward = dist[a, segment[-1]] + dist[segment[0], b]
+                best = min(best, min(forward, backward) - dist[a, b] - removed)
+    return best
+
+@pytest.mark.parametrize("n", [4, 5, 6, 15, 60])
+def test_or_opt_returns_shorter_permutation(n):
+    dist = build_distance_matrix(random_cities(n, seed=100 + n))
+    for seed in range(3):
+        tour = random_tour(n, seed)
+        improved, length = or_opt(tour, dist)
+        assert is_permutation(improved, n) and improved[0] == tour[0]
+        assert length == pytest.approx(tour_length(improved, dist))
+        assert length <= tour_length(tour, dist) + 1e-9
+
+def test_or_opt_with_full_neighbor_lists_is_or_optimal():
+    n = 20
+    dist = build_distance_matrix(random_cities(n, seed=11))
+    improved, _ = or_opt(random_tour(n, seed=12), dist, k=n - 1)
+    assert best_or_opt_delta(improved, dist) > -1e-7
+
+@pytest.mark.parametrize("mode", sorted(IMPROVEMENT_MODES))
+def test_improve_tour_never_lengthens(mode):
+    n = 80
+    dist = build_distance_matrix(random_cities(n, seed=13))
+    tour = random_tour(n, seed=14)
+    improved, length = improve_tour(tour, dist, mode=mode)
+    assert is_permutation(improved, n)
+    assert length == pytest.approx(tour_length(improved, dist))
+    assert length <= tour_length(tour, dist) + 1e-9
+    if mode == "none":
+        assert improved == tour
+
+def test_improve_tour_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        improve_tour([0, 1, 2, 3], np.zeros((4, 4)), mode="3opt")
@@ -0,0 +1,60 @@
+import pytest
+
+import lower_bound
+from distance import build_distance_matrix
+from GBFS import gbfs_tsp
+from helpers import brute_force_tsp, random_cities
+from local_search import tour_length
+from lower_bound import cached_lower_bound, nearest_neighbor_length, one_tree_lower_bound
+from optimal import LOWER_BOUND_MAX_ITER, lower_bound_iterations, optimal_baseline
+from wco import wco_tsp
+
+# --------------------------
+# CẬN DƯỚI 1-TREE VÀ CACHE CỦA BASELINE
+# --------------------------
+@pytest.mark.parametrize("n", [6, 8])
+def test_one_tree_bound_is_below_optimum(n):
+    for seed in range(3):
+        dist = build_distance_matrix(random_cities(n, seed=200 * n + seed))
+        optimum = brute_force_tsp(dist)
+        bound, _ = one_tree_lower_bound(dist, upper_bound=optimum * 1.2, max_iter=50)
+        assert bound <= optimum + 1e-6
+
+def test_bound_tightens_with_more_iterations():
+    dist = build_distance_matrix(random_cities(60, seed=1))
+    upper_bound = nearest_neighbor_length(dist)
+    loose, _ = one_tree_lower_bound(dist, upper_bound, max_iter=1)
+    tight, _ = one_tree_lower_bound(dist, upper_bound, max_iter=lower_bound_iterations(60))
+    assert loose < tight < upper_bound
+
+def test_iterations_depend_only_on_size():
+    assert lower_bound_iterations(19) == LOWER_BOUND_MAX_ITER
+    assert lower_bound_iterations(1000) < lower_bound_iterations(200) < lower_bound_iterations(63)
+    assert lower_bound_iterations(10 ** 6) == 1
+
+def test_cached_bound_ignores_city_order():
+    lower_bound.clear_cache()
+    cities = random_cities(30, seed=2)
+    first = cached_lower_bound(cities, build_distance_matrix(cities), max_iter=20)
+    permuted = cities[7:] + cities[:7]
+    lower_bound.clear_cache()
+    assert cached_lower_bound(permuted, build_distance_matrix(permuted), max_iter=20) == pytest.approx(first)
+
+def test_baseline_does_not_depend_on_solver_or_call_order():
+    cities = random_cities(40, seed=3)
+    dist = build_distance_matrix(cities)
+    results = {}
+    for order in (("GBFS", "WCO"), ("WCO", "GBFS")):
+        lower_bound.clear_cache()
+        for name in order:
+            if name == "GBFS":
+                result = gbfs_tsp(cities, distance_matrix=dist, trace="none", edge_mode="none")
+            else:
+                result = wco_tsp(cities, max_iter=10, distance_matrix=dist, trace="none", edge_mode="none",
+                                 seed=4, verbose=False)
+            results[order, name] = result["optimal_distance"]
+    assert len(set(results.values())) == 1
+    lower_bound.clear_cache()
+    value, kind = optimal_baseline(cities, dist)
+    assert kind == "lower_bound" and value == next(iter(results.values()))
+    assert value <= tour_length(list(range(40)), dist)
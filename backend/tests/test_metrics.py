@@ -0,0 +1,38 @@
+import server
+from helpers import random_cities
+from metrics import MetricsRegistry
+
+# --------------------------
+# METRICS DẠNG PROMETHEUS TEXT
+# --------------------------
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("t_seconds", "Test histogram", (0.1, 1), ("phase",))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value, phase="search")
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP t_seconds Test histogram", "# TYPE t_seconds histogram"]
+    assert 't_seconds_bucket{phase="search",le="0.1"} 2' in lines
+    assert 't_seconds_bucket{phase="search",le="1"} 3' in lines
+    assert 't_seconds_bucket{phase="search",le="+Inf"} 4' in lines
+    assert 't_seconds_sum{phase="search"} 3.65' in lines
+    assert 't_seconds_count{phase="search"} 4' in lines
+
+def test_counter_renders_labels():
+    registry = MetricsRegistry()
+    counter = registry.counter("t_total", "Test counter", ("endpoint", "status"))
+    counter.inc(endpoint="health", status=200)
+    counter.inc(2, endpoint="health", status=200)
+    assert 't_total{endpoint="health",status="200"} 3' in registry.render().splitlines()
+
+def test_metrics_endpoint_counts_requests_and_phases():
+    client = server.app.test_client()
+    client.post("/api/calculate-route", json={
+        "cities": random_cities(10, seed=1), "algorithms": ["GBFS"], "trace": "none", "edge_mode": "none",
+    })
+    response = client.get("/api/metrics")
+    assert response.status_code == 200 and response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    assert 'tsp_requests_total{endpoint="calculate_route",status="200"}' in text
+    assert 'tsp_phase_seconds_count{algorithm="GBFS",phase="search"}' in text
+    assert "tsp_request_cities_count" in text
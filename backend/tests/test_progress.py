@@ -0,0 +1,80 @@
+import json
+import threading
+
+import pytest
+
+import progress
+import server
+from distance import build_distance_matrix
+from helpers import random_cities
+from progress import route_progress_events, wco_progress
+
+@pytest.fixture
+def client():
+    return server.app.test_client()
+
+def stream_request(**options):
+    return {"cities": random_cities(12, seed=1), **options}
+
+def parse_events(body):
+    """Các sự kiện (tên, dữ liệu) của một stream SSE, bỏ qua dòng comment keep-alive"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n") if not line.startswith(":"))
+        if lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+# --------------------------
+# THAM SỐ WCO CỦA STREAM
+# --------------------------
+def test_wco_progress_honours_stall_and_time_budget():
+    cities = random_cities(20, seed=2)
+    dist = build_distance_matrix(cities)
+    events = list(wco_progress(cities, dist, max_iter=500, seed=3, stall_iterations=2))
+    assert events[-1]["stop_reason"] == "stalled"
+    assert len(events) < 500
+    events = list(wco_progress(cities, dist, max_iter=100, seed=3, time_budget_ms=0))
+    assert events[-1]["stop_reason"] == "time_budget" and len(events[-1]["best_solution"]) == 21
+
+def test_stream_rejects_islands(client):
+    response = client.post("/api/calculate-route/stream", json=stream_request(wco_islands=2))
+    assert response.status_code == 400
+
+def test_stream_passes_wco_options(client):
+    response = client.post("/api/calculate-route/stream", json=stream_request(
+        algorithms=["WCO"], seed=4, wco_stall_iterations=3
+    ))
+    events = parse_events(response.get_data(as_text=True))
+    assert [name for name, _ in events][-2:] == ["result", "done"]
+    assert events[-2][1]["stop_reason"] == "stalled"
+
+# --------------------------
+# CLIENT NGẮT KẾT NỐI VÀ METRICS CỦA STREAM
+# --------------------------
+def test_closing_stream_sets_cancel_event():
+    cities = random_cities(30, seed=5)
+    cancel_event = threading.Event()
+    events = route_progress_events(cities, build_distance_matrix(cities), algorithms=["GBFS", "WCO"],
+                                   cancel_event=cancel_event)
+    assert next(events).startswith("event: progress")
+    assert not cancel_event.is_set()
+    events.close()  # GeneratorExit như khi server không ghi được ra client
+    assert cancel_event.is_set()
+
+def test_wco_stream_sends_keepalive_comments(monkeypatch):
+    monkeypatch.setattr(progress, "SSE_KEEPALIVE_SECONDS", 0.0)
+    cities = random_cities(15, seed=6)
+    chunks = list(route_progress_events(cities, build_distance_matrix(cities), algorithms=["WCO"], seed=7))
+    assert any(chunk.startswith(":") for chunk in chunks)
+
+def test_stream_duration_recorded_when_stream_ends(client, monkeypatch):
+    observed = []
+    monkeypatch.setattr(server.request_duration_seconds, "observe",
+                        lambda value, **labels: observed.append(labels["endpoint"]))
+    response = client.post("/api/calculate-route/stream", json=stream_request(algorithms=["GBFS"]),
+                           buffered=False)
+    assert observed == []
+    response.get_data()
+    response.close()
+    assert observed == ["calculate_route_stream"]
@@ -0,0 +1,82 @@
+import pytest
+
+import result_cache
+import server
+from helpers import random_cities
+from result_cache import ResultCache, is_cacheable, result_cache_key
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(result_cache, "time", fake)
+    return fake
+
+def route_options(**options):
+    return server.parse_route_request({
+        "cities": random_cities(15, seed=1), "algorithms": ["GBFS", "WCO"],
+        "trace": "none", "edge_mode": "none", **options,
+    })
+
+# --------------------------
+# CACHE KẾT QUẢ (TTL + LRU)
+# --------------------------
+def test_entries_expire_after_ttl(clock):
+    cache = ResultCache(max_entries=4, ttl=10)
+    cache.put("a", {"x": 1})
+    clock.now = 9.9
+    assert cache.get("a") == {"x": 1}
+    clock.now = 10.0
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0 and (cache.hits, cache.misses) == (1, 1)
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = ResultCache(max_entries=2, ttl=10)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" trở thành mục ít dùng nhất
+    cache.put("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+    disabled = ResultCache(max_entries=0)
+    disabled.put("a", 1)
+    assert disabled.get("a") is None
+
+def test_cache_key_follows_inputs_not_client_id():
+    options = route_options(seed=3)
+    assert result_cache_key(options) == result_cache_key(dict(options, id="client-1"))
+    assert result_cache_key(options) != result_cache_key(dict(options, seed=4))
+    reordered = dict(options, cities=options["cities"][::-1])
+    assert result_cache_key(options) != result_cache_key(reordered)
+
+def test_only_deterministic_results_are_cacheable():
+    ok = {"GBFS": {"best_distance": 1.0}, "edges": []}
+    assert is_cacheable({"seed": 1}, ok)
+    assert not is_cacheable({"seed": None}, ok)
+    assert not is_cacheable({"seed": 1, "wco_time_budget_ms": 50.0}, ok)
+    assert not is_cacheable({"seed": 1}, {"WCO": {"error": "Deadline exceeded", "partial": True}})
+
+def test_cached_solve_route_caches_seeded_requests_only(monkeypatch):
+    monkeypatch.setattr(server, "result_cache", ResultCache(max_entries=8, ttl=60))
+    seeded = route_options(seed=5)
+    first = server.cached_solve_route(seeded)
+    assert server.cached_solve_route(route_options(seed=5)) is first
+    assert server.result_cache.stats()["entries"] == 1
+
+    server.cached_solve_route(route_options())
+    server.cached_solve_route(route_options(seed=6, wco_time_budget_ms=20))
+    assert server.result_cache.stats()["entries"] == 1
+
+def test_same_seed_gives_same_result_without_cache(monkeypatch):
+    monkeypatch.setattr(server, "result_cache", ResultCache(max_entries=0))
+    first = server.cached_solve_route(route_options(seed=7))
+    second = server.cached_solve_route(route_options(seed=7))
+    assert first is not second
+    for name in ("GBFS", "WCO"):
+        assert first[name]["best_solution"] == second[name]["best_solution"]
+        assert first[name]["optimal_distance"] == second[name]["optimal_distance"]
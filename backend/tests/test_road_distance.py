@@ -0,0 +1,59 @@
+import json
+
+import numpy as np
+import pytest
+
+import road_distance
+from road_distance import RoadDistanceMatrix, get_road_matrix, is_symmetric, road_matrix_for, write_road_matrix
+
+@pytest.fixture
+def road_env(monkeypatch):
+    """Đặt ROAD_DISTANCE_MATRIX và xóa ma trận đã mở của process (khôi phục sau test)"""
+    for name in ("_road_matrix", "_road_matrix_error", "_road_matrix_loaded"):
+        monkeypatch.setattr(road_distance, name, getattr(road_distance, name))
+    road_distance._road_matrix, road_distance._road_matrix_error = None, None
+    road_distance._road_matrix_loaded = False
+
+    def configure(path):
+        monkeypatch.setenv("ROAD_DISTANCE_MATRIX", str(path))
+    return configure
+
+# --------------------------
+# MA TRẬN ĐƯỜNG BỘ: KIỂM TRA ĐỐI XỨNG VÀ LỖI KHI MỞ
+# --------------------------
+def test_road_matrix_requires_symmetry(tmp_path):
+    names = [f"P{i}" for i in range(6)]
+    matrix = np.random.default_rng(3).uniform(1, 500, (6, 6))
+    np.fill_diagonal(matrix, 0.0)
+
+    # write_road_matrix đối xứng hóa; file ghi trực tiếp thì không
+    write_road_matrix(str(tmp_path / "road.npy"), names, matrix)
+    road = RoadDistanceMatrix(str(tmp_path / "road.npy"))
+    assert road.submatrix([{"name": "P2"}, {"name": "P5"}])[0, 1] == road.matrix[2, 5]
+    np.save(tmp_path / "raw.npy", matrix)
+    (tmp_path / "raw.names.json").write_text(json.dumps(names), encoding="utf-8")
+    with pytest.raises(ValueError, match="not symmetric"):
+        RoadDistanceMatrix(str(tmp_path / "raw.npy"))
+
+def test_is_symmetric_checks_every_block():
+    matrix = np.random.default_rng(4).uniform(1, 500, (10, 10))
+    matrix = matrix + matrix.T
+    assert is_symmetric(matrix, block_rows=3)
+    matrix[9, 2] += 1.0  # chỉ khác ở khối hàng cuối
+    assert not is_symmetric(matrix, block_rows=3)
+
+def test_load_error_is_remembered(tmp_path, road_env, monkeypatch):
+    road_env(tmp_path / "missing.npy")
+    with pytest.raises(OSError):
+        get_road_matrix()
+    # Lần gọi sau ném lại lỗi cũ, không mở lại file
+    monkeypatch.setattr(road_distance, "RoadDistanceMatrix", None)
+    with pytest.raises(OSError):
+        road_matrix_for([{"name": "P0"}])
+
+def test_road_matrix_used_only_when_covering(tmp_path, road_env):
+    names = [f"P{i}" for i in range(4)]
+    write_road_matrix(str(tmp_path / "road.npy"), names, np.arange(16, dtype=float).reshape(4, 4))
+    road_env(tmp_path / "road.npy")
+    assert road_matrix_for([{"name": "P1"}, {"name": "P3"}]) is get_road_matrix()
+    assert road_matrix_for([{"name": "P1"}, {"name": "X"}]) is None
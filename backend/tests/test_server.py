@@ -0,0 +1,37 @@
+import pytest
+
+import server
+from helpers import random_cities
+
+@pytest.fixture
+def client():
+    return server.app.test_client()
+
+def route_request(**options):
+    return {"cities": random_cities(12, seed=1), "trace": "none", "edge_mode": "none", **options}
+
+# --------------------------
+# GIỚI HẠN THAM SỐ CỦA REQUEST
+# --------------------------
+@pytest.mark.parametrize("options", [
+    {"wco_islands": server.MAX_WCO_ISLANDS + 1},
+    {"wco_islands": -1},
+    {"edge_mode": "knn", "edge_k": 0},
+    {"edge_mode": "knn", "edge_k": server.MAX_EDGE_K + 1},
+])
+def test_route_rejects_out_of_range_options(client, options):
+    response = client.post("/api/calculate-route", json=route_request(**options))
+    assert response.status_code == 400
+    assert "must be between" in response.get_json()["error"]
+
+def test_edges_endpoint_rejects_large_edge_k(client):
+    response = client.post("/api/edges", json={
+        "cities": random_cities(12, seed=2), "edge_mode": "knn", "edge_k": server.MAX_EDGE_K + 1
+    })
+    assert response.status_code == 400
+
+def test_route_accepts_bounds(client):
+    response = client.post("/api/calculate-route", json=route_request(
+        algorithms=["GBFS"], edge_mode="knn", edge_k=server.MAX_EDGE_K
+    ))
+    assert response.status_code == 200
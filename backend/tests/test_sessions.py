@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+import server
+from distance import build_distance_matrix
+from helpers import random_cities
+from local_search import tour_length
+from sessions import RouteSession
+
+def rotated(names):
+    """Xoay chu trình để bắt đầu tại tên nhỏ nhất (so sánh tour không phụ thuộc điểm bắt đầu)"""
+    start = names.index(min(names))
+    return names[start:] + names[:start]
+
+def cycle_names(session):
+    return rotated([session.cities[i]["name"] for i in session.tour])
+
+# --------------------------
+# PHIÊN TĂNG DẦN: SPLICE KHI XÓA, DỜI THÀNH PHỐ CUỐI VÀO CHỖ TRỐNG
+# --------------------------
+def assert_session_consistent(session):
+    n = session.size
+    assert sorted(session.tour) == list(range(n))
+    assert session.index == {c["name"]: i for i, c in enumerate(session.cities)}
+    np.testing.assert_allclose(session.distance_matrix, build_distance_matrix(session.cities), atol=1e-9)
+
+def test_session_remove_splices_neighbours():
+    cities = random_cities(12, seed=4)
+    tour = [0, 5, 2, 9, 1, 11, 3, 7, 4, 10, 6, 8]
+    session = RouteSession(cities, build_distance_matrix(cities), tour, {})
+    before = cycle_names(session)
+
+    # P1 nằm giữa P9 và P11; P11 là thành phố cuối nên được dời vào chỗ của P1
+    assert session.remove_city("P1") == ["P9", "P11"]
+    assert session.index["P11"] == 1
+    assert cycle_names(session) == rotated([name for name in before if name != "P1"])
+    assert_session_consistent(session)
+
+    # Xóa thành phố đầu tour: láng giềng là cuối tour và phần tử kế tiếp
+    assert session.remove_city("P0") == ["P8", "P5"]
+    assert_session_consistent(session)
+
+def test_session_add_and_remove_match_rebuilt_matrix():
+    cities = random_cities(40, seed=5)
+    extra = random_cities(60, seed=6, prefix="Q")
+    session = RouteSession(cities[:20], build_distance_matrix(cities[:20]), list(range(20)), {})
+    rng = np.random.default_rng(7)
+    pending = extra + cities[20:]
+
+    # Nhiều lần thêm để bộ đệm phải tăng dung lượng, xen kẽ với xóa
+    for step in range(70):
+        if step % 3 == 2:
+            name = session.cities[int(rng.integers(0, session.size))]["name"]
+            before = cycle_names(session)
+            session.remove_city(name)
+            assert cycle_names(session) == rotated([n for n in before if n != name])
+        else:
+            city = pending.pop()
+            k = session.add_city(city)
+            assert session.cities[k] is city
+        assert_session_consistent(session)
+
+    length = session.update(add=[pending.pop()], remove=[session.cities[0]["name"]])
+    assert_session_consistent(session)
+    assert length == pytest.approx(tour_length(session.tour, session.distance_matrix))
+
+def test_session_update_is_atomic_on_error():
+    cities = random_cities(10, seed=8)
+    session = RouteSession(cities, build_distance_matrix(cities), list(range(10)), {})
+    tour = list(session.tour)
+    with pytest.raises(ValueError):
+        session.update(add=[random_cities(1, seed=9, prefix="Z")[0]], remove=["P3", "missing"])
+    assert session.tour == tour and session.size == 10
+
+def test_session_endpoints_add_remove_and_delete():
+    client = server.app.test_client()
+    cities = random_cities(15, seed=10)
+    created = client.post("/api/sessions", json={
+        "cities": cities, "algorithms": ["GBFS"], "trace": "none", "edge_mode": "none"
+    })
+    assert created.status_code == 201
+    session_id = created.get_json()["session_id"]
+
+    new_city = random_cities(1, seed=11, prefix="N")[0]
+    updated = client.post(f"/api/sessions/{session_id}/update", json={"add": [new_city], "remove": ["P3"]})
+    assert updated.status_code == 200
+    path = updated.get_json()["result"]["best_solution"]
+    assert path[0] == path[-1] and "N0" in path and "P3" not in path and len(path) == 16
+
+    bad = client.post(f"/api/sessions/{session_id}/update", json={"remove": ["missing"]})
+    assert bad.status_code == 400
+    assert client.get(f"/api/sessions/{session_id}").get_json()["num_cities"] == 15
+    assert client.delete(f"/api/sessions/{session_id}").status_code == 200
+    assert client.get(f"/api/sessions/{session_id}").status_code == 404
+
+def test_session_rejects_cities_beyond_dense_limit(monkeypatch):
+    monkeypatch.setenv("DISTANCE_BACKEND", "condensed")
+    response = server.app.test_client().post("/api/sessions", json={
+        "cities": random_cities(10, seed=12), "algorithms": ["GBFS"], "trace": "none", "edge_mode": "none"
+    })
+    assert response.status_code == 400
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from GBFS import gbfs_tsp
+from helpers import random_cities
+from spatial import SphereGrid, distance_row_km, unit_sphere_coords
+
+def spread_cities(n, seed):
+    """Thành phố rải khắp địa cầu (random_cities chỉ phủ một vùng nhỏ) kèm một cụm dày"""
+    rng = np.random.default_rng(seed)
+    lat = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+    lng = rng.uniform(-180, 180, n)
+    lat[: n // 3] = rng.normal(21.0, 0.05, n // 3)
+    lng[: n // 3] = rng.normal(105.8, 0.05, n // 3)
+    return [{"name": f"S{i}", "lat": float(a), "lng": float(b)} for i, (a, b) in enumerate(zip(lat, lng))]
+
+# --------------------------
+# LƯỚI KHÔNG GIAN TRÊN MẶT CẦU
+# --------------------------
+@pytest.mark.parametrize("make_cities", [random_cities, spread_cities])
+def test_nearest_matches_brute_force_while_removing(make_cities):
+    n = 300
+    coords = unit_sphere_coords(make_cities(n, seed=1))
+    grid = SphereGrid(coords)
+    remaining = set(range(n))
+    # Xóa theo thứ tự ngẫu nhiên: lưới được dựng lại nhiều lần khi còn ít điểm
+    for source in np.random.default_rng(2).permutation(n).tolist():
+        grid.remove(source)
+        remaining.discard(source)
+        nearest, km = grid.nearest(source)
+        if not remaining:
+            assert nearest is None
+            break
+        targets = sorted(remaining)
+        row = distance_row_km(coords, source, targets)[targets]
+        assert km == pytest.approx(row.min(), abs=1e-6)
+        assert nearest == targets[int(np.argmin(row))]
+        assert len(grid) == len(remaining)
+
+@pytest.mark.parametrize("k", [1, 5, 20])
+def test_nearest_k_matches_brute_force(k):
+    n = 200
+    coords = unit_sphere_coords(spread_cities(n, seed=3))
+    grid = SphereGrid(coords)
+    for source in range(0, n, 7):
+        others = [j for j in range(n) if j != source]
+        row = distance_row_km(coords, source, others)[others]
+        expected = [others[j] for j in np.argsort(row, kind="stable")[:k]]
+        assert [j for j, _ in grid.nearest_k(source, k)] == expected
+
+def test_spatial_gbfs_matches_matrix_gbfs():
+    cities = spread_cities(150, seed=4)
+    matrix = gbfs_tsp(cities, trace="none", edge_mode="none", baseline=False)
+    spatial = gbfs_tsp(cities, trace="none", edge_mode="none", baseline=False, index="spatial")
+    assert spatial["best_solution"] == matrix["best_solution"]
+    assert spatial["best_distance"] == pytest.approx(matrix["best_distance"], abs=0.05)
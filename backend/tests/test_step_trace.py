@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from distance import build_distance_matrix
+from GBFS import gbfs_tsp
+from helpers import random_cities
+from step_trace import nearest_candidates, validate_trace
+from wco import wco_tsp
+
+# --------------------------
+# MỨC TRACE VÀ STEP DẠNG DELTA
+# --------------------------
+@pytest.mark.parametrize("k", [None, 0, 1, 4, 50])
+def test_nearest_candidates_match_sorted_row(k):
+    row = np.random.default_rng(1).random(30)
+    candidates = np.arange(0, 30, 2)
+    expected = sorted(candidates.tolist(), key=lambda j: row[j])
+    expected = expected if k is None else expected[:k]
+    assert [j for j, _ in nearest_candidates(row, candidates, k)] == expected
+
+def test_summary_trace_rebuilds_full_trace():
+    cities = random_cities(15, seed=2)
+    names = [c["name"] for c in cities]
+    full = gbfs_tsp(cities, trace="full", edge_mode="none", baseline=False)
+    summary = gbfs_tsp(cities, trace="summary", trace_top_k=3, edge_mode="none", baseline=False)
+    none = gbfs_tsp(cities, trace="none", edge_mode="none", baseline=False)
+    assert full["best_solution"] == summary["best_solution"] == none["best_solution"]
+    assert none["steps"] == []
+
+    # Ghép các chỉ số "chosen" của summary lại thành partialPath của step cuối ở mức full
+    path = [names[0]] + [names[step["chosen"]] for step in summary["steps"]]
+    assert path == full["steps"][-1]["partialPath"] == full["best_solution"]
+    assert sum(step["h"] for step in summary["steps"]) == pytest.approx(full["best_distance"], abs=0.1)
+    for full_step, summary_step in zip(full["steps"], summary["steps"][:-1]):
+        top = [names[j] for j, _ in summary_step["candidates"]]
+        assert top == [n["name"] for n in full_step["neighbors"][:3]]
+
+def test_wco_trace_levels_share_solution():
+    cities = random_cities(12, seed=3)
+    dist = build_distance_matrix(cities)
+    results = {
+        trace: wco_tsp(cities, max_iter=20, distance_matrix=dist, trace=trace, trace_top_k=2,
+                       edge_mode="none", seed=4, baseline=False, verbose=False)
+        for trace in ("full", "summary", "none")
+    }
+    assert len({tuple(r["best_solution"]) for r in results.values()}) == 1
+    assert results["none"]["steps"] == []
+    assert all(set(step) == {"step", "iteration", "currentBestDistance"} for step in results["summary"]["steps"])
+
+def test_invalid_trace_level():
+    with pytest.raises(ValueError):
+        validate_trace("verbose")
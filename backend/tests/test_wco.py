@@ -0,0 +1,101 @@
+import random
+
+import numpy as np
+import pytest
+
+from distance import build_distance_matrix
+from distance_store import CondensedDistances
+from helpers import is_permutation, random_cities
+from local_search import tour_length
+from wco import init_population, order_crossover_batch, population_distances, wco_tsp
+
+# --------------------------
+# TOUR DẠNG MẢNG CHỈ SỐ int32 TRONG WCO
+# --------------------------
+def test_init_population_is_int32_permutations():
+    dist = build_distance_matrix(random_cities(15, seed=1))
+    whales, fitness = init_population(8, dist, random.Random(2))
+    assert whales.dtype == np.int32 and whales.shape == (8, 15)
+    assert all(is_permutation(whale, 15) for whale in whales)
+    np.testing.assert_allclose(fitness, [tour_length(whale, dist) for whale in whales])
+
+def test_wco_tour_is_closed_permutation_of_cities():
+    cities = random_cities(20, seed=3)
+    result = wco_tsp(cities, max_iter=20, trace="none", edge_mode="none", seed=4, baseline=False, verbose=False)
+    path = result["best_solution"]
+    # WCO không xoay tour về thành phố đầu: điểm xuất phát là starting_point của kết quả
+    assert path[0] == path[-1] == result["starting_point"]
+    assert sorted(path[:-1]) == sorted(c["name"] for c in cities)
+    index = {c["name"]: i for i, c in enumerate(cities)}
+    length = tour_length([index[name] for name in path[:-1]], build_distance_matrix(cities))
+    assert result["best_distance"] == pytest.approx(length, abs=0.01)
+
+# --------------------------
+# FITNESS THEO LÔ
+# --------------------------
+def test_population_distances_match_tour_length():
+    cities = random_cities(30, seed=5)
+    dist = build_distance_matrix(cities)
+    rng = np.random.default_rng(6)
+    population = np.array([rng.permutation(30) for _ in range(12)], dtype=np.int32)
+    expected = [tour_length(tour, dist) for tour in population]
+    np.testing.assert_allclose(population_distances(population, dist), expected)
+    # Backend gọn của distance_store dùng cùng cú pháp gather
+    np.testing.assert_allclose(population_distances(population, CondensedDistances(cities)), expected, rtol=1e-6)
+
+# --------------------------
+# LAI GHÉP OX THEO LÔ
+# --------------------------
+def naive_order_crossover(parent1, parent2, start, end):
+    """OX theo định nghĩa: giữ đoạn [start, end] của parent1, điền phần còn lại theo thứ tự parent2 từ end+1"""
+    size = len(parent1)
+    child = [None] * size
+    child[start:end + 1] = parent1[start:end + 1]
+    fill = [city for city in parent2 if city not in child[start:end + 1]]
+    for offset, city in enumerate(fill):
+        child[(end + 1 + offset) % size] = city
+    return child
+
+@pytest.mark.parametrize("size", [2, 3, 10, 57])
+def test_order_crossover_batch_matches_definition(size):
+    rng = np.random.default_rng(size)
+    m = 40
+    parents1 = np.array([rng.permutation(size) for _ in range(m)], dtype=np.int32)
+    parents2 = np.array([rng.permutation(size) for _ in range(m)], dtype=np.int32)
+    starts = rng.integers(0, size, m)
+    ends = np.array([rng.integers(s, size) for s in starts])
+    # Có cả đoạn gồm toàn bộ tour và đoạn một phần tử
+    starts[0], ends[0] = 0, size - 1
+    starts[1] = ends[1]
+
+    children = order_crossover_batch(parents1, parents2, starts, ends)
+    assert children.dtype == np.int32 and children.shape == (m, size)
+    for child, p1, p2, s, e in zip(children, parents1, parents2, starts, ends):
+        assert is_permutation(child, size)
+        assert child.tolist() == naive_order_crossover(p1.tolist(), p2.tolist(), int(s), int(e))
+
+# --------------------------
+# CHẾ ĐỘ ANYTIME: TIME BUDGET VÀ DỪNG KHI ĐỨNG YÊN
+# --------------------------
+def run_wco(cities, **options):
+    return wco_tsp(cities, trace="none", edge_mode="none", seed=7, baseline=False, verbose=False, **options)
+
+def test_wco_time_budget_runs_until_budget():
+    cities = random_cities(25, seed=8)
+    result = run_wco(cities, max_iter=None, time_budget_ms=50)
+    assert result["stop_reason"] == "time_budget" and not result["partial"]
+    assert result["iterations"] > 0
+    assert result["timings"]["search"] >= 0.045
+
+def test_wco_stall_stops_after_non_improving_iterations():
+    cities = random_cities(25, seed=9)
+    stalled = run_wco(cities, max_iter=5000, stall_iterations=5)
+    assert stalled["stop_reason"] == "stalled" and stalled["iterations"] < 5000
+    # Dừng theo số iteration (không theo thời gian) nên cùng seed cho cùng kết quả
+    again = run_wco(cities, max_iter=5000, stall_iterations=5)
+    assert (again["iterations"], again["best_solution"]) == (stalled["iterations"], stalled["best_solution"])
+    assert run_wco(cities, max_iter=5000, stall_iterations=50)["best_distance"] <= stalled["best_distance"]
+
+def test_wco_unbounded_iterations_need_budget():
+    with pytest.raises(ValueError):
+        run_wco(random_cities(5, seed=10), max_iter=None)
@@ -9,6 +9,8 @@ import AlgorithmComparison from "../AlgorithmComparison/AlgorithmComparison";
 function App() {
   const [gbfsResult, setGbfsResult] = useState(null);
   const [wcoResult, setWcoResult] = useState(null);
+  // Danh sách cạnh dùng chung cho mọi thuật toán (backend trả về một lần ở cấp cao nhất)
+  const [edges, setEdges] = useState(null);
 
   const handleGbfsResult = (result) => {
     console.log("App received GBFS result:", result);
@@ -27,6 +29,7 @@ function App() {
         <VietnamMapWithProvinces
           onGbfsResult={handleGbfsResult}
           onWcoResult={handleWcoResult}
+          onEdges={setEdges}
         />
       </div>
 
@@ -42,6 +45,7 @@ function App() {
               <div className="h-full w-full rounded-2xl overflow-hidden shadow-inner">
                 <GbfsVisualization
                   gbfsResult={gbfsResult}
+                  edges={edges}
                   width={800}
                   height={384}
                 />
@@ -58,6 +62,7 @@ function App() {
               <div className="h-full w-full overflow-hidden shadow-inner">
                 <WcoVisualization
                   wcoResult={wcoResult}
+                  edges={edges}
                   width={800}
                   height={384}
                 />
@@ -18,6 +18,7 @@ const projectLatLngToXY = (lat, lng, w, h) => {
 
 const GbfsVisualization = ({
   gbfsResult = null,
+  edges: sharedEdges = null,
   width = DEFAULT_WIDTH,
   height = DEFAULT_HEIGHT,
 }) => {
@@ -35,9 +36,9 @@ const GbfsVisualization = ({
     if (gbfsResult) {
       console.log(" Steps data:", gbfsResult.steps);
       console.log(" Cities data:", gbfsResult.cities);
-      console.log(" Edges data:", gbfsResult.edges);
+      console.log(" Edges data:", sharedEdges ?? gbfsResult.edges);
     }
-  }, [gbfsResult]);
+  }, [gbfsResult, sharedEdges]);
 
   //  KHAI BÁO steps TRƯỚC KHI SỬ DỤNG
   const steps = useMemo(() => {
@@ -66,7 +67,7 @@ const GbfsVisualization = ({
     }
 
     const cities = gbfsResult.cities || [];
-    const edges = gbfsResult.edges || [];
+    const edges = sharedEdges ?? gbfsResult.edges ?? [];
 
     console.log(
       `Building graph with ${cities.length} cities and ${edges.length} edges`
@@ -123,7 +124,7 @@ const GbfsVisualization = ({
     });
 
     return { nodes, links };
-  }, [gbfsResult, width, height]);
+  }, [gbfsResult, sharedEdges, width, height]);
 
   //  KHAI BÁO visualLinks TRƯỚC KHI SỬ DỤNG
   const visualLinks = useMemo(() => {
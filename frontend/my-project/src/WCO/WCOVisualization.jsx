@@ -27,6 +27,7 @@ const projectLatLngToXY = (lat, lng, w, h) => {
 
 const WcoVisualization = ({
   wcoResult = null,
+  edges: sharedEdges = null,
   width = DEFAULT_WIDTH,
   height = DEFAULT_HEIGHT,
 }) => {
@@ -96,7 +97,7 @@ const WcoVisualization = ({
     }
 
     const cities = wcoResult.cities || [];
-    const edges = wcoResult.edges || [];
+    const edges = sharedEdges ?? wcoResult.edges ?? [];
 
     const nodes = cities.map((c, i) => {
       const node = {
@@ -135,7 +136,7 @@ const WcoVisualization = ({
       .filter((link) => link !== null);
 
     return { nodes, links };
-  }, [wcoResult, width, height]);
+  }, [wcoResult, sharedEdges, width, height]);
 
   //  Highlight best path hiện tại
   const visualLinks = useMemo(() => {
@@ -5,7 +5,7 @@ import ProvinceList from "./ProvinceList";
 import { VIETNAM_PROVINCES } from "../config/apiConfig";
 import axios from "axios";
 
-const VietnamMapWithProvinces = ({ onGbfsResult, onWcoResult }) => {
+const VietnamMapWithProvinces = ({ onGbfsResult, onWcoResult, onEdges }) => {
   const [selectedProvinces, setSelectedProvinces] = useState([]);
   const [currentLocation, setCurrentLocation] = useState(null);
   const [startingPoint, setStartingPoint] = useState(null);
@@ -240,13 +240,18 @@ const VietnamMapWithProvinces = ({ onGbfsResult, onWcoResult }) => {
         onWcoResult(wcoData);
       }
 
+      // Cạnh dùng chung ở cấp cao nhất (backend cũ: nằm trong từng kết quả)
+      if (onEdges) {
+        onEdges(response.data.edges ?? gbfsData.edges ?? null);
+      }
+
       // Lưu kết quả để hiển thị (nếu cần)
       setTspResults(response.data);
 
       console.log(" GBFS visualization data:", {
         steps: gbfsData.steps?.length,
         cities: gbfsData.cities?.length,
-        edges: gbfsData.edges?.length,
+        edges: (response.data.edges ?? gbfsData.edges)?.length,
         best_solution: gbfsData.best_solution,
       });
     } catch (error) {